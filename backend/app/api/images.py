@@ -2,13 +2,36 @@
 Images API endpoints
 Serve generated location, item, and NPC images.
 Uses StorageService for GCS-backed persistence on Cloud Run.
+Image URLs stay per experience; the experience manifest maps each one to
+its blob in the shared content store (services/image_store.py).
+
+?w=<px> asks for a thumbnail (snapped to a known width) and an Accept
+header listing image/webp gets WebP (services/image_derivatives.py).
+
+Hot images are answered from an in-memory byte cache with strong ETags
+(services/image_byte_cache.py); If-None-Match gets 304. Blobs can also be
+fetched by content hash under /api/images/content/{hash} — those URLs never
+change meaning, so they are served as immutable. Per-experience URLs can
+point at a new blob after a regeneration and are revalidated every time.
+
+Item thumbnails also come packed into one sprite sheet per experience:
+/{experience_id}/atlas returns the frame map, /atlas/{hash} the sheet
+(services/image_atlas.py).
 """
 
+import asyncio
 import logging
+import re
 from pathlib import Path
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
-
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response
+
+from app.services.image_atlas import atlas_key, get_image_atlases
+from app.services.image_byte_cache import get_image_byte_cache
+from app.services.image_derivatives import MEDIA_TYPES, derivative_key, get_image_derivatives, negotiate_format
+from app.services.image_generator import image_status
+from app.services.image_store import content_key, resolve_image_key_async
 from app.services.storage_service import storage
 
 logger = logging.getLogger(__name__)
@@ -16,60 +39,95 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/images", tags=["images"])
 
 IMAGES_DIR = Path(__file__).parent.parent.parent / "generated_images"
-
-
-def _serve_image(key: str, description: str):
-    """Resolve an image via storage service and return a FileResponse."""
-    local = storage.local_path(key)
-    if local is None:
-        logger.warning(f"{description} not found: {key}")
-        raise HTTPException(status_code=404, detail=f"{description} not found")
-
-    return FileResponse(
-        path=str(local),
-        media_type="image/png",
-        headers={"Cache-Control": "public, max-age=86400"},
-    )
+_CONTENT_HASH = re.compile(r"^[0-9a-f]{32}$")
+# Experience URLs can remap to a new content hash (edited NPC, regenerated
+# scenario): always revalidate — the strong ETag makes that a cheap 304
+_EXPERIENCE_CACHE_CONTROL = "public, no-cache"
+_IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+async def _serve_key(key: str, description: str, request: Request, width: Optional[int],
+                     cache_control: str, experience_id: Optional[str] = None):
+    """Serve a stored image (or its derivative) from the byte cache, else storage."""
+    derivatives = get_image_derivatives()
+    fmt = negotiate_format(request.headers.get("accept", ""), derivatives.formats)
+    width = derivatives.snap_width(width)
+    served_key = derivative_key(key, width, fmt) if width or fmt != "png" else key
+
+    cache = get_image_byte_cache()
+    entry = cache.get(served_key)
+    if entry is None:
+        original = await storage.local_path_async(key)
+        if original is None:
+            logger.warning(f"{description} not found: {key}")
+            raise HTTPException(status_code=404, detail=f"{description} not found")
+        local = await derivatives.derivative(key, width, fmt)
+        if local is None:
+            local, fmt, served_key = original, "png", key
+        data = await asyncio.to_thread(local.read_bytes)
+        entry = cache.put(served_key, data, MEDIA_TYPES[fmt], original.stat().st_size)
+
+    headers = {"Cache-Control": cache_control, "ETag": entry.etag, "Vary": "Accept"}
+    if cache.not_modified(request.headers.get("if-none-match"), entry):
+        return Response(status_code=304, headers=headers)
+    if experience_id:
+        derivatives.record(experience_id, len(entry.data), entry.full_size)
+    return Response(content=entry.data, media_type=entry.media_type, headers=headers)
+
+
+async def _serve_image(experience_id: str, filename: str, description: str,
+                       request: Request, width: Optional[int] = None):
+    """Resolve an experience image via its manifest and serve it."""
+    key = await resolve_image_key_async(experience_id, filename)
+    return await _serve_key(key, description, request, width, _EXPERIENCE_CACHE_CONTROL, experience_id)
+
+
+@router.get("/content/{content_hash}")
+async def get_content_image(content_hash: str, request: Request,
+                            w: Optional[int] = Query(None, description="Thumbnail width in px")):
+    if not _CONTENT_HASH.match(content_hash):
+        raise HTTPException(status_code=404, detail="Image not found")
+    return await _serve_key(content_key(content_hash), "Image", request, w, _IMMUTABLE_CACHE_CONTROL)
+
+
+@router.get("/atlas/{atlas_hash}")
+async def get_atlas_image(atlas_hash: str, request: Request):
+    if not _CONTENT_HASH.match(atlas_hash):
+        raise HTTPException(status_code=404, detail="Atlas not found")
+    # Never resized: frame coordinates are in full-size pixels
+    return await _serve_key(atlas_key(atlas_hash), "Atlas", request, None, _IMMUTABLE_CACHE_CONTROL)
+
+
+@router.get("/{experience_id}/atlas")
+async def get_experience_atlas(experience_id: str):
+    atlas = await asyncio.to_thread(get_image_atlases().ensure, experience_id)
+    if atlas is None:
+        raise HTTPException(status_code=404, detail="No atlas for this experience")
+    return atlas
 
 
 @router.get("/{experience_id}/location/{location_id}")
-async def get_location_image(experience_id: str, location_id: str):
+async def get_location_image(experience_id: str, location_id: str, request: Request,
+                             w: Optional[int] = Query(None, description="Thumbnail width in px")):
     bare_id = location_id.removeprefix("location_")
-    key = f"generated_images/{experience_id}/location_{bare_id}.png"
-    return _serve_image(key, "Location image")
+    return await _serve_image(experience_id, f"location_{bare_id}.png", "Location image", request, w)
 
 
 @router.get("/{experience_id}/item/{item_id}")
-async def get_item_image(experience_id: str, item_id: str):
+async def get_item_image(experience_id: str, item_id: str, request: Request,
+                         w: Optional[int] = Query(None, description="Thumbnail width in px")):
     bare_id = item_id.removeprefix("item_")
-    key = f"generated_images/{experience_id}/item_{bare_id}.png"
-    return _serve_image(key, "Item image")
+    return await _serve_image(experience_id, f"item_{bare_id}.png", "Item image", request, w)
 
 
 @router.get("/{experience_id}/npc/{npc_id}")
-async def get_npc_image(experience_id: str, npc_id: str):
+async def get_npc_image(experience_id: str, npc_id: str, request: Request,
+                        w: Optional[int] = Query(None, description="Thumbnail width in px")):
     bare_id = npc_id.removeprefix("npc_")
-    key = f"generated_images/{experience_id}/npc_{bare_id}.png"
-    return _serve_image(key, "NPC image")
+    return await _serve_image(experience_id, f"npc_{bare_id}.png", "NPC image", request, w)
 
 
 @router.get("/{experience_id}/status")
 async def get_image_generation_status(experience_id: str):
-    prefix = f"generated_images/{experience_id}"
-    location_images = len(storage.list_files(prefix, suffix="location_"))
-    item_images = len(storage.list_files(prefix, suffix="item_"))
-    npc_images = len(storage.list_files(prefix, suffix="npc_"))
-
-    # list_files suffix matches end-of-name so re-count properly
-    all_keys = storage.list_files(prefix, suffix=".png")
-    location_images = sum(1 for k in all_keys if "/location_" in k)
-    item_images = sum(1 for k in all_keys if "/item_" in k)
-    npc_images = sum(1 for k in all_keys if "/npc_" in k)
-
-    return {
-        "experience_id": experience_id,
-        "location_images": location_images,
-        "item_images": item_images,
-        "npc_images": npc_images,
-        "ready": location_images > 0 or item_images > 0 or npc_images > 0,
-    }
+    # Generator's in-process counts, else the manifest — never a bucket listing
+    return await asyncio.to_thread(image_status, experience_id)
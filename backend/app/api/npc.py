@@ -22,6 +22,8 @@ from app.models.npc import (
     QuickResponsesRequest,
     QuickResponsesResponse,
 )
+from app.models.websocket import NPCMessageDeltaMessage, NPCMessageDoneMessage
+from app.core.config import get_settings
 from app.services.npc_conversation_service import get_npc_conversation_service
 from app.services.game_state_manager import get_game_state_manager
 from app.services.room_manager import get_room_manager
@@ -31,6 +33,35 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/npc", tags=["npc"])
 
 
+class _WebSocketReplySink:
+    """Streams an NPC reply to one player over their room WebSocket."""
+
+    def __init__(self, room_code: str, player_id: str, npc_id: str):
+        from app.services.websocket_manager import get_ws_manager
+        self._ws_manager = get_ws_manager()
+        self.room_code = room_code
+        self.player_id = player_id
+        self.npc_id = npc_id
+        self._seq = 0
+
+    async def delta(self, text: str) -> None:
+        msg = NPCMessageDeltaMessage(npc_id=self.npc_id, seq=self._seq, delta=text)
+        self._seq += 1
+        await self._ws_manager.send_to_player(self.room_code, self.player_id, msg.model_dump(mode='json'))
+
+    async def done(self, text: str, outcomes: List[str], rapport: int,
+                   rapport_delta: int, conversation_failed: bool) -> None:
+        msg = NPCMessageDoneMessage(
+            npc_id=self.npc_id,
+            text=text,
+            outcomes=outcomes,
+            rapport=rapport,
+            rapport_delta=rapport_delta,
+            conversation_failed=conversation_failed,
+        )
+        await self._ws_manager.send_to_player(self.room_code, self.player_id, msg.model_dump(mode='json'))
+
+
 # ============================================================
 # Test / Dev endpoints for rapid NPC conversation iteration
 # ============================================================
@@ -194,13 +225,14 @@ async def start_conversation(request: StartConversationRequest) -> StartConversa
             raise HTTPException(status_code=404, detail=f"NPC {request.npc_id} not found")
         
         # Start conversation
-        greeting, quick_responses, suspicion = npc_service.start_conversation(
+        greeting, quick_responses, suspicion = await npc_service.start_conversation(
             npc=npc,
             cover_id=request.cover_id,
             player_id=request.player_id,
             difficulty=difficulty,
             game_state=game_state,
             target_outcomes=request.target_outcomes,
+            room_code=request.room_code,
         )
         
         # Build objectives for frontend - only the outcomes the player's task needs
@@ -272,15 +304,21 @@ async def conversation_chat(request: ConversationChatRequest) -> ConversationCha
         if not npc:
             raise HTTPException(status_code=404, detail=f"NPC {request.npc_id} not found")
         
+        # Stream the NPC reply over the player's room socket if requested
+        sink = None
+        if request.stream and get_settings().npc_streaming_enabled:
+            sink = _WebSocketReplySink(request.room_code, request.player_id, npc.id)
+
         # Process the player's choice
         (npc_response, outcomes, suspicion, suspicion_delta, 
          quick_responses, conversation_failed, cooldown_until, 
-         completed_tasks, opening_given) = npc_service.process_player_choice(
+         completed_tasks, opening_given) = await npc_service.process_player_choice(
             response_index=request.response_index,
             player_id=request.player_id,
             npc=npc,
             difficulty=difficulty,
             game_state=game_state,
+            sink=sink,
         )
         
         logger.info(f"💬 Chat turn: rapport={suspicion} (delta={suspicion_delta:+d}) | outcomes={outcomes} | failed={conversation_failed}")
@@ -372,7 +410,7 @@ async def npc_chat_legacy(request: ChatRequest) -> ChatResponse:
     service = get_npc_conversation_service()
     
     try:
-        npc_text = service._call_llm(
+        npc_text = await service._call_llm(
             f"You are {request.npc.name}. Respond to: {request.player_message}",
             service.npc_model
         )
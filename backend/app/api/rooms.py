@@ -2,10 +2,8 @@
 REST API endpoints for room management
 """
 
-import json
 import logging
 import time
-from pathlib import Path
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel, Field
 from typing import List, Optional
@@ -77,6 +75,10 @@ _CACHE_TTL = 300  # 5 minutes
 
 def _is_scenario_ready(cache_base: str) -> bool:
     """Check if a scenario file exists (local disk or GCS), with TTL cache."""
+    from app.services.experience_cache import get_experience_cache
+    if get_experience_cache().is_cached(cache_base):
+        return True
+
     now = time.time()
     cached = _ready_cache.get(cache_base)
     if cached:
@@ -94,17 +96,11 @@ def _is_scenario_ready(cache_base: str) -> bool:
 @router.get("/quick-scenarios")
 async def get_quick_scenarios(player_count: int = Query(..., ge=2, le=12)):
     """Return quick-start scenarios available for a given player count."""
-    config_path = Path(__file__).parent.parent.parent.parent / "shared_data" / "quick_scenarios.json"
-    try:
-        with open(config_path) as f:
-            data = json.load(f)
-    except Exception:
-        return []
-
+    from app.services.cache_warmer import load_quick_scenarios
     from app.services.experience_loader import scenario_cache_filename
 
     results: List[QuickScenarioResponse] = []
-    for entry in data.get("scenarios", []):
+    for entry in load_quick_scenarios():
         if entry["player_count"] != player_count:
             continue
 
@@ -2,6 +2,7 @@
 WebSocket API endpoints for real-time multiplayer
 """
 
+import asyncio
 import logging
 import json
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
@@ -9,8 +10,8 @@ from typing import Dict, Any
 
 from app.services.room_manager import get_room_manager
 from app.services.websocket_manager import get_ws_manager
-from app.services.experience_loader import ExperienceLoader
 from app.services.game_state_manager import get_game_state_manager
+from app.services.npc_session_store import get_npc_session_store
 from app.models.room import RoomStatus
 from app.models.websocket import (
     JoinRoomMessage,
@@ -36,6 +37,8 @@ from app.models.websocket import (
     AllTasksCompleteMessage,
     GameEndedMessage,
     NarrativeBeatMessage,
+    ImageReadyMessage,
+    ImagesCompleteMessage,
 )
 
 logger = logging.getLogger(__name__)
@@ -374,13 +377,14 @@ async def handle_start_game(room_code: str, player_id: str, data: Dict[str, Any]
     selected_roles = room.get_selected_roles()
     
     try:
-        loader = ExperienceLoader(experiences_dir="experiences")
         from app.services.experience_loader import scenario_cache_filename
+        from app.services.experience_cache import get_experience_cache
+        experience_cache = get_experience_cache()
         cache_base = scenario_cache_filename(scenario, selected_roles)
 
-        # Try loading (checks local disk then GCS). If missing, generate on the fly.
+        # Try loading (memory cache, then local disk, then GCS). If missing, generate on the fly.
         try:
-            game_state = loader.load_experience(scenario, selected_roles)
+            game_state = experience_cache.get_game_state(scenario, selected_roles)
         except FileNotFoundError:
             from app.services.scenario_generator_service import generate_scenario
 
@@ -397,7 +401,8 @@ async def handle_start_game(room_code: str, player_id: str, data: Dict[str, Any]
                     "message": "Scenario generation failed. Please try again."
                 })
                 return
-            game_state = loader.load_experience(scenario, selected_roles)
+            experience_cache.invalidate(cache_base)
+            game_state = experience_cache.get_game_state(scenario, selected_roles)
         
         # Store game state in game state manager
         game_state_manager = get_game_state_manager()
@@ -411,10 +416,20 @@ async def handle_start_game(room_code: str, player_id: str, data: Dict[str, Any]
                 player.location = starting_location
                 logger.info(f"  📍 {player.name} ({player.role}) → {starting_location}")
         
+        # Static payload parts (NPCs, locations) are pre-encoded once per experience
+        static_payload = experience_cache.get_static_payload(cache_base)
+
         # Skip image generation if requested (for E2E testing)
         skip_images = data.get("skip_images", False)
+        # Progressive: start now, generate images in the background (image_ready events)
+        from app.core.config import get_settings
+        progressive = not skip_images and data.get(
+            "progressive_images", get_settings().progressive_game_start
+        )
         
-        if not skip_images:
+        if progressive:
+            logger.info(f"🎨 Progressive start — images for {cache_base} will stream in after game_started")
+        elif not skip_images:
             from app.services.image_generator import generate_all_images_for_experience
 
             async def _img_broadcast(msg: str):
@@ -425,16 +440,7 @@ async def handle_start_game(room_code: str, player_id: str, data: Dict[str, Any]
 
             await _img_broadcast("🎯 Preparing your heist...")
 
-            experience_dict = {
-                'scenario_id': game_state.scenario,
-                'objective': game_state.objective,
-                'locations': [loc.model_dump() for loc in game_state.locations],
-                'items_by_location': {
-                    loc: [item.model_dump() for item in items]
-                    for loc, items in game_state.items_by_location.items()
-                },
-                'npcs': [npc.model_dump() for npc in game_state.npcs]
-            }
+            experience_dict = static_payload.experience_dict
 
             logger.info(f"🎨 Starting image generation for {cache_base}...")
             success = await generate_all_images_for_experience(
@@ -449,6 +455,12 @@ async def handle_start_game(room_code: str, player_id: str, data: Dict[str, Any]
                 logger.warning(f"⚠️ Image generation had errors for {cache_base}, continuing anyway")
         else:
             logger.info(f"⏭️  Skipping image generation (E2E testing mode)")
+
+        # Item thumbnails as one sprite sheet (built with the images; memoized)
+        image_atlas = None
+        if not skip_images and not progressive:
+            from app.services.image_atlas import get_image_atlases
+            image_atlas = await asyncio.to_thread(get_image_atlases().ensure, cache_base)
         
         # Send game started to each player with their specific tasks
         for pid, player in room.players.items():
@@ -462,16 +474,24 @@ async def handle_start_game(room_code: str, player_id: str, data: Dict[str, Any]
                 experience_id=cache_base,
                 objective=game_state.objective,
                 your_tasks=[task.model_dump(mode='json') for task in player_tasks],
-                npcs=[npc.model_dump(mode='json') for npc in game_state.npcs],
-                locations=[loc.model_dump(mode='json') for loc in game_state.locations],
+                npcs=static_payload.npcs,
+                locations=static_payload.locations,
                 starting_location=player.location,
                 briefing=game_state.briefing,
+                images_pending=progressive,
+                image_atlas=image_atlas,
             )
             logger.info(f"📍 Sending {len(game_state.locations)} locations to player {pid} (starting at {player.location})")
             await ws_manager.send_to_player(room_code, pid, game_started.model_dump(mode='json'))
         
         # Send game_start narrative beats after all players have received game_started
         await _broadcast_narrative_beats(room_code, "game_start")
+
+        if progressive:
+            _start_progressive_images(
+                room_code, cache_base, static_payload.experience_dict, game_state,
+                list(room.players.values()),
+            )
         
         logger.info(f"🎮 Game started in room {room_code} - scenario: {scenario}")
     
@@ -483,6 +503,47 @@ async def handle_start_game(room_code: str, player_id: str, data: Dict[str, Any]
         })
 
 
+# Background image generation for progressive starts (references keep tasks alive)
+_image_tasks: set = set()
+
+
+def _start_progressive_images(room_code: str, experience_id: str, experience_dict: Dict,
+                              game_state, players) -> None:
+    """Generate images in the background — starting location first, then what's
+    near each player — pushing image_ready to the room as each one lands."""
+    from app.services.image_generator import generate_all_images_for_experience, image_priorities
+    ws_manager = get_ws_manager()
+
+    async def _image_ready(kind: str, asset_id: str, path: str):
+        await ws_manager.broadcast_to_room(room_code, ImageReadyMessage(
+            experience_id=experience_id,
+            kind=kind,
+            asset_id=asset_id,
+            url=f"/api/images/{experience_id}/{kind}/{asset_id}",
+        ).model_dump(mode='json'))
+
+    async def _run():
+        try:
+            success = await generate_all_images_for_experience(
+                experience_id, experience_dict,
+                cache_name=experience_id,
+                priorities=image_priorities(game_state, players),
+                on_image_ready=_image_ready,
+            )
+        except Exception as e:
+            logger.error(f"❌ Progressive image generation failed for {experience_id}: {e}", exc_info=True)
+            success = False
+        from app.services.image_atlas import get_image_atlases
+        atlas = await asyncio.to_thread(get_image_atlases().ensure, experience_id)
+        await ws_manager.broadcast_to_room(room_code, ImagesCompleteMessage(
+            experience_id=experience_id, success=success, image_atlas=atlas,
+        ).model_dump(mode='json'))
+
+    task = asyncio.create_task(_run())
+    _image_tasks.add(task)
+    task.add_done_callback(_image_tasks.discard)
+
+
 async def handle_complete_task(room_code: str, player_id: str, data: Dict[str, Any]) -> None:
     """Handle task completion (for manual-complete types: INFO_SHARE, MINIGAME)"""
     ws_manager = get_ws_manager()
@@ -649,6 +710,7 @@ async def handle_escape(room_code: str, player_id: str) -> None:
 
     player_name = room.players[player_id].name
     logger.info(f"🚪 {player_name} triggered escape in room {room_code} — ending game")
+    get_npc_session_store().drop_room(room_code)
 
     game_ended = GameEndedMessage(
         result="success",
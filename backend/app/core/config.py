@@ -38,9 +38,120 @@ class Settings(BaseSettings):
     gemini_npc_model: str = "gemini-2.0-flash"
     # Quick Response Suggestions: Player chat helpers
     gemini_quick_response_model: str = "gemini-2.0-flash"
-    
+    gemini_base_url: str = "https://generativelanguage.googleapis.com/v1beta"
+
+    # Which LLM answers backend calls: "gemini" or "simulator" (local stand-in for
+    # load tests, see services/llm_simulator.py — no quota spent)
+    llm_backend: str = "gemini"
+    llm_simulator_latency_ms: float = 600.0
+    llm_simulator_latency_p95_ms: float = 1500.0
+    llm_simulator_error_rate: float = 0.0
+    llm_simulator_rate_limit_rate: float = 0.0
+    llm_simulator_rpm: float = 0.0  # provider-side quota per model, 0 = unlimited
+    llm_simulator_seed: int = 0
+
+    # Real-time LLM client (see services/llm_client.py)
+    llm_timeout_seconds: float = 20.0
+    llm_max_concurrency: int = 16
+    llm_max_connections: int = 32
+    # Shared scheduler for every Gemini call (see services/llm_scheduler.py)
+    llm_default_rpm: float = 1000.0
+    llm_model_rpm: dict[str, float] = {"gemini-2.5-flash-image": 60.0}
+    # Share of each model's burst that batch work (scenario/image generation) leaves for live chats
+    llm_live_reserve: float = 0.25
+    llm_rate_limit_retries: int = 3
+    # Per-model circuit breaker around LLM calls (see services/circuit_breaker.py)
+    llm_breaker_window_seconds: float = 30.0
+    llm_breaker_min_calls: int = 8
+    llm_breaker_error_rate: float = 0.5
+    llm_breaker_slow_call_seconds: float = 12.0
+    llm_breaker_slow_rate: float = 0.5
+    llm_breaker_open_seconds: float = 15.0
+    # Micro-batching of quick-response calls (see services/llm_batcher.py): requests
+    # arriving within the window share one LLM call; 0 = off (no added latency)
+    llm_batch_window_ms: float = 0.0
+    llm_batch_max_size: int = 8
+    # Honour `stream: true` on /api/npc/chat (npc_message_delta frames over /ws)
+    npc_streaming_enabled: bool = True
+    # Turn pipelining in process_player_choice: "sequential" | "parallel"
+    # (parallel generates the next quick responses alongside the NPC reply;
+    # it needs a streamed reply — turns without `stream: true` run sequentially)
+    npc_turn_mode: str = "sequential"
+    # Parallel mode: regenerate quick responses when less than this share of
+    # the draft reply's words survive into the final reply
+    npc_reconcile_overlap: float = 0.5
+    # Pre-compute NPC replies to every offered quick response while the player reads
+    npc_speculative_replies: bool = False
+    # Latency budget for NPC replies: hedge a duplicate call once the first
+    # runs past the tracked p95, serve a canned line at the deadline (opt-in)
+    npc_latency_budget: bool = False
+    npc_reply_deadline_seconds: float = 8.0
+    npc_hedge_min_delay_seconds: float = 1.0
+    # Response cache for repeatable conversation prompts (see services/llm_cache.py):
+    # variants kept per prompt for each call site, 0 = don't cache that site
+    llm_cache_sites: dict[str, int] = {"greeting": 3, "quick_responses": 2, "dismissal": 3}
+    llm_cache_dir: Optional[str] = "cache/llm_responses"  # relative to backend/; empty = memory only
+    llm_cache_memory_entries: int = 2048
+    # Upload each compiled NPC prompt prefix as a Gemini cachedContents resource
+    # (see services/npc_prompt_prefix.py); smaller prefixes than the provider's minimum are skipped
+    llm_context_caching: bool = False
+    llm_context_cache_ttl_seconds: int = 3600
+    llm_context_cache_min_tokens: int = 1024
+    # Answer conversation starts from the experience's pre-generated opening banks
+    npc_opening_banks_enabled: bool = True
+    # Rolling conversation summary: after each reply, fold messages older than the
+    # last npc_summary_keep_messages into a running summary (in batches of
+    # npc_summary_batch) so NPC / quick-response prompts stop growing with turn count
+    npc_summarization: bool = True
+    npc_summary_keep_messages: int = 6
+    npc_summary_batch: int = 4
+    npc_summary_max_chars: int = 700
+    # Conversation session store (see services/npc_session_store.py): cap, idle
+    # expiry, and an optional directory idle/evicted sessions are spilled to
+    npc_session_max: int = 5000
+    npc_session_idle_seconds: float = 1800.0
+    npc_session_spill_dir: Optional[str] = None  # e.g. "cache/npc_sessions", relative to backend/
+
+    # Images in flight at once per process, across locations, items and NPCs
+    # (see services/image_jobs.py); the image model's llm_model_rpm still applies
+    image_max_concurrency: int = 4
+    # Send game_started as soon as the experience is loaded and stream images in
+    # afterwards (image_ready events); start_game's "progressive_images" overrides
+    progressive_game_start: bool = False
+    # Resized / WebP (AVIF if Pillow supports it) image variants for thumbnails
+    # (see services/image_derivatives.py); widths are pre-rendered at generation time
+    image_derivative_widths: list[int] = [128, 256, 512]
+    image_derivative_formats: list[str] = ["webp", "png"]
+    image_derivative_workers: int = 2
+    image_derivatives_pregenerate: bool = True
+    # In-memory LRU of served image bytes with ETags (see services/image_byte_cache.py)
+    image_byte_cache_mb: int = 64
+    # Sprite sheet of item (optionally NPC) thumbnails sent with game_started
+    # (see services/image_atlas.py); kinds ⊆ ["item", "npc"]
+    image_atlas_cell: int = 256
+    image_atlas_kinds: list[str] = ["item"]
+
     # Cloud Storage (optional — local-only when unset)
     gcs_bucket: Optional[str] = None
+    # Parallel GCS transfers (downloads, uploads, sync) — see storage_service.py
+    storage_transfer_workers: int = 8
+    # Cached GCS existence/metadata (see storage_service.py); misses expire sooner
+    storage_metadata_ttl_seconds: float = 300.0
+    storage_negative_ttl_seconds: float = 30.0
+    # Prefixes listed once at startup to fill that cache
+    storage_prime_prefixes: list[str] = ["experiences/", "generated_images/_content/"]
+
+    # Startup warm-up of quick-start scenarios (see services/cache_warmer.py)
+    warmup_enabled: bool = True
+    warmup_include_images: bool = True
+    warmup_concurrency: int = 4
+    # Finish image generation a previous instance left partial (see cache_warmer.py)
+    warmup_resume_images: bool = True
+    # Partial image manifests are leased to the generating instance (renewed at a
+    # third of the lease); the warmer only resumes runs whose lease has expired
+    image_generation_lease_seconds: float = 180.0
+    # When True, /health returns 503 until warm-up finishes (hold traffic)
+    warmup_gate_health: bool = False
 
     # Logging
     log_level: str = "INFO"
@@ -8,10 +8,21 @@ import logging
 import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.core.config import get_settings
 from app.api import npc, websocket, rooms, images
 from app.services.storage_service import storage
+from app.services.cache_warmer import get_cache_warmer
+from app.services.image_atlas import get_image_atlases
+from app.services.image_byte_cache import get_image_byte_cache
+from app.services.image_derivatives import get_image_derivatives
+from app.services.image_jobs import get_image_job_engine
+from app.services.llm_client import close_llm_client
+from app.services.llm_cache import get_llm_cache
+from app.services.llm_scheduler import get_llm_scheduler
+from app.services.npc_conversation_service import get_npc_conversation_service
+from app.services.npc_session_store import get_npc_session_store
 
 # Configure logging
 logging.basicConfig(
@@ -66,11 +77,19 @@ async def startup_event():
     logger.info(f"📡 Server running on {settings.host}:{settings.port}")
     logger.info(f"🤖 Using Gemini NPC model: {settings.gemini_npc_model}")
     logger.info(f"🏗️  Build: {BUILD_TIME}  git:{GIT_HASH}")
+    get_cache_warmer().start(
+        enabled=settings.warmup_enabled,
+        include_images=settings.warmup_include_images,
+        concurrency=settings.warmup_concurrency,
+        resume_images=settings.warmup_resume_images,
+        prime_prefixes=settings.storage_prime_prefixes,
+    )
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Run on application shutdown"""
+    await close_llm_client()
     logger.info("👋 Shutting down The Heist Backend")
 
 
@@ -92,12 +111,37 @@ async def root():
 async def health_check():
     """
     Detailed health check
-    Can be used by monitoring tools
+    Can be used by monitoring tools.
+    Reports cache warm-up progress; with WARMUP_GATE_HEALTH=true it returns
+    503 until the instance is warm so traffic can be held back.
     """
-    return {
-        "status": "healthy",
+    warmer = get_cache_warmer()
+    scheduler = get_llm_scheduler()
+    open_circuits = scheduler.open_circuits()
+    if not warmer.is_ready:
+        status = "warming"
+    elif open_circuits:
+        status = "degraded"  # still serving: NPC turns fall back to banked lines
+    else:
+        status = "healthy"
+    body = {
+        "status": status,
         "service": settings.app_name,
         "version": settings.app_version,
         "build_time": BUILD_TIME,
         "git_hash": GIT_HASH,
+        "warmup": warmer.status(),
+        "llm_circuits_open": open_circuits,
+        "llm_scheduler": scheduler.metrics(),
+        "npc_conversations": get_npc_conversation_service().metrics(),
+        "npc_sessions": get_npc_session_store().metrics(),
+        "llm_cache": get_llm_cache().metrics(),
+        "image_jobs": get_image_job_engine().metrics(),
+        "image_derivatives": get_image_derivatives().metrics(),
+        "image_byte_cache": get_image_byte_cache().metrics(),
+        "image_atlas": get_image_atlases().metrics(),
+        "storage": storage.metrics(),
     }
+    if settings.warmup_gate_health and not warmer.is_ready:
+        return JSONResponse(status_code=503, content=body)
+    return body
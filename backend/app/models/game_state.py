@@ -162,6 +162,12 @@ class NPCData(BaseModel):
     actions_available: List[NPCAction] = Field(default_factory=list, description="Actions this NPC can be convinced to perform")
     cover_options: List[NPCCoverOption] = Field(default_factory=list, description="Cover stories players can use with this NPC")
 
+    # Pre-generated canned lines for when the LLM misses its deadline (server-side only)
+    fallback_bank: Dict[str, List[str]] = Field(
+        default_factory=dict, exclude=True,
+        description="replies / rapport / steer / probe -> in-character canned lines"
+    )
+
 
 class Item(BaseModel):
     """An item that can be found, carried, and used"""
@@ -184,6 +190,7 @@ class GameState(BaseModel):
     """The complete state of an active game"""
     objective: str = Field(..., description="Main goal of the heist")
     scenario: str = Field(..., description="Scenario identifier")
+    experience_id: str = Field(default="", description="Compiled experience file + version (keys per-experience caches)")
     locations: List[Location] = Field(default_factory=list, description="All locations")
     tasks: Dict[str, Task] = Field(default_factory=dict, description="task_id -> Task")
     npcs: List[NPCData] = Field(default_factory=list, description="All NPCs in scenario")
@@ -192,6 +199,10 @@ class GameState(BaseModel):
     elapsed_minutes: int = Field(default=0, description="Time elapsed")
     briefing: Dict = Field(default_factory=dict, description="Team briefing with overview and role_briefings")
     narrative_beats: List[Dict] = Field(default_factory=list, description="Story beats triggered by task milestones")
+    npc_opening_banks: Dict[str, Dict[str, Dict[str, List[Dict]]]] = Field(
+        default_factory=dict,
+        description="npc_id -> {cover_id -> {difficulty -> [pre-generated greeting + first quick responses]}}"
+    )
     
     # NPC conversation tracking
     achieved_outcomes: Dict[str, List[str]] = Field(default_factory=dict, description="player_id -> [outcome_ids] (persists across cooldowns)")
@@ -78,6 +78,7 @@ class ConversationChatRequest(BaseModel):
     room_code: str = Field(..., description="Game room code")
     player_id: str = Field(..., description="Player in conversation")
     npc_id: str = Field(..., description="NPC being talked to")
+    stream: bool = Field(False, description="Also stream the NPC reply over the room WebSocket (npc_message_delta / npc_message_done)")
 
 
 class ConversationChatResponse(BaseModel):
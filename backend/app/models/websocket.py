@@ -27,6 +27,7 @@ class StartGameMessage(BaseModel):
     """Host starts the game"""
     type: Literal["start_game"] = "start_game"
     scenario: str = Field(..., description="Selected scenario ID")
+    progressive_images: Optional[bool] = Field(None, description="Start before images exist and stream them in (default: server setting)")
 
 
 class CompleteTaskMessage(BaseModel):
@@ -116,6 +117,8 @@ class GameStartedMessage(BaseModel):
     locations: List[Dict] = Field(default_factory=list, description="All locations in the scenario")
     starting_location: str = Field(..., description="Player's starting location")
     briefing: Dict = Field(default_factory=dict, description="Team briefing with overview and role_briefings")
+    images_pending: bool = Field(default=False, description="Images are still generating; show placeholders until image_ready")
+    image_atlas: Optional[Dict] = Field(default=None, description="Item thumbnail sprite sheet: url, size and frame map (see services/image_atlas.py)")
 
 
 class TaskUnlockedMessage(BaseModel):
@@ -144,6 +147,25 @@ class NPCResponseMessage(BaseModel):
     revealed_objectives: List[str] = Field(default_factory=list, description="Objectives revealed")
 
 
+class NPCMessageDeltaMessage(BaseModel):
+    """Partial NPC dialogue while a streamed reply is being generated"""
+    type: Literal["npc_message_delta"] = "npc_message_delta"
+    npc_id: str = Field(..., description="NPC speaking")
+    seq: int = Field(..., description="Frame sequence number within this reply (0-based)")
+    delta: str = Field(..., description="New text to append")
+
+
+class NPCMessageDoneMessage(BaseModel):
+    """Final frame of a streamed NPC reply"""
+    type: Literal["npc_message_done"] = "npc_message_done"
+    npc_id: str = Field(..., description="NPC speaking")
+    text: str = Field(..., description="Complete, cleaned NPC dialogue (replaces the streamed text)")
+    outcomes: List[str] = Field(default_factory=list, description="Outcome IDs achieved this turn")
+    rapport: int = Field(..., description="Current rapport level 0-5")
+    rapport_delta: int = Field(..., description="Rapport change this turn (x10 for precision)")
+    conversation_failed: bool = Field(default=False, description="True if the NPC ended the conversation")
+
+
 class PlayerMovedMessage(BaseModel):
     """Broadcast when player moves location"""
     type: Literal["player_moved"] = "player_moved"
@@ -152,6 +174,23 @@ class PlayerMovedMessage(BaseModel):
     location: str = Field(..., description="New location")
 
 
+class ImageReadyMessage(BaseModel):
+    """Broadcast during a progressive game start as each generated image lands"""
+    type: Literal["image_ready"] = "image_ready"
+    experience_id: str = Field(..., description="Experience the image belongs to")
+    kind: Literal["location", "item", "npc"] = Field(..., description="Asset type")
+    asset_id: str = Field(..., description="Location, item or NPC ID")
+    url: str = Field(..., description="Image URL under /api/images")
+
+
+class ImagesCompleteMessage(BaseModel):
+    """Broadcast when a progressive game start has finished generating images"""
+    type: Literal["images_complete"] = "images_complete"
+    experience_id: str = Field(..., description="Experience the images belong to")
+    success: bool = Field(..., description="False if some images could not be generated")
+    image_atlas: Optional[Dict] = Field(default=None, description="Item thumbnail sprite sheet, now that every image exists")
+
+
 class AllTasksCompleteMessage(BaseModel):
     """Broadcast when all players have completed all tasks — unlocks the Escape Now button"""
     type: Literal["all_tasks_complete"] = "all_tasks_complete"
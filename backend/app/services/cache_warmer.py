@@ -0,0 +1,209 @@
+"""
+Startup Cache Warmer
+
+Preloads the quick-start scenarios (shared_data/quick_scenarios.json) when
+the instance boots, so the first game start on a fresh Cloud Run instance
+doesn't pay GCS downloads and parsing:
+
+  0. Fill StorageService's GCS metadata cache from one listing per prefix
+  1. Pull + compile each experience into the ExperienceCache
+  2. Pre-encode the static game_started payloads (NPCs, locations)
+  3. Prime the local image cache by pulling each expected image from GCS
+  4. Resume image generation an earlier instance left partial (its
+     manifest still lists pending images)
+
+Runs in the background; progress and readiness are reported on /health.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+QUICK_SCENARIOS_PATH = Path(__file__).parent.parent.parent.parent / "shared_data" / "quick_scenarios.json"
+
+
+def load_quick_scenarios() -> List[Dict]:
+    """Return the quick-start scenario entries, or [] if the config is missing."""
+    try:
+        with open(QUICK_SCENARIOS_PATH) as f:
+            data = json.load(f)
+    except Exception:
+        return []
+    return data.get("scenarios", [])
+
+
+class CacheWarmer:
+    """
+    Background warm-up of quick-start experiences and their images.
+
+    State: "disabled" → "pending" → "warming" → "ready"
+    A scenario that fails to warm is recorded in `errors` but never blocks
+    readiness — it simply loads lazily on first use.
+    """
+
+    def __init__(self):
+        self.state: str = "pending"
+        self.scenarios_total: int = 0
+        self.scenarios_warmed: int = 0
+        self.images_primed: int = 0
+        self.errors: Dict[str, str] = {}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.images_resumed: int = 0
+        self._task: Optional[asyncio.Task] = None
+        self._resume_tasks: set = set()
+
+    @property
+    def is_ready(self) -> bool:
+        return self.state in ("ready", "disabled")
+
+    def start(self, enabled: bool = True, include_images: bool = True, concurrency: int = 4,
+              resume_images: bool = True, prime_prefixes: Optional[List[str]] = None) -> None:
+        """Kick off warm-up in the background. Call once from startup_event."""
+        if not enabled:
+            self.state = "disabled"
+            logger.info("🔥 Cache warm-up disabled")
+            return
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(
+            self._run(include_images, max(1, concurrency), resume_images, prime_prefixes or [])
+        )
+
+    def status(self) -> Dict:
+        elapsed = None
+        if self.started_at is not None:
+            elapsed = round((self.finished_at or time.time()) - self.started_at, 2)
+        return {
+            "state": self.state,
+            "ready": self.is_ready,
+            "scenarios_total": self.scenarios_total,
+            "scenarios_warmed": self.scenarios_warmed,
+            "images_primed": self.images_primed,
+            "image_generations_resumed": self.images_resumed,
+            "errors": self.errors,
+            "elapsed_seconds": elapsed,
+        }
+
+    async def _run(self, include_images: bool, concurrency: int, resume_images: bool = True,
+                   prime_prefixes: Optional[List[str]] = None) -> None:
+        self.state = "warming"
+        self.started_at = time.time()
+        await self._prime_storage(prime_prefixes or [])
+        entries = load_quick_scenarios()
+        self.scenarios_total = len(entries)
+        logger.info(f"🔥 Warming {len(entries)} quick-start scenarios (images={include_images})")
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _warm(entry: Dict):
+            async with semaphore:
+                try:
+                    primed, partial = await asyncio.to_thread(self._warm_entry, entry, include_images)
+                    self.scenarios_warmed += 1
+                    self.images_primed += primed
+                    if partial and resume_images:
+                        self._resume(*partial)
+                except FileNotFoundError:
+                    self.errors[entry.get("id", "?")] = "experience not generated yet"
+                except Exception as e:
+                    logger.warning(f"🔥 Warm-up failed for {entry.get('id', '?')}: {e}")
+                    self.errors[entry.get("id", "?")] = str(e)
+
+        try:
+            await asyncio.gather(*[_warm(e) for e in entries])
+        finally:
+            self.finished_at = time.time()
+            self.state = "ready"
+            logger.info(
+                f"🔥 Warm-up complete: {self.scenarios_warmed}/{self.scenarios_total} scenarios, "
+                f"{self.images_primed} images in {self.finished_at - self.started_at:.1f}s"
+            )
+
+    async def _prime_storage(self, prefixes: List[str]) -> None:
+        """One GCS listing per prefix instead of an exists() per key later."""
+        from app.services.storage_service import storage
+
+        for prefix in prefixes:
+            try:
+                await asyncio.to_thread(storage.prime, prefix)
+            except Exception as e:
+                logger.warning(f"🔥 Storage prime failed for {prefix}: {e}")
+
+    def _resume(self, cache_base: str, experience_dict: Dict) -> None:
+        """Finish an interrupted image generation in the background."""
+        from app.services.image_generator import generate_all_images_for_experience
+
+        logger.info(f"🔥 Resuming interrupted image generation for {cache_base}")
+        self.images_resumed += 1
+        task = asyncio.create_task(
+            generate_all_images_for_experience(cache_base, experience_dict, cache_name=cache_base)
+        )
+        self._resume_tasks.add(task)
+        task.add_done_callback(self._resume_tasks.discard)
+
+    def _warm_entry(self, entry: Dict, include_images: bool) -> Tuple[int, Optional[Tuple[str, Dict]]]:
+        """Compile one experience and prime its images. Runs in a worker thread.
+
+        Returns (images primed, (cache_base, experience_dict) if its image
+        manifest is partial and its lease has expired)."""
+        from app.services.experience_cache import get_experience_cache
+        from app.services.experience_loader import scenario_cache_filename
+
+        roles = sorted(entry["roles"])
+        payload = get_experience_cache().warm(entry["scenario_id"], roles)
+        if not include_images:
+            return 0, None
+
+        from app.services.image_byte_cache import get_image_byte_cache
+        from app.services.image_derivatives import MEDIA_TYPES, derivative_key, get_image_derivatives
+        from app.services.image_generator import expected_images
+        from app.services.image_store import (
+            manifest_is_complete, manifest_lease_live, read_manifest, resolve_image_key,
+        )
+        from app.services.storage_service import storage
+
+        cache_base = scenario_cache_filename(entry["scenario_id"], roles)
+        manifest = read_manifest(cache_base)
+        # Resume only abandoned runs: a live lease means another instance is on it
+        abandoned = manifest and not manifest_is_complete(manifest) and not manifest_lease_live(manifest)
+        partial = (cache_base, payload.experience_dict) if abandoned else None
+
+        # Load each image into the byte cache under the keys /api/images serves:
+        # the original, plus full-size derivatives that were already rendered
+        byte_cache = get_image_byte_cache()
+        formats = get_image_derivatives().formats
+        primed = 0
+        for fname in expected_images(payload.experience_dict):
+            key = resolve_image_key(cache_base, fname)
+            original = storage.local_path(key)
+            if original is None:
+                continue
+            full_size = original.stat().st_size
+            byte_cache.put(key, original.read_bytes(), MEDIA_TYPES["png"], full_size)
+            for fmt in formats:
+                if fmt == "png":
+                    continue
+                served_key = derivative_key(key, None, fmt)
+                local = storage.local_path(served_key)
+                if local is not None:
+                    byte_cache.put(served_key, local.read_bytes(), MEDIA_TYPES[fmt], full_size)
+            primed += 1
+        return primed, partial
+
+
+# Global cache warmer instance
+_cache_warmer: Optional[CacheWarmer] = None
+
+
+def get_cache_warmer() -> CacheWarmer:
+    """Get or create global CacheWarmer instance"""
+    global _cache_warmer
+    if _cache_warmer is None:
+        _cache_warmer = CacheWarmer()
+    return _cache_warmer
@@ -0,0 +1,142 @@
+"""
+Circuit Breaker — fail fast while the LLM provider is degraded
+
+Wrapped around every Gemini call by the LLMScheduler (one breaker per
+model). Without it, each NPC turn during an incident waits for its own
+timeout before falling back, and scenario generation burns through its
+retries one slow failure at a time.
+
+    closed     calls flow; outcomes land in a rolling window
+    open       calls fail immediately with CircuitOpenError (callers serve
+               their fallbacks) for `open_seconds`
+    half_open  one probe call is let through; success closes the circuit,
+               failure re-opens it
+
+The circuit opens when, over the last `window_seconds` with at least
+`min_calls` samples, the error rate or the slow-call rate (calls slower
+than `slow_call_seconds`) reaches its threshold. Rate-limit responses are
+not failures — the scheduler handles quota.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a provider whose circuit is open."""
+
+
+class CircuitBreaker:
+    """Rolling-window error/latency breaker. Thread-safe."""
+
+    def __init__(
+        self,
+        name: str,
+        window_seconds: float = 30.0,
+        min_calls: int = 8,
+        error_rate: float = 0.5,
+        slow_call_seconds: float = 12.0,
+        slow_rate: float = 0.5,
+        open_seconds: float = 15.0,
+    ):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_rate = slow_rate
+        self.open_seconds = open_seconds
+
+        self.state = CLOSED
+        self.opened_at: Optional[float] = None
+        self.times_opened = 0
+        self.rejected = 0
+        self._probe_in_flight = False
+        self._probe_id = 0  # token of the current half-open probe
+        # (timestamp, ok, elapsed)
+        self._window: Deque[Tuple[float, bool, float]] = deque()
+        self._lock = threading.Lock()
+
+    def before_call(self) -> int:
+        """Raise CircuitOpenError unless a call may go out now.
+
+        Returns the call's probe token: non-zero for the one half-open probe,
+        0 otherwise. Pass it back to record / release_probe."""
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.open_seconds:
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+                logger.info(f"🔌 LLM circuit {self.name}: half-open, probing")
+            if self.state == CLOSED:
+                return 0
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                self._probe_id += 1
+                return self._probe_id
+            self.rejected += 1
+        raise CircuitOpenError(f"LLM circuit for {self.name} is {self.state}")
+
+    def record(self, ok: bool, elapsed: float, probe: int = 0) -> None:
+        """Record the outcome of a call admitted by before_call (probe: its token)."""
+        now = time.monotonic()
+        with self._lock:
+            if self.state == HALF_OPEN:
+                if not probe or probe != self._probe_id:
+                    return  # admitted before the circuit opened: not the probe
+                self._probe_in_flight = False
+                if ok and elapsed < self.slow_call_seconds:
+                    self.state = CLOSED
+                    self._window.clear()
+                    logger.info(f"🔌 LLM circuit {self.name}: probe succeeded, closed")
+                else:
+                    self._open(now, "probe failed")
+                return
+            if self.state == OPEN:
+                return  # a call admitted before the circuit opened
+
+            self._window.append((now, ok, elapsed))
+            while self._window and now - self._window[0][0] > self.window_seconds:
+                self._window.popleft()
+            calls = len(self._window)
+            if calls < self.min_calls:
+                return
+            errors = sum(1 for _, good, _ in self._window if not good)
+            slow = sum(1 for _, _, took in self._window if took >= self.slow_call_seconds)
+            if errors / calls >= self.error_rate:
+                self._open(now, f"{errors}/{calls} calls failed")
+            elif slow / calls >= self.slow_rate:
+                self._open(now, f"{slow}/{calls} calls slower than {self.slow_call_seconds:.0f}s")
+
+    def release_probe(self, probe: int) -> None:
+        """A half-open probe ended without an outcome (e.g. cancelled) — allow another."""
+        with self._lock:
+            if probe and probe == self._probe_id:
+                self._probe_in_flight = False
+
+    def _open(self, now: float, reason: str) -> None:
+        self.state = OPEN
+        self.opened_at = now
+        self.times_opened += 1
+        self._window.clear()
+        logger.warning(f"🔌 LLM circuit {self.name}: OPEN for {self.open_seconds:.0f}s ({reason})")
+
+    def status(self) -> Dict:
+        with self._lock:
+            calls = len(self._window)
+            errors = sum(1 for _, good, _ in self._window if not good)
+            return {
+                "state": self.state,
+                "window_calls": calls,
+                "window_error_rate": round(errors / calls, 3) if calls else 0.0,
+                "times_opened": self.times_opened,
+                "rejected": self.rejected,
+            }
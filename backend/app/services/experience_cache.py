@@ -0,0 +1,131 @@
+"""
+Experience Cache
+Keeps compiled experiences in memory so repeated game starts skip disk/GCS
+reads and JSON/markdown parsing.
+
+Each cached entry holds a pristine GameState template plus the static,
+pre-encoded payloads that every game start sends (NPC list, location list,
+image-generation input). Rooms always receive a deep copy of the template,
+so in-game mutations never leak between rooms.
+
+Usage:
+    from app.services.experience_cache import get_experience_cache
+
+    cache = get_experience_cache()
+    game_state = cache.get_game_state("museum_gala_vault", ["hacker", "mastermind"])
+    payload = cache.get_static_payload(cache_base)
+"""
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from app.models.game_state import GameState
+from app.services.experience_loader import ExperienceLoader, scenario_cache_filename
+
+logger = logging.getLogger(__name__)
+
+
+def build_experience_dict(game_state: GameState) -> Dict:
+    """Build the image-generation input dict for a loaded experience."""
+    return {
+        'scenario_id': game_state.scenario,
+        'objective': game_state.objective,
+        'locations': [loc.model_dump() for loc in game_state.locations],
+        'items_by_location': {
+            loc: [item.model_dump() for item in items]
+            for loc, items in game_state.items_by_location.items()
+        },
+        'npcs': [npc.model_dump() for npc in game_state.npcs]
+    }
+
+
+@dataclass
+class StaticPayload:
+    """Pre-encoded parts of the game_started message that never change per room."""
+    npcs: List[Dict] = field(default_factory=list)
+    locations: List[Dict] = field(default_factory=list)
+    experience_dict: Dict = field(default_factory=dict)
+
+
+@dataclass
+class _CacheEntry:
+    template: GameState
+    payload: StaticPayload
+
+
+class ExperienceCache:
+    """
+    In-memory cache of compiled experiences keyed by scenario cache filename.
+
+    Thread-safe: warm-up runs loads in worker threads while request handlers
+    read from the event loop.
+    """
+
+    def __init__(self, experiences_dir: str = "experiences"):
+        self._loader = ExperienceLoader(experiences_dir=experiences_dir)
+        self._entries: Dict[str, _CacheEntry] = {}
+        self._lock = threading.Lock()
+
+    def get_game_state(self, scenario_id: str, roles: List[str]) -> GameState:
+        """
+        Return a fresh GameState for this scenario + role set.
+
+        Compiles and caches the experience on first use. Raises
+        FileNotFoundError (uncached) when the experience doesn't exist yet.
+        """
+        entry = self._load(scenario_id, roles)
+        return entry.template.model_copy(deep=True)
+
+    def get_static_payload(self, cache_base: str) -> Optional[StaticPayload]:
+        """Return the pre-encoded payload for a compiled experience, if cached."""
+        with self._lock:
+            entry = self._entries.get(cache_base)
+        return entry.payload if entry else None
+
+    def warm(self, scenario_id: str, roles: List[str]) -> StaticPayload:
+        """Compile and cache an experience without handing out a copy."""
+        return self._load(scenario_id, roles).payload
+
+    def is_cached(self, cache_base: str) -> bool:
+        with self._lock:
+            return cache_base in self._entries
+
+    def invalidate(self, cache_base: str) -> None:
+        """Drop a cached experience (e.g. after it was regenerated)."""
+        with self._lock:
+            if self._entries.pop(cache_base, None) is not None:
+                logger.info(f"🧹 Experience cache invalidated: {cache_base}")
+
+    def _load(self, scenario_id: str, roles: List[str]) -> _CacheEntry:
+        cache_base = scenario_cache_filename(scenario_id, roles)
+        with self._lock:
+            entry = self._entries.get(cache_base)
+        if entry is not None:
+            return entry
+
+        template = self._loader.load_experience(scenario_id, roles)
+        payload = StaticPayload(
+            npcs=[npc.model_dump(mode='json') for npc in template.npcs],
+            locations=[loc.model_dump(mode='json') for loc in template.locations],
+            experience_dict=build_experience_dict(template),
+        )
+        entry = _CacheEntry(template=template, payload=payload)
+        with self._lock:
+            # Another thread may have compiled it meanwhile — keep the first one
+            entry = self._entries.setdefault(cache_base, entry)
+        logger.info(f"📦 Experience cached: {cache_base}")
+        return entry
+
+
+# Global experience cache instance
+_experience_cache: Optional[ExperienceCache] = None
+
+
+def get_experience_cache() -> ExperienceCache:
+    """Get or create global ExperienceCache instance"""
+    global _experience_cache
+    if _experience_cache is None:
+        _experience_cache = ExperienceCache()
+    return _experience_cache
@@ -24,6 +24,11 @@ def scenario_cache_filename(scenario_id: str, roles: List[str]) -> str:
     roles_part = "_".join(sorted(roles))
     return f"generated_{scenario_id}_{roles_part}"
 
+
+def experience_version_id(path: Path) -> str:
+    """Cache filename plus file version, e.g. "generated_museum_gala_vault_hacker@1718000000"."""
+    return f"{path.stem}@{int(path.stat().st_mtime)}"
+
 from app.models.game_state import (
     GameState,
     Task,
@@ -124,7 +129,9 @@ class ExperienceLoader:
             logger.info(f"Loading experience from markdown: {md_local}")
             with open(md_local, 'r') as f:
                 content = f.read()
-            return self._parse_markdown(content, scenario, selected_roles)
+            game_state = self._parse_markdown(content, scenario, selected_roles)
+            game_state.experience_id = experience_version_id(md_local)
+            return game_state
 
         logger.error(f"Experience file not found: {filename}")
         raise FileNotFoundError(f"Experience file not found: {filename}.md")
@@ -159,6 +166,7 @@ class ExperienceLoader:
         
         # Parse NPCs
         npcs = []
+        fallback_banks = data.get('npc_fallback_banks', {})
         for npc_data in data.get('npcs', []):
             # Parse information known
             information_known = []
@@ -205,7 +213,8 @@ class ExperienceLoader:
                 attitude=npc_data.get('attitude', 'professional'),
                 details=npc_data.get('details', ''),
                 relationships=npc_data.get('relationships', ''),
-                story_context=npc_data.get('story_context', '')
+                story_context=npc_data.get('story_context', ''),
+                fallback_bank=fallback_banks.get(npc_data['id'], {})
             ))
         
         # Parse items by location
@@ -288,7 +297,9 @@ class ExperienceLoader:
             timeline_minutes=data.get('timeline_minutes', 120),
             elapsed_minutes=0,
             briefing=data.get('briefing', {}),
-            narrative_beats=data.get('narrative_beats', [])
+            narrative_beats=data.get('narrative_beats', []),
+            npc_opening_banks=data.get('npc_opening_banks', {}),
+            experience_id=experience_version_id(json_path),
         )
         
         logger.info(f"✅ Loaded scenario from JSON: {len(tasks)} tasks, {len(npcs)} NPCs, {len(locations)} locations, {len(game_state.narrative_beats)} narrative beats")
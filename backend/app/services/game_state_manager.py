@@ -9,6 +9,7 @@ from datetime import datetime
 
 from app.models.game_state import GameState, Task, TaskStatus, TaskType
 from app.models.room import GameRoom, Item
+from app.services.npc_session_store import get_npc_session_store
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +42,8 @@ class GameStateManager:
             game_state: GameState to store
         """
         self.game_states[room_code] = game_state
+        # A new game in this room: conversations from the previous one are stale
+        get_npc_session_store().drop_room(room_code)
         logger.info(f"🎮 Game state set for room {room_code}: {len(game_state.tasks)} tasks")
     
     def get_game_state(self, room_code: str) -> Optional[GameState]:
@@ -461,6 +464,7 @@ class GameStateManager:
         """
         if room_code in self.game_states:
             del self.game_states[room_code]
+            get_npc_session_store().drop_room(room_code)
             logger.info(f"🧹 Cleaned up game state for room {room_code}")
             return True
         return False
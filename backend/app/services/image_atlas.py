@@ -0,0 +1,190 @@
+"""
+Image Atlas — one sprite sheet per experience for item (and NPC) thumbnails
+
+At game start the client fetched every item image on its own
+(/api/images/{experience_id}/item/{item_id}), dozens of round trips over a
+mobile link. An atlas packs those images, scaled to one cell size, into a
+single grid image plus a JSON frame map; game_started carries the map, so
+thumbnails cost one image request.
+
+Atlases are keyed by a hash of the frames' content hashes and the cell
+size, so experiences with the same items share one (like content blobs):
+
+  generated_images/_atlas/{hash}.png    the sheet
+  generated_images/_atlas/{hash}.json   {"url", "width", "height", "cell",
+                                         "frames": {"item:<id>": {x, y, w, h}}}
+
+Frame names use bare asset ids (no "item_"/"npc_" prefix), matching the
+ids the per-image endpoints accept.
+
+Usage:
+    atlas = await asyncio.to_thread(get_image_atlases().ensure, experience_id)
+"""
+
+import hashlib
+import json
+import logging
+import math
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ATLAS_PREFIX = "generated_images/_atlas"
+
+
+def atlas_key(atlas_hash: str) -> str:
+    return f"{ATLAS_PREFIX}/{atlas_hash}.png"
+
+
+def atlas_map_key(atlas_hash: str) -> str:
+    return f"{ATLAS_PREFIX}/{atlas_hash}.json"
+
+
+def atlas_frames(images: Dict[str, str], kinds: List[str]) -> List[Tuple[str, str]]:
+    """[(frame name, content hash)] for manifest images of the given kinds, sorted."""
+    frames = []
+    for filename, content_hash in images.items():
+        kind, _, rest = filename.partition("_")
+        if kind in kinds and rest.endswith(".png"):
+            frames.append((f"{kind}:{rest[:-4]}", content_hash))
+    return sorted(frames)
+
+
+def atlas_hash(frames: List[Tuple[str, str]], cell: int) -> str:
+    payload = json.dumps({"cell": cell, "frames": frames})
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def render_atlas(sources: List[Tuple[str, Path]], cell: int, target: Path) -> Dict:
+    """Blocking: paste each source, scaled into a cell×cell square, into a grid."""
+    from PIL import Image
+
+    columns = math.ceil(math.sqrt(len(sources)))
+    rows = math.ceil(len(sources) / columns)
+    sheet = Image.new("RGBA", (columns * cell, rows * cell), (0, 0, 0, 0))
+    frames = {}
+    for index, (name, source) in enumerate(sources):
+        x, y = (index % columns) * cell, (index // columns) * cell
+        with Image.open(source) as img:
+            img = img.convert("RGBA")
+            img.thumbnail((cell, cell), Image.Resampling.LANCZOS)
+            # Centre non-square images inside their cell
+            ox, oy = x + (cell - img.width) // 2, y + (cell - img.height) // 2
+            sheet.paste(img, (ox, oy))
+            frames[name] = {"x": ox, "y": oy, "w": img.width, "h": img.height}
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_suffix(target.suffix + ".tmp")
+    sheet.save(tmp, format="PNG", optimize=True)
+    tmp.replace(target)
+    return {"width": sheet.width, "height": sheet.height, "cell": cell, "frames": frames}
+
+
+class ImageAtlases:
+    """Builds and memoizes per-experience atlases from image manifests."""
+
+    def __init__(self, cell: int = 256, kinds: Optional[List[str]] = None, max_entries: int = 256):
+        self.cell = cell
+        self.kinds = kinds or ["item"]
+        self.max_entries = max_entries
+        # atlas hash → map, complete and partial alike (LRU)
+        self._maps: "OrderedDict[str, Dict]" = OrderedDict()
+        self._build_lock = threading.Lock()
+        self.stats: Dict[str, int] = {"built": 0, "partial": 0, "memo_hits": 0, "loaded": 0}
+
+    def _memoized(self, atlas_hash_: str) -> Optional[Dict]:
+        atlas = self._maps.get(atlas_hash_)
+        if atlas is not None:
+            self._maps.move_to_end(atlas_hash_)
+        return atlas
+
+    def _remember(self, atlas_hash_: str, atlas: Dict) -> Dict:
+        self._maps[atlas_hash_] = atlas
+        self._maps.move_to_end(atlas_hash_)
+        while len(self._maps) > self.max_entries:
+            self._maps.popitem(last=False)
+        return atlas
+
+    def _load(self, atlas_hash_: str) -> Optional[Dict]:
+        """A sheet an earlier call (or another instance) already stored."""
+        from app.services.storage_service import storage
+
+        text = storage.read_text(atlas_map_key(atlas_hash_))
+        if text and storage.local_path(atlas_key(atlas_hash_)) is not None:
+            self.stats["loaded"] += 1
+            return self._remember(atlas_hash_, json.loads(text))
+        return None
+
+    def ensure(self, experience_id: str) -> Optional[Dict]:
+        """Blocking: the experience's atlas map, building the sheet if needed.
+
+        Returns None when the experience has no manifest or none of its
+        atlas images exist yet. Atlases missing some frames are keyed by
+        the frames they do have, so repeated calls during a progressive
+        start reuse one sheet until more images land."""
+        from app.services.image_store import content_key, manifest_images, read_manifest
+        from app.services.storage_service import storage
+
+        frames = atlas_frames(manifest_images(read_manifest(experience_id)), self.kinds)
+        if not frames:
+            return None
+        full_hash = atlas_hash(frames, self.cell)
+        with self._build_lock:
+            atlas = self._memoized(full_hash)
+            if atlas is not None:
+                self.stats["memo_hits"] += 1
+                return atlas
+            atlas = self._load(full_hash)
+            if atlas is not None:
+                return atlas
+
+            sources = []
+            present = []
+            for name, content_hash in frames:
+                path = storage.local_path(content_key(content_hash))
+                if path is not None:
+                    sources.append((name, path))
+                    present.append((name, content_hash))
+            if not sources:
+                return None
+
+            complete = len(present) == len(frames)
+            h = full_hash if complete else atlas_hash(present, self.cell)
+            if not complete:
+                atlas = self._memoized(h) or self._load(h)
+                if atlas is not None:
+                    self.stats["memo_hits"] += 1
+                    return atlas
+            try:
+                atlas = render_atlas(sources, self.cell, storage.local_path_for(atlas_key(h)))
+            except Exception as e:
+                logger.warning(f"Atlas for {experience_id} failed: {e}")
+                return None
+            atlas = {"atlas": h, "url": f"/api/images/atlas/{h}", **atlas}
+            storage.upload_local(atlas_key(h))
+            storage.write_text(atlas_map_key(h), json.dumps(atlas))
+            self._remember(h, atlas)
+            self.stats["built" if complete else "partial"] += 1
+            logger.info(f"🧩 Atlas for {experience_id}: {len(sources)}/{len(frames)} frames "
+                        f"({atlas['width']}x{atlas['height']})")
+            return atlas
+
+    def metrics(self) -> Dict:
+        return {"cell": self.cell, "kinds": self.kinds, "memoized": len(self._maps), **self.stats}
+
+
+# Global atlas builder instance
+_image_atlases: Optional[ImageAtlases] = None
+
+
+def get_image_atlases() -> ImageAtlases:
+    """Get or create global ImageAtlases instance"""
+    global _image_atlases
+    if _image_atlases is None:
+        from app.core.config import get_settings
+        settings = get_settings()
+        _image_atlases = ImageAtlases(cell=settings.image_atlas_cell, kinds=settings.image_atlas_kinds)
+    return _image_atlases
@@ -0,0 +1,118 @@
+"""
+Image Byte Cache — hot generated images served from memory
+
+Every image request used to resolve the file through StorageService
+(filesystem exists(), maybe a GCS download) and stream it from disk with
+no validator. When twelve players load the same scenario, they ask for the
+same few dozen images at once. The cache keeps recently served images'
+bytes in a size-bounded LRU with a strong ETag precomputed from a content
+hash, so repeat requests are answered from memory and revalidations
+(If-None-Match) with 304 Not Modified.
+
+Keys are storage keys of what was actually served (original or
+derivative), so thumbnails and full-size images are cached separately.
+
+Usage:
+    cache = get_image_byte_cache()
+    entry = cache.get(key) or cache.put(key, data, "image/webp", full_size)
+    if cache.not_modified(request.headers.get("if-none-match"), entry): ...
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+
+@dataclass(frozen=True)
+class CachedImage:
+    data: bytes
+    etag: str          # quoted strong validator
+    media_type: str
+    full_size: int     # bytes of the full-size original (bandwidth accounting)
+
+
+class ImageByteCache:
+    """Thread-safe LRU of image bytes bounded by total size."""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, max_entry_bytes: int = 8 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self._entries: "OrderedDict[str, CachedImage]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0, "not_modified": 0}
+
+    def get(self, key: str) -> Optional[CachedImage]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry
+
+    def put(self, key: str, data: bytes, media_type: str, full_size: int) -> CachedImage:
+        """Cache bytes (unless larger than max_entry_bytes) and return the entry."""
+        entry = CachedImage(
+            data=data,
+            etag=f'"{hashlib.sha256(data).hexdigest()[:32]}"',
+            media_type=media_type,
+            full_size=full_size,
+        )
+        if len(data) > self.max_entry_bytes:
+            return entry
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous.data)
+            self._entries[key] = entry
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.data)
+                self.stats["evictions"] += 1
+        return entry
+
+    def not_modified(self, if_none_match: Optional[str], entry: CachedImage) -> bool:
+        """True when the client's If-None-Match already names this entry."""
+        if not if_none_match:
+            return False
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if "*" in tags or entry.etag in tags:
+            with self._lock:
+                self.stats["not_modified"] += 1
+            return True
+        return False
+
+    def invalidate_prefix(self, prefix: str) -> None:
+        """Drop entries under a key prefix (e.g. an experience's legacy folder)."""
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                self._bytes -= len(self._entries.pop(key).data)
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                **self.stats,
+                "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+            }
+
+
+# Global cache instance
+_image_byte_cache: Optional[ImageByteCache] = None
+
+
+def get_image_byte_cache() -> ImageByteCache:
+    """Get or create global ImageByteCache instance"""
+    global _image_byte_cache
+    if _image_byte_cache is None:
+        from app.core.config import get_settings
+        _image_byte_cache = ImageByteCache(max_bytes=get_settings().image_byte_cache_mb * 1024 * 1024)
+    return _image_byte_cache
@@ -0,0 +1,232 @@
+"""
+Image Derivatives — resized / re-encoded variants of generated images
+
+The game only needs full-size PNGs for location backdrops; inventory
+slots and NPC lists show small thumbnails. A derivative is an original
+image resized to one of a few known widths and encoded as WebP (or AVIF
+when Pillow supports it) if the client's Accept header allows, else PNG.
+
+  - Lazy: produced on first request with Pillow in a small thread pool,
+    then cached in storage next to the original ({stem}_w256.webp)
+  - Eager: image generation queues image_derivative_widths in every
+    encoding clients ask for on the same pool, so the first player
+    doesn't pay for it and generation doesn't wait for it
+  - Widths are snapped up to the nearest known size, so arbitrary ?w=
+    values can't multiply the cache
+
+Bytes served against what the full PNGs would have cost are tracked per
+experience (i.e. per game start's image load) and reported on /health.
+
+Usage:
+    derivatives = get_image_derivatives()
+    fmt = negotiate_format(request.headers.get("accept", ""), derivatives.formats)
+    path = await derivatives.derivative(key, derivatives.snap_width(w), fmt)
+"""
+
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MEDIA_TYPES = {"png": "image/png", "webp": "image/webp", "avif": "image/avif"}
+_SAVE_OPTIONS = {
+    "png": {"format": "PNG", "optimize": True},
+    "webp": {"format": "WEBP", "quality": 82, "method": 4},
+    "avif": {"format": "AVIF", "quality": 60},
+}
+
+
+def _avif_supported() -> bool:
+    try:
+        from PIL import features
+        return bool(features.check("avif"))
+    except Exception:
+        return False
+
+
+def negotiate_format(accept: str, formats: List[str]) -> str:
+    """Best of `formats` the client accepts: avif > webp > png."""
+    accept = (accept or "").lower()
+    for fmt in ("avif", "webp"):
+        if fmt in formats and MEDIA_TYPES[fmt] in accept:
+            return fmt
+    return "png"
+
+
+def derivative_key(original_key: str, width: Optional[int], fmt: str) -> str:
+    """Storage key of a derivative, next to its original."""
+    stem = original_key.rsplit(".", 1)[0]
+    return f"{stem}{f'_w{width}' if width else ''}.{fmt}"
+
+
+def render_derivative(source: Path, target: Path, width: Optional[int], fmt: str) -> None:
+    """Blocking: resize (keeping aspect ratio, never upscaling) and encode."""
+    from PIL import Image
+
+    with Image.open(source) as img:
+        if width and width < img.width:
+            height = max(1, round(img.height * width / img.width))
+            img = img.resize((width, height), Image.Resampling.LANCZOS)
+        if fmt != "png" and img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA")
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(target.suffix + ".tmp")
+        img.save(tmp, **_SAVE_OPTIONS[fmt])
+        tmp.replace(target)
+
+
+class ImageDerivatives:
+    """Lazy + pre-generated image derivatives with per-experience bandwidth stats."""
+
+    def __init__(self, widths: List[int], formats: List[str], max_workers: int = 2,
+                 tracked_experiences: int = 50):
+        self.widths = sorted(set(w for w in widths if w > 0))
+        self.formats = [f for f in formats if f in MEDIA_TYPES and (f != "avif" or _avif_supported())]
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="img-deriv")
+        self._inflight: Dict[str, "asyncio.Future"] = {}
+        self._lock = threading.Lock()
+        self._tracked = tracked_experiences
+        self._by_experience: "OrderedDict[str, Dict[str, int]]" = OrderedDict()
+        self.stats: Dict[str, int] = {
+            "requests": 0, "derivative_hits": 0, "rendered_lazily": 0, "pregenerated": 0,
+            "bytes_served": 0, "bytes_full_size": 0,
+        }
+
+    def snap_width(self, width: Optional[int]) -> Optional[int]:
+        """The smallest known width >= width; None (full size) beyond the largest."""
+        if not width or width <= 0:
+            return None
+        for known in self.widths:
+            if known >= width:
+                return known
+        return None
+
+    async def derivative(self, original_key: str, width: Optional[int], fmt: str) -> Optional[Path]:
+        """Local path of the derivative, rendering and storing it on first use."""
+        from app.services.storage_service import storage
+
+        if width is None and fmt == "png":
+            return await storage.local_path_async(original_key)
+        key = derivative_key(original_key, width, fmt)
+        local = await storage.local_path_async(key)
+        if local is not None:
+            self.stats["derivative_hits"] += 1
+            return local
+
+        # Coalesce concurrent first requests for the same derivative
+        loop = asyncio.get_running_loop()
+        future = self._inflight.get(key)
+        if future is None:
+            future = loop.run_in_executor(self._pool, self._render, original_key, width, fmt)
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+            self.stats["rendered_lazily"] += 1
+        return await asyncio.shield(future)
+
+    def _render(self, original_key: str, width: Optional[int], fmt: str) -> Optional[Path]:
+        """Blocking: render one derivative from the original and store it."""
+        from app.services.storage_service import storage
+
+        source = storage.local_path(original_key)
+        if source is None:
+            return None
+        key = derivative_key(original_key, width, fmt)
+        target = storage.local_path_for(key)
+        try:
+            render_derivative(source, target, width, fmt)
+        except Exception as e:
+            logger.warning(f"Derivative {key} failed: {e}")
+            return None
+        storage.upload_local(key)
+        return target
+
+    def pregenerate(self, original_key: str) -> int:
+        """Blocking: render every known width × format for a new image. Returns count.
+
+        PNGs at or above the original's width would only re-encode it and
+        are skipped."""
+        from PIL import Image
+        from app.services.storage_service import storage
+
+        source = storage.local_path(original_key)
+        if source is None:
+            return 0
+        with Image.open(source) as img:
+            original_width = img.width
+        count = 0
+        for width in self.widths:
+            for fmt in self.formats:
+                if fmt == "png" and width >= original_width:
+                    continue
+                if self._render(original_key, width, fmt) is not None:
+                    count += 1
+        with self._lock:
+            self.stats["pregenerated"] += count
+        return count
+
+    def pregenerate_in_background(self, original_key: str) -> None:
+        """Queue pregenerate on the derivatives pool without waiting for it."""
+        def _run():
+            try:
+                self.pregenerate(original_key)
+            except Exception as e:
+                logger.warning(f"Pregenerating derivatives of {original_key} failed: {e}")
+
+        self._pool.submit(_run)
+
+    def record(self, experience_id: str, served_bytes: int, full_bytes: int) -> None:
+        """Account one image response against what the full-size PNG would have cost."""
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["bytes_served"] += served_bytes
+            self.stats["bytes_full_size"] += full_bytes
+            entry = self._by_experience.pop(experience_id, None) or {
+                "requests": 0, "bytes_served": 0, "bytes_full_size": 0,
+            }
+            entry["requests"] += 1
+            entry["bytes_served"] += served_bytes
+            entry["bytes_full_size"] += full_bytes
+            self._by_experience[experience_id] = entry
+            while len(self._by_experience) > self._tracked:
+                self._by_experience.popitem(last=False)
+
+    def metrics(self) -> Dict:
+        """Bandwidth saved overall and per experience (one game start's image load)."""
+        def _saved(entry: Dict[str, int]) -> Dict:
+            saved = entry["bytes_full_size"] - entry["bytes_served"]
+            return {
+                **entry,
+                "bytes_saved": saved,
+                "saved_pct": round(100 * saved / entry["bytes_full_size"], 1) if entry["bytes_full_size"] else 0.0,
+            }
+
+        with self._lock:
+            return {
+                "widths": self.widths,
+                "formats": self.formats,
+                **_saved(self.stats),
+                "per_experience": {exp: _saved(e) for exp, e in reversed(self._by_experience.items())},
+            }
+
+
+# Global derivatives instance
+_image_derivatives: Optional[ImageDerivatives] = None
+
+
+def get_image_derivatives() -> ImageDerivatives:
+    """Get or create global ImageDerivatives instance"""
+    global _image_derivatives
+    if _image_derivatives is None:
+        from app.core.config import get_settings
+        settings = get_settings()
+        _image_derivatives = ImageDerivatives(
+            widths=settings.image_derivative_widths,
+            formats=settings.image_derivative_formats,
+            max_workers=settings.image_derivative_workers,
+        )
+    return _image_derivatives
@@ -1,17 +1,24 @@
 """
 Image generation service with manifest-based staleness detection.
 
-Each experience's images are stored under generated_images/{experience_id}/.
-A _manifest.json file tracks which images belong to the current scenario
-version via a content hash of the experience data. When the scenario is
-regenerated (new locations, items, NPCs), the hash changes and stale
-images are cleaned up before new ones are generated.
+Images live in a content-addressed store (services/image_store.py), keyed
+by a hash of each asset's prompt inputs. Each experience's _manifest.json
+only maps its image filenames (location_lobby.png, ...) to content hashes,
+so regenerating a scenario reuses every image whose prompt is unchanged
+and renders only the new or edited ones.
 """
 
 import asyncio
 import hashlib
 import json
 import logging
+import os
+import shutil
+import socket
+import threading
+import time
+import uuid
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
@@ -19,42 +26,63 @@ from typing import Awaitable, Callable, Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
-_generation_tasks: dict[str, bool] = {}
-_MANIFEST_FILENAME = "_manifest.json"
 
 
-# ------------------------------------------------------------------
-# Manifest helpers
-# ------------------------------------------------------------------
+class _GenerationRun:
+    """One in-flight generation, shared by every room starting the experience.
 
-def _content_hash(experience_dict: Dict) -> str:
-    """Deterministic MD5 hash of the experience data that drives image generation.
-    
-    Only hashes fields that affect image content (locations, items, NPCs) —
-    metadata like scenario_id/objective are excluded so adding context fields
-    doesn't invalidate existing manifests.
-    """
-    image_data = {
-        k: experience_dict[k]
-        for k in ("locations", "items_by_location", "npcs")
-        if k in experience_dict
-    }
-    serialized = json.dumps(image_data, sort_keys=True, default=str)
-    return hashlib.md5(serialized.encode()).hexdigest()
+    Progress messages and image_ready events fan out to all subscribers;
+    late subscribers get the latest progress message and every image that
+    already landed replayed, then await the same task and its result."""
 
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self._broadcasts: List[Callable[[str], Awaitable[None]]] = []
+        self._image_ready: List[Callable[[str, str, str], Awaitable[None]]] = []
+        self._last_message: Optional[str] = None
+        self._ready: List[tuple] = []
+
+    async def subscribe(self, broadcast=None, on_image_ready=None) -> None:
+        if broadcast:
+            self._broadcasts.append(broadcast)
+            if self._last_message:
+                await self._safe(broadcast, self._last_message)
+        if on_image_ready:
+            self._image_ready.append(on_image_ready)
+            for event in list(self._ready):
+                await self._safe(on_image_ready, *event)
+
+    def unsubscribe(self, broadcast=None, on_image_ready=None) -> None:
+        if broadcast in self._broadcasts:
+            self._broadcasts.remove(broadcast)
+        if on_image_ready in self._image_ready:
+            self._image_ready.remove(on_image_ready)
+
+    async def broadcast(self, message: str) -> None:
+        self._last_message = message
+        for callback in list(self._broadcasts):
+            await self._safe(callback, message)
+
+    async def image_ready(self, kind: str, asset_id: str, path: str) -> None:
+        self._ready.append((kind, asset_id, path))
+        for callback in list(self._image_ready):
+            await self._safe(callback, kind, asset_id, path)
+
+    @staticmethod
+    async def _safe(callback, *args) -> None:
+        # One room's dead socket must not stall the others
+        try:
+            await callback(*args)
+        except Exception as e:
+            logger.warning(f"⚠️ Image progress subscriber failed: {e}")
+
+
+_generation_runs: Dict[str, _GenerationRun] = {}
 
-def _expected_filenames(locations: List[Dict], items: List[Dict], npcs: List[Dict]) -> list[str]:
-    """Build the exact set of image filenames expected for this experience."""
-    names: list[str] = []
-    for loc in locations:
-        names.append(f"location_{loc['id']}.png")
-    for item in items:
-        clean_id = item['id'].removeprefix("item_")
-        names.append(f"item_{clean_id}.png")
-    for npc in npcs:
-        names.append(f"npc_{npc['id']}.png")
-    return sorted(names)
 
+# ------------------------------------------------------------------
+# Manifest helpers
+# ------------------------------------------------------------------
 
 @dataclass
 class ImageCheckResult:
@@ -62,33 +90,185 @@ class ImageCheckResult:
     missing: list[str] = field(default_factory=list)
     stale: list[str] = field(default_factory=list)
     present: list[str] = field(default_factory=list)
+    images: Dict[str, str] = field(default_factory=dict)  # filename → content hash
 
 
-def _read_manifest(experience_id: str) -> Optional[dict]:
-    """Read manifest from local disk or GCS via StorageService."""
-    from app.services.storage_service import storage
-    key = f"generated_images/{experience_id}/{_MANIFEST_FILENAME}"
-    text = storage.read_text(key)
-    if text:
-        try:
-            return json.loads(text)
-        except json.JSONDecodeError:
-            logger.warning(f"Corrupt manifest for {experience_id}, treating as missing")
-    return None
-
+def _write_manifest(experience_id: str, cache_name: str, images: Dict[str, str],
+                    pending: Optional[List[str]] = None, failed: Optional[List[str]] = None,
+                    lease_seconds: float = 0.0):
+    """Write the filename → content hash manifest to local disk + GCS.
 
-def _write_manifest(experience_id: str, cache_name: str, content_hash: str, image_files: list[str]):
-    """Write manifest to local disk + GCS."""
-    from app.services.storage_service import storage
+    With pending filenames it is a partial manifest: images lists only what
+    is rendered so far, and the next run resumes from it. A partial manifest
+    carries this instance as owner and a lease (renewed while generating,
+    0 once the run gave up) so other instances only resume abandoned runs."""
+    from app.services.image_store import write_manifest
     manifest = {
         "cache_name": cache_name,
-        "content_hash": content_hash,
         "generated_at": datetime.now(timezone.utc).isoformat(),
-        "images": sorted(image_files),
+        "status": "partial" if pending else "complete",
+        "images": dict(sorted(images.items())),
+    }
+    if pending:
+        manifest["pending"] = sorted(pending)
+        manifest["failed"] = sorted(failed or [])
+        manifest["owner"] = _INSTANCE_ID
+        manifest["lease_until"] = time.time() + lease_seconds if lease_seconds else 0
+    write_manifest(experience_id, manifest)
+    if pending:
+        logger.debug(f"📋 Partial manifest: {len(images)} done, {len(pending)} pending for {experience_id}")
+    else:
+        logger.info(f"📋 Manifest written: {len(images)} images for {experience_id}")
+
+
+def _scenario_context(experience_dict: Dict) -> str:
+    """Scenario theme string anchoring location prompts."""
+    scenario_id = experience_dict.get("scenario_id", "")
+    objective = experience_dict.get("objective", "")
+    scenario_context = scenario_id.replace("_", " ") if scenario_id else ""
+    if objective:
+        scenario_context = f"{scenario_context} — {objective}" if scenario_context else objective
+    return scenario_context
+
+
+def _import_image_scripts():
+    import sys
+    scripts_dir = Path(__file__).parent.parent.parent / "scripts"
+    if str(scripts_dir) not in sys.path:
+        sys.path.insert(0, str(scripts_dir))
+    import generate_item_images
+    import generate_location_images
+    import generate_npc_images
+    return generate_location_images, generate_item_images, generate_npc_images
+
+
+def expected_images(experience_dict: Dict) -> Dict[str, str]:
+    """filename → content hash of every image this experience version needs."""
+    location_script, item_script, npc_script = _import_image_scripts()
+    locations, items, npcs = parse_experience_for_generation(experience_dict)
+    scenario_context = _scenario_context(experience_dict)
+    images: Dict[str, str] = {}
+    for loc in locations:
+        images[f"location_{loc['id']}.png"] = location_script.location_content_hash(loc, scenario_context)
+    for item in items:
+        images[f"item_{item['id'].removeprefix('item_')}.png"] = item_script.item_content_hash(item)
+    for npc in npcs:
+        images[f"npc_{npc['id']}.png"] = npc_script.npc_content_hash(npc)
+    return images
+
+
+# ------------------------------------------------------------------
+# Progress tracking (answers /api/images/{id}/status without storage I/O)
+# ------------------------------------------------------------------
+
+_IMAGE_KINDS = ("location", "item", "npc")
+_INSTANCE_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def _image_kind(filename: str) -> str:
+    return filename.split("_", 1)[0]
+
+
+class ImageGenerationTracker:
+    """Per-experience image counts, updated by the generator as images land.
+
+    Keeps the most recent runs (finished ones too) so status reflects
+    failures the manifest can't show."""
+
+    def __init__(self, max_tracked: int = 100):
+        self._runs: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_tracked = max_tracked
+
+    def start(self, experience_id: str, images: Dict[str, str], present: List[str]) -> None:
+        run = {
+            "total": {kind: 0 for kind in _IMAGE_KINDS},
+            "done": {kind: 0 for kind in _IMAGE_KINDS},
+            "failed": {kind: 0 for kind in _IMAGE_KINDS},
+            "generating": True,
+            "started_at": time.time(),
+        }
+        for fname in images:
+            run["total"][_image_kind(fname)] = run["total"].get(_image_kind(fname), 0) + 1
+        for fname in present:
+            run["done"][_image_kind(fname)] = run["done"].get(_image_kind(fname), 0) + 1
+        with self._lock:
+            self._runs.pop(experience_id, None)
+            self._runs[experience_id] = run
+            while len(self._runs) > self._max_tracked:
+                self._runs.popitem(last=False)
+
+    def image_done(self, experience_id: str, kind: str, ok: bool) -> None:
+        with self._lock:
+            run = self._runs.get(experience_id)
+            if run is not None:
+                bucket = run["done" if ok else "failed"]
+                bucket[kind] = bucket.get(kind, 0) + 1
+
+    def finish(self, experience_id: str) -> None:
+        with self._lock:
+            run = self._runs.get(experience_id)
+            if run is not None:
+                run["generating"] = False
+
+    def status(self, experience_id: str) -> Optional[Dict]:
+        """Counts for a tracked run, or None if this process hasn't run one."""
+        with self._lock:
+            run = self._runs.get(experience_id)
+            if run is None:
+                return None
+            return {key: dict(value) if isinstance(value, dict) else value for key, value in run.items()}
+
+
+_tracker = ImageGenerationTracker()
+
+
+def get_generation_tracker() -> ImageGenerationTracker:
+    return _tracker
+
+
+def image_status(experience_id: str) -> Dict:
+    """Per-type counts and percent complete, from the tracker or the manifest.
+
+    Never lists storage. While this process is generating the experience
+    the tracker answers; otherwise the manifest does, and read_manifest
+    re-reads missing or partial manifests, so runs finished by another
+    instance show up. Blocking (may read from GCS)."""
+    from app.services.image_store import manifest_images, manifest_pending, read_manifest
+
+    run = _tracker.status(experience_id)
+    if run is None or not run["generating"]:
+        # Partial manifests (interrupted runs) list what is still pending
+        manifest = read_manifest(experience_id)
+        done_files = list(manifest_images(manifest))
+        run = {
+            "total": {kind: 0 for kind in _IMAGE_KINDS},
+            "done": {kind: 0 for kind in _IMAGE_KINDS},
+            "failed": {kind: 0 for kind in _IMAGE_KINDS},
+            "generating": False,
+        }
+        for bucket, files in (("done", done_files), ("total", done_files + manifest_pending(manifest)),
+                              ("failed", (manifest or {}).get("failed") or [])):
+            for fname in files:
+                run[bucket][_image_kind(fname)] = run[bucket].get(_image_kind(fname), 0) + 1
+
+    total = sum(run["total"].values())
+    done = sum(run["done"].values())
+    return {
+        "experience_id": experience_id,
+        "location_images": run["done"].get("location", 0),
+        "item_images": run["done"].get("item", 0),
+        "npc_images": run["done"].get("npc", 0),
+        "total_images": total,
+        "failed_images": sum(run["failed"].values()),
+        "per_type": {
+            kind: {"done": run["done"].get(kind, 0), "total": count, "failed": run["failed"].get(kind, 0)}
+            for kind, count in run["total"].items()
+        },
+        "percent_complete": round(100 * done / total, 1) if total else 0.0,
+        "generating": run["generating"],
+        "ready": total > 0 and done == total,
     }
-    key = f"generated_images/{experience_id}/{_MANIFEST_FILENAME}"
-    storage.write_text(key, json.dumps(manifest, indent=2))
-    logger.info(f"📋 Manifest written: {len(image_files)} images, hash={content_hash[:8]}")
 
 
 # ------------------------------------------------------------------
@@ -149,6 +329,53 @@ def parse_experience_for_generation(experience_dict: Dict) -> tuple[List[Dict],
 # Manifest-based image check
 # ------------------------------------------------------------------
 
+def _legacy_content_hash(experience_dict: Dict) -> str:
+    """The whole-experience hash pre-content-store manifests were keyed by."""
+    image_data = {
+        k: experience_dict[k]
+        for k in ("locations", "items_by_location", "npcs")
+        if k in experience_dict
+    }
+    serialized = json.dumps(image_data, sort_keys=True, default=str)
+    return hashlib.md5(serialized.encode()).hexdigest()
+
+
+def _migrate_legacy_images(experience_id: str, manifest: Optional[dict], experience_dict: Dict,
+                           images: Dict[str, str], stored: Dict[str, bool]) -> int:
+    """Copy a still-current pre-content-store experience's PNGs into the content store.
+
+    Old manifests list filenames and a hash of the whole experience; while
+    that hash matches, its images are exactly what this version needs, so
+    they move under their content hashes instead of being re-rendered.
+    Marks migrated blobs in `stored` and returns how many were copied."""
+    from app.services.image_store import content_key
+    from app.services.storage_service import storage
+
+    legacy = (manifest or {}).get("images")
+    if not isinstance(legacy, list) or manifest.get("content_hash") != _legacy_content_hash(experience_dict):
+        return 0
+    migrated = 0
+    for fname in legacy:
+        content_hash = images.get(fname)
+        key = content_key(content_hash) if content_hash else None
+        if key is None or stored.get(key, True):
+            continue
+        source = storage.local_path(f"generated_images/{experience_id}/{fname}")
+        if source is None:
+            continue
+        target = storage.local_path_for(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(target.suffix + ".tmp")
+        shutil.copyfile(source, tmp)
+        tmp.replace(target)
+        storage.upload_local(key)
+        stored[key] = True
+        migrated += 1
+    if migrated:
+        logger.info(f"📦 Migrated {migrated} legacy images of {experience_id} into the content store")
+    return migrated
+
+
 def check_images_exist(
     experience_id: str,
     experience_dict: Dict,
@@ -157,68 +384,110 @@ def check_images_exist(
     """
     Check if the correct images exist for this experience version.
 
-    Compares a content hash of experience_dict against the stored manifest.
-    If the hash matches, checks each expected file individually.
-    If the hash differs (or no manifest), all existing images are stale.
+    Every expected image is looked up by content hash in the shared store,
+    so images rendered for another experience (or an earlier version of
+    this one) with the same prompt count as present. Images a (possibly
+    partial) manifest already records at their current hash are trusted
+    without asking storage, so resuming an interrupted run is cheap. Ready
+    once all are present and a complete manifest maps each filename to its
+    current hash. Images in the pre-content-store per-experience folder are
+    stale; while their old manifest still matches they are first migrated
+    into the content store rather than re-rendered.
     """
+    from app.services.image_store import (
+        content_key, manifest_images, manifest_is_complete, manifest_pending, read_manifest,
+    )
     from app.services.storage_service import storage
 
-    locations, items, npcs = parse_experience_for_generation(experience_dict)
-    expected = _expected_filenames(locations, items, npcs)
-    current_hash = _content_hash(experience_dict)
-    prefix = f"generated_images/{experience_id}"
-
-    manifest = _read_manifest(experience_id)
-
-    if manifest and manifest.get("content_hash") == current_hash:
-        logger.info(
-            f"📋 Manifest match for {experience_id} "
-            f"(hash={current_hash[:8]}, cache={manifest.get('cache_name', '?')})"
-        )
-        # Hash matches — check each expected file exists (locally or GCS)
-        present = []
-        missing = []
-        for fname in expected:
-            key = f"{prefix}/{fname}"
-            if storage.exists(key):
-                present.append(fname)
-            else:
-                missing.append(fname)
-
-        if not missing:
-            logger.info(f"✅ All {len(expected)} images present for {experience_id}")
-            return ImageCheckResult(ready=True, present=present)
-
-        logger.info(
-            f"⚠️ Manifest valid but {len(missing)} images missing locally: "
-            f"{missing[:5]}{'...' if len(missing) > 5 else ''}"
-        )
-        return ImageCheckResult(ready=False, missing=missing, present=present)
-
-    # Hash mismatch or no manifest — all on-disk images are stale
-    if manifest:
-        logger.info(
-            f"🔄 Manifest hash mismatch for {experience_id}: "
-            f"manifest={manifest.get('content_hash', '?')[:8]}, "
-            f"current={current_hash[:8]} — all images stale"
-        )
-    else:
-        logger.info(f"📋 No manifest for {experience_id} — treating all images as stale")
-
-    # Find stale files on local disk
+    images = expected_images(experience_dict)
+    manifest = read_manifest(experience_id, refresh=True)
+    recorded = manifest_images(manifest)
+    pending = set(manifest_pending(manifest))
+    present = []
+    missing = []
+    # The manifest only records images once their blob was stored
+    unrecorded = [fname for fname, content_hash in images.items()
+                  if recorded.get(fname) != content_hash or fname in pending]
+    stored = storage.exists_many([content_key(images[fname]) for fname in unrecorded])
+    _migrate_legacy_images(experience_id, manifest, experience_dict, images, stored)
+    for fname, content_hash in sorted(images.items()):
+        if fname not in unrecorded or stored[content_key(content_hash)]:
+            present.append(fname)
+        else:
+            missing.append(fname)
+
+    # Pre-content-store layout: PNGs directly under the experience folder
     images_dir = Path(__file__).parent.parent.parent / "generated_images" / experience_id
     stale = []
     if images_dir.is_dir():
-        for f in images_dir.iterdir():
-            if f.is_file() and f.suffix == ".png":
-                stale.append(f.name)
-
-    return ImageCheckResult(
-        ready=False,
-        missing=expected,
-        stale=stale,
-        present=[],
+        stale = [f.name for f in images_dir.iterdir() if f.is_file() and f.suffix == ".png"]
+
+    manifest_current = manifest_is_complete(manifest) and recorded == images
+    if not missing and manifest_current:
+        logger.info(f"✅ All {len(images)} images present for {experience_id}")
+        return ImageCheckResult(ready=True, present=present, stale=stale, images=images)
+
+    logger.info(
+        f"📋 {experience_id}: {len(present)}/{len(images)} images already in the content store"
+        f"{'' if manifest_current else ', manifest out of date'}"
     )
+    return ImageCheckResult(ready=False, missing=missing, stale=stale, present=present, images=images)
+
+
+def _remove_stale(experience_id: str, stale: list[str]) -> None:
+    """Drop pre-content-store images once the manifest no longer points at them."""
+    if not stale:
+        return
+    from app.services.image_byte_cache import get_image_byte_cache
+    from app.services.storage_service import storage
+    logger.info(f"🗑️ Removing {len(stale)} stale images for {experience_id}")
+    for fname in stale:
+        storage.delete_local(f"generated_images/{experience_id}/{fname}")
+    get_image_byte_cache().invalidate_prefix(f"generated_images/{experience_id}/")
+
+
+async def _build_atlas(experience_id: str) -> None:
+    """Pack the experience's thumbnails into its sprite sheet ahead of game start."""
+    from app.services.image_atlas import get_image_atlases
+    try:
+        await asyncio.to_thread(get_image_atlases().ensure, experience_id)
+    except Exception as e:
+        logger.warning(f"⚠️ Atlas build failed for {experience_id}: {e}")
+
+
+# ------------------------------------------------------------------
+# Progressive start: generation order
+# ------------------------------------------------------------------
+
+def image_priorities(game_state, players) -> Dict[str, int]:
+    """Generation tiers for a progressive game start.
+
+    0: the locations players start in
+    1: NPCs and items there, and at the locations of their available tasks
+    2: everything else (left out of the map)
+    """
+    from app.models.game_state import TaskStatus
+
+    def _place(value: str) -> str:
+        return (value or "").strip().lower()
+
+    by_name = {_place(loc.name): loc.id for loc in game_state.locations}
+    start = {by_name.get(_place(p.location), p.location) for p in players}
+    nearby = set(start)
+    roles = {p.role for p in players}
+    for task in game_state.tasks.values():
+        if task.assigned_role in roles and task.status == TaskStatus.AVAILABLE:
+            nearby.add(by_name.get(_place(task.location), task.location))
+
+    priorities = {f"location:{loc_id}": 0 for loc_id in start}
+    for npc in game_state.npcs:
+        if by_name.get(_place(npc.location), npc.location) in nearby:
+            priorities[f"npc:{npc.id}"] = 1
+    for location, items in game_state.items_by_location.items():
+        if by_name.get(_place(location), location) in nearby:
+            for item in items:
+                priorities[f"item:{item.id}"] = 1
+    return priorities
 
 
 # ------------------------------------------------------------------
@@ -230,111 +499,227 @@ async def generate_all_images_for_experience(
     experience_dict: Dict,
     cache_name: str = "",
     broadcast: Optional[Callable[[str], Awaitable[None]]] = None,
+    priorities: Optional[Dict[str, int]] = None,
+    on_image_ready: Optional[Callable[[str, str, str], Awaitable[None]]] = None,
 ) -> bool:
     """
     Generate all images for an experience at game start.
     Uses manifest-based staleness detection to avoid regenerating
     images that already match the current scenario version.
+
+    priorities: {"<kind>:<asset_id>": tier}, lower tiers start first
+    (see image_priorities). on_image_ready(kind, asset_id, path) is awaited
+    as each image lands.
+
+    A call for an experience that is already generating joins that run:
+    it receives the same progress messages and image events and returns
+    the run's actual result: False when images failed and are still
+    pending, or the run errored. The run is its own task, so a caller going
+    away (room closed) doesn't cancel it for the others.
     """
-    # Wait if another generation is in progress for this experience
-    if experience_id in _generation_tasks:
-        logger.info(f"🎨 Images already generating for {experience_id}, waiting...")
-        while experience_id in _generation_tasks:
-            await asyncio.sleep(0.5)
-        return True
+    run = _generation_runs.get(experience_id)
+    if run is None:
+        run = _GenerationRun()
+        _generation_runs[experience_id] = run
+        run.task = asyncio.create_task(_generate_images(
+            experience_id, experience_dict, cache_name,
+            broadcast=run.broadcast, priorities=priorities, on_image_ready=run.image_ready,
+        ))
+        run.task.add_done_callback(lambda _: _generation_runs.pop(experience_id, None))
+    else:
+        logger.info(f"🎨 Images already generating for {experience_id}, joining that run")
 
-    check = check_images_exist(experience_id, experience_dict, cache_name)
+    await run.subscribe(broadcast, on_image_ready)
+    try:
+        return await asyncio.shield(run.task)
+    finally:
+        run.unsubscribe(broadcast, on_image_ready)
+
+
+async def _await_foreign_run(experience_id: str,
+                             broadcast: Optional[Callable[[str], Awaitable[None]]]) -> None:
+    """Wait while another instance holds a live lease on this experience's run.
+
+    Polls the manifest until that run completes or its lease lapses (the
+    owner died); the caller then checks again and renders whatever is left."""
+    from app.core.config import get_settings
+    from app.services.image_store import manifest_lease_live, read_manifest
+
+    poll = min(5.0, get_settings().image_generation_lease_seconds / 3)
+    waited = False
+    while True:
+        manifest = await asyncio.to_thread(read_manifest, experience_id, True)
+        if not manifest_lease_live(manifest) or manifest.get("owner") == _INSTANCE_ID:
+            if waited:
+                logger.info(f"🎨 {experience_id}: other instance's run is over, taking over")
+            return
+        if not waited:
+            logger.info(f"🎨 {experience_id} is generating on {manifest.get('owner')}, waiting for it")
+            if broadcast:
+                await broadcast("🖼️ Images are already being rendered, waiting for them...")
+            waited = True
+        await asyncio.sleep(poll)
+
+
+async def _generate_images(
+    experience_id: str,
+    experience_dict: Dict,
+    cache_name: str,
+    broadcast: Callable[[str], Awaitable[None]],
+    priorities: Optional[Dict[str, int]],
+    on_image_ready: Callable[[str, str, str], Awaitable[None]],
+) -> bool:
+    """One generation run (see generate_all_images_for_experience)."""
+    await _await_foreign_run(experience_id, broadcast)
+    check = await asyncio.to_thread(check_images_exist, experience_id, experience_dict, cache_name)
     if check.ready:
         logger.info(f"✅ All images up-to-date for {experience_id}")
         return True
 
+    from app.services.image_store import content_key
+    from app.services.storage_service import storage
+
+    tracker = get_generation_tracker()
+    if not check.missing:
+        # Every prompt was already rendered — just point the manifest at it
+        tracker.start(experience_id, check.images, list(check.images))
+        tracker.finish(experience_id)
+        _write_manifest(experience_id, cache_name, check.images)
+        _remove_stale(experience_id, check.stale)
+        await _build_atlas(experience_id)
+        logger.info(f"♻️ Reused all {len(check.images)} images for {experience_id} from the content store")
+        return True
+
     if broadcast:
         total = len(check.missing)
         await broadcast(f"🖼️ Generating {total} images...")
 
-    # Clean stale images from local disk
-    if check.stale:
-        from app.services.storage_service import storage
-        logger.info(f"🗑️ Removing {len(check.stale)} stale images for {experience_id}")
-        for fname in check.stale:
-            storage.delete_local(f"generated_images/{experience_id}/{fname}")
-
     locations, items, npcs = parse_experience_for_generation(experience_dict)
-
-    # Build scenario context string for image prompts
-    scenario_id = experience_dict.get("scenario_id", "")
-    objective = experience_dict.get("objective", "")
-    scenario_context = scenario_id.replace("_", " ") if scenario_id else ""
-    if objective:
-        scenario_context = f"{scenario_context} — {objective}" if scenario_context else objective
+    scenario_context = _scenario_context(experience_dict)
 
     logger.info(
-        f"🎨 Generating images for {experience_id}: "
-        f"{len(locations)} locations, {len(items)} items, {len(npcs)} NPCs"
+        f"🎨 Generating images for {experience_id}: {len(check.missing)} of "
+        f"{len(locations)} locations, {len(items)} items, {len(npcs)} NPCs "
+        f"({len(check.present)} reused from the content store)"
     )
     if scenario_context:
         logger.info(f"🎨 Scenario context: {scenario_context}")
 
     try:
-        import sys
-        scripts_dir = Path(__file__).parent.parent.parent / "scripts"
-        if str(scripts_dir) not in sys.path:
-            sys.path.insert(0, str(scripts_dir))
-
-        from generate_location_images import generate_all_location_images
-        from generate_item_images import generate_all_item_images
-        from generate_npc_images import generate_all_npc_images
-
-        _generation_tasks[experience_id] = True
-
-        phase_completed = [0]
-        phase_total = [0]
-        current_phase = [""]
-
-        async def _on_image_done():
-            phase_completed[0] += 1
+        location_script, item_script, npc_script = _import_image_scripts()
+        from app.core.config import get_settings
+        from app.services.image_derivatives import get_image_derivatives
+        from app.services.image_jobs import get_image_job_engine
+
+        pregenerate = get_settings().image_derivatives_pregenerate
+
+        tracker.start(experience_id, check.images, check.present)
+
+        # One job list across all three asset types, run with the engine's
+        # shared concurrency bound (locations first so they start first).
+        # Only prompts missing from the content store are rendered.
+        missing_hashes = {check.images[fname] for fname in check.missing}
+        jobs = [
+            job for job in (
+                location_script.location_image_jobs(experience_id, locations, scenario_context)
+                + item_script.item_image_jobs(experience_id, items)
+                + npc_script.npc_image_jobs(experience_id, npcs)
+            )
+            if job.content_hash in missing_hashes
+        ]
+        if priorities:
+            # Stable: within a tier, locations → items → NPCs as above
+            jobs.sort(key=lambda job: priorities.get(f"{job.kind}:{job.asset_id}", len(jobs)))
+        totals = {kind: sum(1 for job in jobs if job.kind == kind) for kind in ("location", "item", "npc")}
+        done = {kind: 0 for kind in totals}
+        labels = {"location": "locations", "item": "items", "npc": "characters"}
+
+        # Job record: a partial manifest rewritten as each image is stored,
+        # so a crash or redeploy resumes with only the pending images
+        recorded = {fname: check.images[fname] for fname in check.present}
+        pending = set(check.missing)
+        failed_files: set[str] = set()
+        manifest_lock = asyncio.Lock()
+        lease = get_settings().image_generation_lease_seconds
+
+        async def _save(lease_seconds: float = lease):
+            await asyncio.to_thread(
+                _write_manifest, experience_id, cache_name, dict(recorded),
+                list(pending), list(failed_files), lease_seconds,
+            )
+
+        async def _record(job, ok: bool):
+            async with manifest_lock:
+                for fname in check.missing:
+                    if check.images[fname] != job.content_hash:
+                        continue
+                    if ok:
+                        recorded[fname] = job.content_hash
+                        pending.discard(fname)
+                    else:
+                        failed_files.add(fname)
+                await _save()
+
+        async def _heartbeat():
+            # Renew the lease even while a slow image holds up the next write
+            while True:
+                await asyncio.sleep(lease / 3)
+                async with manifest_lock:
+                    if pending:
+                        await _save()
+
+        await _save()
+        heartbeat = asyncio.create_task(_heartbeat())
+
+        async def _on_image_done(job, path):
+            done[job.kind] += 1
+            tracker.image_done(experience_id, job.kind, bool(path))
+            if path:
+                # New content blob: persist it now, then record it as done
+                await storage.upload_local_async(content_key(job.content_hash))
+            await _record(job, bool(path))
+            if path and on_image_ready:
+                await on_image_ready(job.kind, job.asset_id, path)
+            if path and pregenerate:
+                # Thumbnails / WebP for the client's known UI sizes, off the critical path
+                get_image_derivatives().pregenerate_in_background(content_key(job.content_hash))
             if broadcast:
-                await broadcast(f"🎨 {current_phase[0]} ({phase_completed[0]}/{phase_total[0]})")
+                await broadcast(
+                    f"🎨 Rendering images ({sum(done.values())}/{len(jobs)}) — "
+                    f"{labels[job.kind]} {done[job.kind]}/{totals[job.kind]}"
+                )
 
-        logger.info(f"🎨 Step 1/3: Generating location images...")
-        current_phase[0] = "Rendering locations"
-        phase_completed[0] = 0
-        phase_total[0] = len(locations)
+        logger.info(f"🎨 Generating {len(jobs)} images through the image job engine...")
         if broadcast:
-            await broadcast(f"🖼️ Rendering {len(locations)} locations...")
-        await generate_all_location_images(
-            experience_id, locations,
-            on_progress=_on_image_done,
-            scenario_context=scenario_context,
-        )
-
-        logger.info(f"🎨 Step 2/3: Generating item images...")
-        current_phase[0] = "Drawing items"
-        phase_completed[0] = 0
-        phase_total[0] = len(items)
-        if broadcast:
-            await broadcast(f"🔧 Drawing {len(items)} items...")
-        await generate_all_item_images(experience_id, items, on_progress=_on_image_done)
-
-        logger.info(f"🎨 Step 3/3: Generating NPC images...")
-        current_phase[0] = "Sketching characters"
-        phase_completed[0] = 0
-        phase_total[0] = len(npcs)
-        if broadcast:
-            await broadcast(f"🎭 Sketching {len(npcs)} characters...")
-        await generate_all_npc_images(experience_id, npcs, on_progress=_on_image_done)
-
-        # Write manifest and sync to GCS
-        from app.services.storage_service import storage
-        expected = _expected_filenames(locations, items, npcs)
-        _write_manifest(experience_id, cache_name, _content_hash(experience_dict), expected)
-        storage.sync_local_to_gcs(f"generated_images/{experience_id}")
-
-        logger.info(f"✅ All images generated for {experience_id}")
-        return True
+            await broadcast(
+                f"🖼️ Rendering {totals['location']} locations, {totals['item']} items "
+                f"and {totals['npc']} characters..."
+            )
+        try:
+            results = await get_image_job_engine().run(jobs, on_done=_on_image_done)
+        finally:
+            heartbeat.cancel()
+        failed = [key for key, path in results.items() if path is None]
+        if failed:
+            logger.warning(f"⚠️ {len(failed)} images failed for {experience_id}: {failed[:5]}")
+
+        if pending:
+            # Leave the partial manifest, lease released: the next start
+            # (or any instance's warmer) retries just these
+            async with manifest_lock:
+                await _save(lease_seconds=0)
+            logger.warning(f"⚠️ {len(pending)} images still pending for {experience_id}")
+        else:
+            _write_manifest(experience_id, cache_name, check.images)
+            _remove_stale(experience_id, check.stale)
+        await _build_atlas(experience_id)
+
+        logger.info(f"✅ Image generation finished for {experience_id}")
+        # Failed images are still pending: report the run as unsuccessful
+        return not pending
 
     except Exception as e:
         logger.error(f"❌ Image generation failed for {experience_id}: {e}")
         return False
     finally:
-        _generation_tasks.pop(experience_id, None)
+        tracker.finish(experience_id)
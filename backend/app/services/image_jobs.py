@@ -0,0 +1,126 @@
+"""
+Image Job Engine — one bounded worker pool for every generated image
+
+Location, item and NPC images used to be generated one phase after the
+other and one image at a time. The engine runs them as a single job list:
+
+  - Shared concurrency: at most image_max_concurrency images are in
+    flight per process, across all asset types and all experiences
+  - Off the event loop: provider calls go through the LLM scheduler's
+    run_blocking (worker thread, shared per-model rate limit, 429
+    retry-after); decoding/resizing/saving runs in a worker thread too
+  - Per-job completion callbacks, so progress reports stay exact while
+    jobs finish out of order
+
+Usage:
+    jobs = location_image_jobs(...) + item_image_jobs(...) + npc_image_jobs(...)
+    results = await get_image_job_engine().run(jobs, on_done=report)
+"""
+
+import asyncio
+import logging
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ImageJob:
+    kind: str       # "location" | "item" | "npc"
+    asset_id: str
+    label: str      # human-readable name for logs
+    generate: Callable[[], Awaitable[Optional[str]]]  # → saved path, None on failure
+    content_hash: str = ""  # content-store key of the result (services/image_store.py)
+
+
+def save_response_image(response, output_path: Path, size: Tuple[int, int]) -> bool:
+    """Blocking: write the first inline image of a generate_content response, resized.
+
+    Written to a per-writer temp file and renamed into place, so a crash
+    never leaves a truncated blob at the final path and two runs producing
+    the same content hash don't write one file at once."""
+    from PIL import Image
+
+    for part in response.parts:
+        if part.inline_data is not None:
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = output_path.with_name(f"{output_path.name}.{uuid.uuid4().hex[:8]}.tmp")
+            try:
+                part.as_image().save(str(tmp))
+                with Image.open(tmp) as img:
+                    img = img.resize(size, Image.Resampling.LANCZOS)
+                img.save(tmp, format="PNG")
+                tmp.replace(output_path)
+            finally:
+                tmp.unlink(missing_ok=True)
+            return True
+    return False
+
+
+class ImageJobEngine:
+    """Runs ImageJobs with a process-wide concurrency bound."""
+
+    def __init__(self, max_concurrency: int = 4):
+        self.max_concurrency = max(max_concurrency, 1)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.in_flight = 0
+        self.stats: Dict[str, int] = {"completed": 0, "failed": 0}
+
+    def _slots(self) -> asyncio.Semaphore:
+        # Bound to the running loop (scripts run their own)
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    async def run(
+        self,
+        jobs: List[ImageJob],
+        on_done: Optional[Callable[[ImageJob, Optional[str]], Awaitable[None]]] = None,
+    ) -> Dict[str, Optional[str]]:
+        """Run every job; returns {"<kind>:<asset_id>": path or None}."""
+        slots = self._slots()
+        results: Dict[str, Optional[str]] = {}
+
+        async def _one(job: ImageJob) -> None:
+            async with slots:
+                self.in_flight += 1
+                try:
+                    path = await job.generate()
+                except Exception as e:
+                    logger.error(f"❌ Image job {job.kind}:{job.asset_id} failed: {e}")
+                    path = None
+                finally:
+                    self.in_flight -= 1
+            self.stats["completed" if path else "failed"] += 1
+            results[f"{job.kind}:{job.asset_id}"] = path
+            if on_done:
+                try:
+                    await on_done(job, path)
+                except Exception as e:
+                    # One bad callback (upload, broadcast) must not abort the run
+                    logger.error(f"❌ on_done for image job {job.kind}:{job.asset_id} failed: {e}")
+
+        await asyncio.gather(*[_one(job) for job in jobs])
+        return results
+
+    def metrics(self) -> Dict:
+        return {"max_concurrency": self.max_concurrency, "in_flight": self.in_flight, **self.stats}
+
+
+# Global engine instance
+_image_job_engine: Optional[ImageJobEngine] = None
+
+
+def get_image_job_engine() -> ImageJobEngine:
+    """Get or create global ImageJobEngine instance"""
+    global _image_job_engine
+    if _image_job_engine is None:
+        from app.core.config import get_settings
+        _image_job_engine = ImageJobEngine(max_concurrency=get_settings().image_max_concurrency)
+    return _image_job_engine
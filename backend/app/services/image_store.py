@@ -0,0 +1,181 @@
+"""
+Image Store — content-addressed storage for generated images
+
+An image is keyed by a hash of what produced it: asset kind, image model,
+output size and the normalized prompt (which carries the asset's name,
+visual description and scenario context). Identical prompts share one
+blob whatever experience asked for them, so regenerating a scenario with
+another role set, or after editing one NPC, re-renders only the assets
+whose prompt actually changed.
+
+Layout (keys relative to backend/, local disk + GCS via StorageService):
+
+  generated_images/_content/{hash}.png          one blob per distinct prompt
+  generated_images/{experience_id}/_manifest.json
+      {"images": {"location_lobby.png": "{hash}", ...}, "status": "complete", ...}
+
+While images are generating the manifest is rewritten as each one lands
+with status "partial" and the filenames still to render under "pending";
+it doubles as the resumable job record after a crash or redeploy.
+
+Experiences generated before the content store keep their images under
+generated_images/{experience_id}/ and are served from there until their
+next generation check migrates them (image_generator.check_images_exist).
+
+Usage:
+    h = image_content_hash("location", model, prompt, (1024, 576))
+    path = content_path(h)                       # where the generator saves it
+    key = await resolve_image_key_async(experience_id, "location_lobby.png")   # serving
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_BACKEND_ROOT = Path(__file__).parent.parent.parent  # backend/
+CONTENT_PREFIX = "generated_images/_content"
+MANIFEST_FILENAME = "_manifest.json"
+_WHITESPACE = re.compile(r"\s+")
+
+
+def image_content_hash(kind: str, model: str, prompt: str, size: Tuple[int, int]) -> str:
+    """Stable hash of an image's generation inputs."""
+    inputs = {
+        "kind": kind,
+        "model": model,
+        "size": list(size),
+        "prompt": _WHITESPACE.sub(" ", prompt).strip(),
+    }
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode("utf-8")).hexdigest()[:32]
+
+
+def content_key(content_hash: str) -> str:
+    return f"{CONTENT_PREFIX}/{content_hash}.png"
+
+
+def content_path(content_hash: str) -> Path:
+    """Local path of a content blob (the generator writes here)."""
+    return _BACKEND_ROOT / content_key(content_hash)
+
+
+def manifest_key(experience_id: str) -> str:
+    return f"generated_images/{experience_id}/{MANIFEST_FILENAME}"
+
+
+# ------------------------------------------------------------------
+# Manifests: experience image filename → content hash
+# ------------------------------------------------------------------
+
+# Complete manifests are memoized until this process rewrites them. Missing
+# manifests are never memoized, and partial ones (another instance may be
+# generating) are re-read from storage once they are older than this.
+_PARTIAL_MANIFEST_TTL = 5.0
+_manifests: Dict[str, Tuple[dict, float]] = {}  # experience_id → (manifest, read at)
+_manifest_lock = threading.Lock()
+_MISSING = object()
+
+
+def _memoized(experience_id: str, max_age: Optional[float] = None):
+    """A still-valid memoized manifest, or _MISSING."""
+    with _manifest_lock:
+        entry = _manifests.get(experience_id)
+    if entry is None:
+        return _MISSING
+    manifest, read_at = entry
+    if max_age is None:
+        max_age = float("inf") if manifest_is_complete(manifest) else _PARTIAL_MANIFEST_TTL
+    return manifest if time.monotonic() - read_at < max_age else _MISSING
+
+
+def read_manifest(experience_id: str, refresh: bool = False) -> Optional[dict]:
+    """An experience's manifest (memoized; refresh=True re-reads storage).
+
+    Blocking: a re-read may download from GCS."""
+    if not refresh:
+        manifest = _memoized(experience_id)
+        if manifest is not _MISSING:
+            return manifest
+
+    from app.services.storage_service import storage
+    manifest = None
+    # Fresh from GCS: the local copy may predate another instance's rewrite
+    text = storage.read_text(manifest_key(experience_id), refresh=True)
+    if text:
+        try:
+            manifest = json.loads(text)
+        except json.JSONDecodeError:
+            logger.warning(f"Corrupt manifest for {experience_id}, treating as missing")
+    with _manifest_lock:
+        if manifest is None:
+            _manifests.pop(experience_id, None)
+        else:
+            _manifests[experience_id] = (manifest, time.monotonic())
+    return manifest
+
+
+def write_manifest(experience_id: str, manifest: dict) -> None:
+    from app.services.storage_service import storage
+    storage.write_text(manifest_key(experience_id), json.dumps(manifest, indent=2))
+    with _manifest_lock:
+        _manifests[experience_id] = (manifest, time.monotonic())
+
+
+def manifest_images(manifest: Optional[dict]) -> Dict[str, str]:
+    """filename → content hash; empty for missing or pre-content-store manifests."""
+    images = (manifest or {}).get("images")
+    return images if isinstance(images, dict) else {}
+
+
+def manifest_is_complete(manifest: Optional[dict]) -> bool:
+    """False for a partial (in-progress or interrupted) manifest."""
+    return bool(manifest) and manifest.get("status", "complete") == "complete"
+
+
+def manifest_pending(manifest: Optional[dict]) -> list:
+    """Filenames a partial manifest still has to render."""
+    pending = (manifest or {}).get("pending")
+    return pending if isinstance(pending, list) else []
+
+
+def _image_key(experience_id: str, filename: str, images: Dict[str, str]) -> str:
+    content_hash = images.get(filename)
+    if content_hash:
+        return content_key(content_hash)
+    return f"generated_images/{experience_id}/{filename}"
+
+
+def manifest_lease_live(manifest: Optional[dict]) -> bool:
+    """True while a partial manifest's owner is still generating it."""
+    if manifest_is_complete(manifest) or not manifest:
+        return False
+    return float(manifest.get("lease_until") or 0) > time.time()
+
+
+def resolve_image_key(experience_id: str, filename: str) -> str:
+    """Storage key serving an experience's image (content blob, else legacy path).
+
+    Blocking: may re-read the manifest from storage."""
+    manifest = _memoized(experience_id)
+    if manifest is _MISSING or (
+        filename not in manifest_images(manifest)
+        and _memoized(experience_id, _PARTIAL_MANIFEST_TTL) is _MISSING
+    ):
+        # Never read, or another instance may have rewritten it since we did
+        manifest = read_manifest(experience_id, refresh=True)
+    return _image_key(experience_id, filename, manifest_images(manifest))
+
+
+async def resolve_image_key_async(experience_id: str, filename: str) -> str:
+    """resolve_image_key for the event loop: storage reads run in a thread."""
+    manifest = _memoized(experience_id)
+    if manifest is not _MISSING and filename in manifest_images(manifest):
+        return _image_key(experience_id, filename, manifest_images(manifest))
+    return await asyncio.to_thread(resolve_image_key, experience_id, filename)
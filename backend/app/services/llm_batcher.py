@@ -0,0 +1,217 @@
+"""
+LLM Micro-Batcher — coalesce concurrent quick-response calls into one request
+
+In crowded moments several players talk to NPCs at once and every
+/api/npc/chat turn asks the LLM for its own quick responses. With a window
+set, requests for the same model/temperature that arrive within
+llm_batch_window_ms are sent as ONE structured prompt ("answer these N
+independent requests, return a JSON array") and the array is split back
+to the callers:
+
+  - one scheduler token and one HTTP round trip per batch instead of per
+    turn, so a per-model RPM quota stretches llm_batch_max_size times further
+  - every caller waits up to the window before its call even starts
+
+Only prompts whose answer is JSON can be batched (each element of the
+batched answer is re-serialized for its caller). A batch of one is sent
+as-is; elements missing from the batched answer are retried alone.
+
+/health reports the trade: calls saved and mean batch size against the
+mean/max time requests spent waiting for their batch to close.
+
+Usage:
+    text = await get_llm_batcher().submit(llm, prompt, model, temperature=0.8, max_tokens=500)
+"""
+
+import asyncio
+import json
+import logging
+import re
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.services.llm_client import TextLLM
+
+logger = logging.getLogger(__name__)
+
+_BATCH_HEADER = "You are answering {n} independent requests in one call."
+_REQUEST_MARK = re.compile(r"^=== REQUEST (\d+) ===$", re.M)
+_BATCH_FOOTER = "=== END OF REQUESTS ==="
+
+
+def build_batch_prompt(prompts: List[str]) -> str:
+    """One prompt asking for the JSON answers of several prompts, in order."""
+    sections = "\n\n".join(f"=== REQUEST {i} ===\n{p.strip()}" for i, p in enumerate(prompts, 1))
+    return f"""{_BATCH_HEADER.format(n=len(prompts))}
+Treat each request as if it were sent alone — never let one influence another.
+
+{sections}
+
+{_BATCH_FOOTER}
+
+Return ONLY a JSON array (no markdown) with exactly {len(prompts)} elements: element i is
+the complete JSON answer REQUEST i asks for, in the exact shape that request specifies."""
+
+
+def split_batch_prompt(prompt: str) -> Optional[List[str]]:
+    """The individual prompts inside a batched prompt, or None if it isn't one."""
+    if not prompt.startswith(_BATCH_HEADER.split("{n}")[0]) or _BATCH_FOOTER not in prompt:
+        return None
+    body = prompt.split(_BATCH_FOOTER, 1)[0]
+    parts = _REQUEST_MARK.split(body)
+    # parts = [preamble, "1", text1, "2", text2, ...]
+    return [parts[i + 1].strip() for i in range(1, len(parts) - 1, 2)]
+
+
+class _Pending:
+    __slots__ = ("prompt", "max_tokens", "future", "queued_at")
+
+    def __init__(self, prompt: str, max_tokens: int, future: "asyncio.Future"):
+        self.prompt = prompt
+        self.max_tokens = max_tokens
+        self.future = future
+        self.queued_at = time.monotonic()
+
+
+class LLMBatcher:
+    """Collects JSON-answer prompts per (llm, model, temperature) for a short window."""
+
+    def __init__(self, window_ms: float = 0.0, max_batch: int = 8, max_tokens_cap: int = 8192):
+        self.window = max(window_ms, 0.0) / 1000.0
+        self.max_batch = max(max_batch, 1)
+        self.max_tokens_cap = max_tokens_cap
+        # Keyed by the client itself; an entry (and its reference) only lives
+        # until the group is flushed
+        self._groups: Dict[Tuple[TextLLM, str, float], List[_Pending]] = {}
+        # In-flight sends (strong refs so they aren't garbage collected)
+        self._tasks: Set[asyncio.Task] = set()
+        self.stats: Dict[str, float] = {
+            "requests": 0, "batches": 0, "single_calls": 0, "batched_requests": 0,
+            "split_retries": 0, "batch_failures": 0,
+            "wait_total_ms": 0.0, "wait_max_ms": 0.0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0 and self.max_batch > 1
+
+    async def submit(self, llm: TextLLM, prompt: str, model: str,
+                     temperature: float = 0.7, max_tokens: int = 300) -> str:
+        """The answer to prompt, possibly produced as part of a batch."""
+        if not self.enabled:
+            return await llm.generate(prompt, model, temperature=temperature, max_tokens=max_tokens)
+
+        self.stats["requests"] += 1
+        key = (llm, model, temperature)
+        pending = _Pending(prompt, max_tokens, asyncio.get_running_loop().create_future())
+        group = self._groups.setdefault(key, [])
+        group.append(pending)
+        if len(group) == 1:
+            asyncio.get_running_loop().call_later(self.window, self._flush, key)
+        elif len(group) >= self.max_batch:
+            self._flush(key)
+        return await pending.future
+
+    def _flush(self, key: Tuple[TextLLM, str, float]) -> None:
+        group = self._groups.pop(key, None)
+        if not group:
+            return  # already flushed when it filled up
+        now = time.monotonic()
+        for p in group:
+            waited = (now - p.queued_at) * 1000
+            self.stats["wait_total_ms"] += waited
+            self.stats["wait_max_ms"] = max(self.stats["wait_max_ms"], waited)
+        llm, model, temperature = key
+        task = asyncio.ensure_future(self._send(llm, model, temperature, group))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, llm: TextLLM, model: str, temperature: float, group: List[_Pending]) -> None:
+        if len(group) == 1:
+            self.stats["single_calls"] += 1
+            await self._send_one(llm, model, temperature, group[0])
+            return
+
+        self.stats["batches"] += 1
+        self.stats["batched_requests"] += len(group)
+        max_tokens = min(sum(p.max_tokens for p in group), self.max_tokens_cap)
+        try:
+            raw = await llm.generate(build_batch_prompt([p.prompt for p in group]), model,
+                                     temperature=temperature, max_tokens=max_tokens)
+            answers = self._parse(raw, len(group))
+        except Exception as e:
+            # Provider trouble would hit the individual calls too — fail them all
+            self.stats["batch_failures"] += 1
+            for p in group:
+                if not p.future.done():
+                    p.future.set_exception(e)
+            return
+
+        retries = []
+        for p, answer in zip(group, answers):
+            if answer is None:
+                retries.append(p)
+            elif not p.future.done():
+                p.future.set_result(answer)
+        if retries:
+            self.stats["split_retries"] += len(retries)
+            logger.warning(f"LLM batch of {len(group)}: {len(retries)} answer(s) missing, retrying alone")
+            await asyncio.gather(*[self._send_one(llm, model, temperature, p) for p in retries])
+
+    async def _send_one(self, llm: TextLLM, model: str, temperature: float, pending: _Pending) -> None:
+        try:
+            text = await llm.generate(pending.prompt, model, temperature=temperature,
+                                      max_tokens=pending.max_tokens)
+        except Exception as e:
+            if not pending.future.done():
+                pending.future.set_exception(e)
+            return
+        if not pending.future.done():
+            pending.future.set_result(text)
+
+    def _parse(self, raw: str, count: int) -> List[Optional[str]]:
+        """Per-request JSON answers from the batched answer; None where one is missing."""
+        raw = raw.strip()
+        if raw.startswith("```"):
+            raw = raw.split("\n", 1)[1] if "\n" in raw else raw[3:]
+            raw = raw.rsplit("```", 1)[0].strip()
+        try:
+            parsed = json.loads(raw)
+        except ValueError:
+            return [None] * count
+        if not isinstance(parsed, list):
+            return [None] * count
+        answers = [json.dumps(a) if a is not None else None for a in parsed[:count]]
+        return answers + [None] * (count - len(answers))
+
+    def metrics(self) -> Dict:
+        """Calls saved by batching against the latency the window added."""
+        requests = self.stats["requests"]
+        batches = self.stats["batches"]
+        sent = batches + self.stats["single_calls"] + self.stats["split_retries"]
+        return {
+            "window_ms": round(self.window * 1000, 1),
+            "max_batch": self.max_batch,
+            **{k: v for k, v in self.stats.items() if not k.startswith("wait_")},
+            "llm_calls_saved": int(requests - sent) if requests else 0,
+            "mean_batch_size": round(self.stats["batched_requests"] / batches, 2) if batches else 0.0,
+            "mean_wait_ms": round(self.stats["wait_total_ms"] / requests, 1) if requests else 0.0,
+            "max_wait_ms": round(self.stats["wait_max_ms"], 1),
+        }
+
+
+# Global batcher instance
+_llm_batcher: Optional[LLMBatcher] = None
+
+
+def get_llm_batcher() -> LLMBatcher:
+    """Get or create global LLMBatcher instance"""
+    global _llm_batcher
+    if _llm_batcher is None:
+        from app.core.config import get_settings
+        settings = get_settings()
+        _llm_batcher = LLMBatcher(
+            window_ms=settings.llm_batch_window_ms,
+            max_batch=settings.llm_batch_max_size,
+        )
+    return _llm_batcher
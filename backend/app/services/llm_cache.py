@@ -0,0 +1,177 @@
+"""
+LLM Response Cache — memory LRU + local disk
+
+Many conversation prompts repeat exactly across rooms playing the same
+experience: the same greeting for an NPC/cover/difficulty, the same quick
+responses after the same greeting, the same dismissal after the same
+line. The cache keeps up to N distinct responses ("variants") per prompt:
+
+  - fewer than N stored → call the LLM and add the answer
+  - N stored            → serve one at random, no LLM call
+
+N=1 makes a call site deterministic; a few variants keep repeat plays from
+feeling canned. Keys are (model, temperature bucket, normalized prompt).
+
+Tier 1 is an in-process LRU, tier 2 JSON files under backend/cache/ that
+survive restarts. Disk reads run in a worker thread; writes are
+write-behind on a single writer thread, so they land in order and never
+block the event loop. Hit rates per call site are reported on /health.
+
+Usage:
+    cache = get_llm_cache()
+    key = cache.key(model, temperature, prompt)
+    text = await cache.pick("quick_responses", key, variants=3)
+    if text is None:
+        text = await call_llm(...)
+        await cache.add("quick_responses", key, text, variants=3)
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_BACKEND_ROOT = Path(__file__).parent.parent.parent  # backend/
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace so formatting-only differences share a key."""
+    return _WHITESPACE.sub(" ", prompt).strip()
+
+
+class LLMResponseCache:
+    """Two-tier (memory LRU + disk) store of LLM response variants."""
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_memory_entries: int = 2048,
+                 temperature_step: float = 0.25):
+        self.cache_dir = cache_dir
+        self.max_memory_entries = max_memory_entries
+        self.temperature_step = temperature_step
+        self._memory: "OrderedDict[str, List[str]]" = OrderedDict()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="llm-cache") if cache_dir else None
+
+    def key(self, model: str, temperature: float, prompt: str) -> str:
+        bucket = round(round(temperature / self.temperature_step) * self.temperature_step, 2)
+        digest = hashlib.sha256(normalize_prompt(prompt).encode("utf-8")).hexdigest()
+        return hashlib.sha256(f"{model}|{bucket}|{digest}".encode("utf-8")).hexdigest()[:40]
+
+    async def pick(self, site: str, key: str, variants: int) -> Optional[str]:
+        """A cached response once `variants` are stored, else None (caller generates)."""
+        stored = await self._load(key)
+        full = len(stored) >= variants
+        self._count(site, "hits" if full else "misses")
+        return random.choice(stored) if full else None
+
+    async def add(self, site: str, key: str, text: str, variants: int) -> None:
+        """Store a freshly generated response (ignored once the pool is full or a duplicate)."""
+        stored = await self._load(key)
+        if len(stored) >= variants or text in stored:
+            return
+        stored = stored + [text]
+        with self._lock:
+            self._remember(key, stored)
+        if self._writer is not None:
+            self._writer.submit(self._write_disk, key, stored)
+        self._count(site, "stored")
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            sites = {}
+            for site, counts in self._stats.items():
+                lookups = counts.get("hits", 0) + counts.get("misses", 0)
+                sites[site] = {
+                    **counts,
+                    "hit_rate": round(counts.get("hits", 0) / lookups, 3) if lookups else 0.0,
+                }
+            return {"memory_entries": len(self._memory), "sites": sites}
+
+    # ── Tiers ────────────────────────────────────────────────────────────
+
+    async def _load(self, key: str) -> List[str]:
+        with self._lock:
+            stored = self._memory.get(key)
+            if stored is not None:
+                self._memory.move_to_end(key)
+                return stored
+        if self.cache_dir is None:
+            return []
+        stored = await asyncio.to_thread(self._read_disk, key)
+        if stored:
+            with self._lock:
+                self._remember(key, stored)
+        return stored
+
+    def _remember(self, key: str, stored: List[str]) -> None:
+        self._memory[key] = stored
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_path(self, key: str) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _read_disk(self, key: str) -> List[str]:
+        """Blocking: the variants stored on disk for key."""
+        path = self._disk_path(key)
+        if path is None or not path.exists():
+            return []
+        try:
+            return json.loads(path.read_text(encoding="utf-8")).get("variants", [])
+        except Exception as e:
+            logger.warning(f"LLM cache entry unreadable ({path.name}): {e}")
+            return []
+
+    def _write_disk(self, key: str, stored: List[str]) -> None:
+        """Blocking: persist key's variants (runs on the writer thread)."""
+        path = self._disk_path(key)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps({"variants": stored}, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, path)
+        except Exception as e:
+            logger.warning(f"LLM cache write failed ({path.name}): {e}")
+
+    def _count(self, site: str, field: str) -> None:
+        with self._lock:
+            counts = self._stats.setdefault(site, {"hits": 0, "misses": 0, "stored": 0})
+            counts[field] += 1
+
+
+# Global cache instance
+_llm_cache: Optional[LLMResponseCache] = None
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Get or create global LLMResponseCache instance"""
+    global _llm_cache
+    if _llm_cache is None:
+        from app.core.config import get_settings
+        settings = get_settings()
+        cache_dir = None
+        if settings.llm_cache_dir:
+            cache_dir = Path(settings.llm_cache_dir)
+            if not cache_dir.is_absolute():
+                cache_dir = _BACKEND_ROOT / cache_dir
+        _llm_cache = LLMResponseCache(
+            cache_dir=cache_dir,
+            max_memory_entries=settings.llm_cache_memory_entries,
+        )
+    return _llm_cache
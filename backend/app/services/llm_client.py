@@ -0,0 +1,283 @@
+"""
+LLM Client — async, pooled Gemini HTTP client
+
+Shared by every real-time LLM call in the backend (NPC dialogue, quick
+responses). Replaces ad-hoc synchronous `requests.post` calls that blocked
+the event loop — and with it every WebSocket room — for a full Gemini
+round trip.
+
+  - One httpx.AsyncClient per process: pooled keep-alive connections
+  - Per-call deadline covering queueing + the HTTP round trip
+  - Bounded concurrency so a burst of chats can't open unbounded sockets
+  - Admission through the shared LLMScheduler (per-model rate limits,
+    live lane ahead of batch generation, 429 retry-after, circuit breaker —
+    CircuitOpenError while the provider is failing)
+
+Usage:
+    from app.services.llm_client import get_llm_client
+
+    text = await get_llm_client().generate(prompt, model, temperature=0.7, max_tokens=300)
+
+    async for chunk in get_llm_client().stream(prompt, model):   # streamGenerateContent
+        ...
+
+    # Context caching: upload a long shared prefix once, then send only the tail
+    name = await get_llm_client().create_cached_content(model, prefix, ttl_seconds=3600)
+    text = await get_llm_client().generate(tail, model, cached_content=name)
+
+LLM_BACKEND=simulator swaps Gemini for the local SimulatedLLM
+(services/llm_simulator.py). Anything else implementing the TextLLM protocol
+can be installed with set_llm_client().
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import AsyncIterator, Optional, Protocol
+
+import httpx
+
+from app.core.config import get_settings
+from app.services.llm_scheduler import Priority, get_llm_scheduler
+
+logger = logging.getLogger(__name__)
+
+
+class TextLLM(Protocol):
+    """What callers rely on: a one-shot call and an incremental stream."""
+
+    async def generate(self, prompt: str, model: str, temperature: float = 0.7,
+                       max_tokens: int = 300, timeout: Optional[float] = None,
+                       cached_content: Optional[str] = None) -> str: ...
+
+    def stream(self, prompt: str, model: str, temperature: float = 0.7,
+               max_tokens: int = 300, timeout: Optional[float] = None,
+               cached_content: Optional[str] = None) -> AsyncIterator[str]: ...
+
+
+class LLMClient:
+    """Async Gemini `generateContent` / `streamGenerateContent` client with connection pooling."""
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str,
+        timeout: float = 20.0,
+        max_concurrency: int = 16,
+        max_connections: int = 32,
+        keepalive_expiry: float = 30.0,
+        priority: Priority = Priority.LIVE,
+    ):
+        self.api_key = api_key
+        self.priority = priority
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._http: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _client(self) -> httpx.AsyncClient:
+        # Created lazily so it binds to the running event loop
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                limits=self._limits,
+                timeout=httpx.Timeout(self.timeout, connect=min(5.0, self.timeout)),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._http
+
+    async def generate(
+        self,
+        prompt: str,
+        model: str,
+        temperature: float = 0.7,
+        max_tokens: int = 300,
+        timeout: Optional[float] = None,
+        cached_content: Optional[str] = None,
+    ) -> str:
+        """
+        Run one generateContent call and return the stripped text.
+
+        cached_content names a `cachedContents` resource the prompt continues.
+        Raises TimeoutError when the deadline (default: client timeout) expires,
+        httpx.HTTPStatusError on non-2xx responses.
+        """
+        deadline = timeout if timeout is not None else self.timeout
+        return await asyncio.wait_for(
+            self._generate(prompt, model, temperature, max_tokens, cached_content), timeout=deadline
+        )
+
+    def _payload(self, prompt: str, temperature: float, max_tokens: int,
+                 cached_content: Optional[str]) -> dict:
+        payload = {
+            "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+            "generationConfig": {
+                "temperature": temperature,
+                "maxOutputTokens": max_tokens,
+            }
+        }
+        if cached_content:
+            payload["cachedContent"] = cached_content
+        return payload
+
+    async def _generate(self, prompt: str, model: str, temperature: float, max_tokens: int,
+                        cached_content: Optional[str] = None) -> str:
+        client = self._client()
+        url = f"{self.base_url}/models/{model}:generateContent"
+        payload = self._payload(prompt, temperature, max_tokens, cached_content)
+
+        async def _post() -> httpx.Response:
+            async with self._semaphore:
+                response = await client.post(url, params={"key": self.api_key}, json=payload)
+            response.raise_for_status()
+            return response
+
+        response = await get_llm_scheduler().run(model, _post, self.priority)
+        data = response.json()
+        return data["candidates"][0]["content"]["parts"][0]["text"].strip()
+
+    async def stream(
+        self,
+        prompt: str,
+        model: str,
+        temperature: float = 0.7,
+        max_tokens: int = 300,
+        timeout: Optional[float] = None,
+        cached_content: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Yield text chunks from streamGenerateContent (server-sent events).
+
+        The deadline applies to the whole stream, including time queued in
+        the scheduler; TimeoutError is raised if it expires between chunks.
+        """
+        deadline = time.monotonic() + (timeout if timeout is not None else self.timeout)
+        client = self._client()
+        url = f"{self.base_url}/models/{model}:streamGenerateContent"
+        payload = self._payload(prompt, temperature, max_tokens, cached_content)
+
+        async def _stream() -> AsyncIterator[str]:
+            async with self._semaphore:
+                async with client.stream(
+                    "POST", url, params={"key": self.api_key, "alt": "sse"}, json=payload
+                ) as response:
+                    try:
+                        response.raise_for_status()
+                    except httpx.HTTPStatusError:
+                        # Read the body so the connection returns to the pool
+                        await response.aread()
+                        raise
+                    async for text in self._sse_text(response, deadline):
+                        yield text
+
+        async for text in get_llm_scheduler().run_stream(model, _stream, deadline, self.priority):
+            yield text
+
+    async def create_cached_content(self, model: str, text: str, ttl_seconds: int = 3600) -> str:
+        """
+        Upload text as a `cachedContents` resource and return its name.
+
+        Later calls pass the name as cached_content and send only what
+        follows the cached text. The provider rejects contents below a
+        model-specific minimum size (HTTP 400).
+        """
+        client = self._client()
+        payload = {
+            "model": f"models/{model}",
+            "contents": [{"role": "user", "parts": [{"text": text}]}],
+            "ttl": f"{int(ttl_seconds)}s",
+        }
+
+        async def _post() -> httpx.Response:
+            async with self._semaphore:
+                response = await client.post(f"{self.base_url}/cachedContents",
+                                             params={"key": self.api_key}, json=payload)
+            response.raise_for_status()
+            return response
+
+        response = await get_llm_scheduler().run(model, _post, self.priority)
+        return response.json()["name"]
+
+    async def _sse_text(self, response: httpx.Response, deadline: float) -> AsyncIterator[str]:
+        """Text parts from a streamGenerateContent SSE body, enforcing the deadline."""
+        lines = response.aiter_lines()
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("LLM stream deadline exceeded")
+            try:
+                line = await asyncio.wait_for(lines.__anext__(), timeout=remaining)
+            except StopAsyncIteration:
+                break
+            if not line.startswith("data:"):
+                continue
+            chunk = json.loads(line[5:].strip())
+            for candidate in chunk.get("candidates", [])[:1]:
+                for part in candidate.get("content", {}).get("parts", []):
+                    if part.get("text"):
+                        yield part["text"]
+
+    async def aclose(self) -> None:
+        if self._http is not None and not self._http.is_closed:
+            await self._http.aclose()
+        self._http = None
+
+
+# Global LLM client instance
+_llm_client: Optional[TextLLM] = None
+_background_llm_client: Optional[TextLLM] = None
+
+
+def new_llm_client(timeout: Optional[float] = None, priority: Priority = Priority.LIVE) -> TextLLM:
+    """A client for the configured backend (llm_backend: "gemini" or "simulator")."""
+    settings = get_settings()
+    timeout = timeout if timeout is not None else settings.llm_timeout_seconds
+    if settings.llm_backend == "simulator":
+        from app.services.llm_simulator import SimulatedLLM, get_llm_simulator
+        return SimulatedLLM(get_llm_simulator(), timeout=timeout, priority=priority)
+    return LLMClient(
+        api_key=settings.gemini_api_key,
+        base_url=settings.gemini_base_url,
+        timeout=timeout,
+        max_concurrency=settings.llm_max_concurrency,
+        max_connections=settings.llm_max_connections,
+        priority=priority,
+    )
+
+
+def get_llm_client() -> TextLLM:
+    """Get or create global LLM client instance"""
+    global _llm_client
+    if _llm_client is None:
+        _llm_client = new_llm_client()
+        if get_settings().llm_backend == "simulator":
+            logger.warning("🧪 LLM backend: local simulator (no Gemini calls)")
+    return _llm_client
+
+
+def get_background_llm_client() -> TextLLM:
+    """Get or create the global BATCH-lane client, for background work no player waits on"""
+    global _background_llm_client
+    if _background_llm_client is None:
+        _background_llm_client = new_llm_client(priority=Priority.BATCH)
+    return _background_llm_client
+
+
+def set_llm_client(client: Optional[TextLLM]) -> None:
+    """Install a different client (e.g. a local stub). None restores the default."""
+    global _llm_client
+    _llm_client = client
+
+
+async def close_llm_client() -> None:
+    """Close pooled connections. Call from the shutdown event."""
+    global _llm_client
+    if _llm_client is not None and hasattr(_llm_client, "aclose"):
+        await _llm_client.aclose()
+    _llm_client = None
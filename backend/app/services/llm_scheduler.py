@@ -0,0 +1,419 @@
+"""
+LLM Scheduler — one rate limiter for every Gemini call in the process
+
+NPC dialogue, scenario generation (scripts/generators, the editor agent) and
+the image scripts all draw from the same per-model quota. Without a shared
+view, a scenario generation that overlaps live chats gets the chats
+rate-limited. The scheduler gives every call site:
+
+  - Token-bucket limits per model (requests/minute, short bursts allowed)
+  - Retry-after awareness: a 429 pauses that model's bucket for the delay
+    the API suggests and the call is retried
+  - Two lanes: LIVE (a player is waiting) and BATCH (generation jobs).
+    BATCH never takes the last `live_reserve` share of a bucket and yields
+    while LIVE calls are queued
+  - Queue-time metrics per model and lane (reported on /health)
+  - A circuit breaker per model (services/circuit_breaker.py): while a
+    model is failing, calls raise CircuitOpenError immediately
+
+Works from async code (run, run_blocking, run_stream) and from worker
+threads such as the scenario pipeline (run_sync); buckets are thread-safe.
+
+Usage:
+    from app.services.llm_scheduler import get_llm_scheduler, Priority
+
+    text = await get_llm_scheduler().run(model, lambda: post(...), Priority.LIVE)
+    resp = get_llm_scheduler().run_sync(model, lambda: m.generate_content(p), Priority.BATCH)
+"""
+
+import asyncio
+import logging
+import re
+import threading
+import time
+from collections import deque
+from contextlib import aclosing
+from enum import IntEnum
+from typing import AsyncIterator, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from app.services.circuit_breaker import CLOSED, CircuitBreaker, CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_RETRY_PATTERNS = (
+    re.compile(r"retry in ([\d.]+)s", re.IGNORECASE),
+    re.compile(r"\"?retryDelay\"?\s*[:=]\s*['\"]?([\d.]+)s"),
+)
+
+
+class Priority(IntEnum):
+    LIVE = 0    # a player is waiting (NPC dialogue, quick responses)
+    BATCH = 1   # generation jobs (scenarios, opening banks, images)
+
+
+def parse_retry_after(error_str: str, default: float = 15.0) -> float:
+    """Extract the suggested retry delay (seconds) from a 429 error message."""
+    for pattern in _RETRY_PATTERNS:
+        match = pattern.search(error_str)
+        if match:
+            return float(match.group(1)) + 2.0
+    return default
+
+
+def is_rate_limited(exc: BaseException) -> bool:
+    """True for 429 / RESOURCE_EXHAUSTED from httpx or the google SDKs."""
+    response = getattr(exc, "response", None)
+    if getattr(response, "status_code", None) == 429:
+        return True
+    text = str(exc)
+    return "429" in text or "RESOURCE_EXHAUSTED" in text
+
+
+def _is_provider_failure(exc: Exception) -> bool:
+    """Errors that say the provider is unhealthy (not quota, not our own bad request)."""
+    if is_rate_limited(exc):
+        return False
+    status = getattr(getattr(exc, "response", None), "status_code", None)
+    return not (isinstance(status, int) and 400 <= status < 500)
+
+
+def retry_after_for(exc: BaseException, default: float = 15.0) -> float:
+    """Retry delay for a rate-limit error: Retry-After header, then message body."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is not None and headers.get("retry-after"):
+        try:
+            return float(headers["retry-after"])
+        except ValueError:
+            pass
+    text = str(exc)
+    try:
+        text += " " + response.text  # httpx: only available once the body was read
+    except Exception:
+        pass
+    return parse_retry_after(text, default)
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate_per_minute` sustained, `burst` at once."""
+
+    def __init__(self, rate_per_minute: float, burst: Optional[float] = None):
+        self.rate = max(rate_per_minute, 0.001) / 60.0
+        self.capacity = burst if burst is not None else max(1.0, self.rate * 10)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def try_take(self, reserve: float = 0.0) -> float:
+        """
+        Take one token, leaving at least `reserve` tokens in the bucket.
+        Returns 0.0 on success, otherwise the seconds to wait before retrying.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now < self.blocked_until:
+                return self.blocked_until - now
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1.0 + reserve:
+                self.tokens -= 1.0
+                return 0.0
+            return (1.0 + reserve - self.tokens) / self.rate
+
+    def block_for(self, seconds: float) -> None:
+        """Pause the bucket (server asked us to back off) and drain it."""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+
+class _LaneStats:
+    def __init__(self):
+        self.calls = 0
+        self.rate_limited = 0
+        self.waits: Deque[float] = deque(maxlen=500)
+        self.max_wait = 0.0
+
+    def snapshot(self) -> Dict:
+        waits = sorted(self.waits)
+        p95 = waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0
+        return {
+            "calls": self.calls,
+            "rate_limited": self.rate_limited,
+            "queue_ms_mean": round(sum(waits) / len(waits) * 1000, 1) if waits else 0.0,
+            "queue_ms_p95": round(p95 * 1000, 1),
+            "queue_ms_max": round(self.max_wait * 1000, 1),
+        }
+
+
+class LLMScheduler:
+    """Per-model token buckets with a LIVE lane ahead of BATCH work."""
+
+    def __init__(
+        self,
+        default_rpm: float = 1000.0,
+        model_rpm: Optional[Dict[str, float]] = None,
+        live_reserve: float = 0.25,
+        max_retries: int = 3,
+        poll_interval: float = 0.25,
+        breaker_config: Optional[Dict] = None,
+    ):
+        self.default_rpm = default_rpm
+        self.model_rpm = dict(model_rpm or {})
+        self.live_reserve = live_reserve
+        self.max_retries = max_retries
+        self.poll_interval = poll_interval
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._live_waiting: Dict[str, int] = {}
+        self._stats: Dict[str, Dict[Priority, _LaneStats]] = {}
+        self.breaker_config = dict(breaker_config or {})
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    # ── Admission ────────────────────────────────────────────────────────
+
+    def _bucket(self, model: str) -> TokenBucket:
+        model = model.removeprefix("models/")
+        with self._lock:
+            bucket = self._buckets.get(model)
+            if bucket is None:
+                bucket = TokenBucket(self.model_rpm.get(model, self.default_rpm))
+                self._buckets[model] = bucket
+                self._stats[model] = {p: _LaneStats() for p in Priority}
+            return bucket
+
+    def _try_admit(self, model: str, priority: Priority) -> float:
+        bucket = self._bucket(model)
+        if priority == Priority.LIVE:
+            return bucket.try_take()
+        with self._lock:
+            live_waiting = self._live_waiting.get(model, 0)
+        if live_waiting:
+            return self.poll_interval
+        return bucket.try_take(reserve=bucket.capacity * self.live_reserve)
+
+    def _enter(self, model: str, priority: Priority) -> None:
+        if priority == Priority.LIVE:
+            with self._lock:
+                self._live_waiting[model] = self._live_waiting.get(model, 0) + 1
+
+    def _leave(self, model: str, priority: Priority, waited: float) -> None:
+        with self._lock:
+            if priority == Priority.LIVE:
+                self._live_waiting[model] -= 1
+            stats = self._stats[model][priority]
+            stats.calls += 1
+            stats.waits.append(waited)
+            stats.max_wait = max(stats.max_wait, waited)
+        if waited > 1.0:
+            logger.info(f"⏳ LLM {priority.name.lower()} call to {model} queued {waited:.1f}s")
+
+    async def acquire(self, model: str, priority: Priority = Priority.LIVE) -> float:
+        """Wait (without blocking the loop) until a call may go out. Returns seconds queued."""
+        model = model.removeprefix("models/")
+        started = time.monotonic()
+        self._bucket(model)
+        self._enter(model, priority)
+        try:
+            while True:
+                wait = self._try_admit(model, priority)
+                if wait <= 0:
+                    break
+                await asyncio.sleep(min(wait, self.poll_interval))
+        finally:
+            waited = time.monotonic() - started
+            self._leave(model, priority, waited)
+        return waited
+
+    def acquire_sync(self, model: str, priority: Priority = Priority.BATCH) -> float:
+        """Blocking acquire for worker threads (scenario pipeline, editor agent)."""
+        model = model.removeprefix("models/")
+        started = time.monotonic()
+        self._bucket(model)
+        self._enter(model, priority)
+        try:
+            while True:
+                wait = self._try_admit(model, priority)
+                if wait <= 0:
+                    break
+                time.sleep(min(wait, self.poll_interval))
+        finally:
+            waited = time.monotonic() - started
+            self._leave(model, priority, waited)
+        return waited
+
+    def note_rate_limited(self, model: str, retry_after: float,
+                          priority: Priority = Priority.LIVE) -> None:
+        """Record a 429 and pause the model's bucket for the suggested delay."""
+        model = model.removeprefix("models/")
+        self._bucket(model).block_for(retry_after)
+        with self._lock:
+            self._stats[model][priority].rate_limited += 1
+        logger.warning(f"⏳ {model} rate limited — pausing its queue for {retry_after:.1f}s")
+
+    # ── Submission ───────────────────────────────────────────────────────
+
+    async def run(self, model: str, call: Callable[[], Awaitable[T]],
+                  priority: Priority = Priority.LIVE) -> T:
+        """Admit and run an async call, retrying after 429s."""
+        breaker = self.circuit(model)
+        for attempt in range(self.max_retries + 1):
+            probe = breaker.before_call()
+            started: Optional[float] = None
+            try:
+                await self.acquire(model, priority)
+                started = time.monotonic()
+                result = await call()
+            except BaseException as e:
+                self.record_outcome(model, started, e, probe)
+                if not self._should_retry(e, attempt):
+                    raise
+                self.note_rate_limited(model, retry_after_for(e), priority)
+                continue
+            self.record_outcome(model, started, None, probe)
+            return result
+        raise RuntimeError("unreachable")
+
+    async def run_blocking(self, model: str, call: Callable[[], T],
+                           priority: Priority = Priority.BATCH) -> T:
+        """Admit from async code, run a blocking SDK call in a worker thread."""
+        return await self.run(model, lambda: asyncio.to_thread(call), priority)
+
+    async def run_stream(self, model: str, stream: Callable[[], AsyncIterator[str]],
+                         deadline: float, priority: Priority = Priority.LIVE) -> AsyncIterator[str]:
+        """
+        Admit a streaming call and yield its chunks. A 429 raised before the
+        first chunk is retried; once text has been yielded errors propagate.
+        `deadline` (time.monotonic()) bounds the time queued for admission.
+        """
+        breaker = self.circuit(model)
+        for attempt in range(self.max_retries + 1):
+            probe = breaker.before_call()
+            started: Optional[float] = None
+            yielded = False
+            try:
+                await asyncio.wait_for(
+                    self.acquire(model, priority), timeout=max(0.0, deadline - time.monotonic())
+                )
+                started = time.monotonic()
+                async with aclosing(stream()) as chunks:
+                    async for chunk in chunks:
+                        yielded = True
+                        yield chunk
+            except BaseException as e:
+                self.record_outcome(model, started, e, probe)
+                if yielded or not self._should_retry(e, attempt):
+                    raise
+                self.note_rate_limited(model, retry_after_for(e), priority)
+                continue
+            self.record_outcome(model, started, None, probe)
+            return
+
+    def run_sync(self, model: str, call: Callable[[], T],
+                 priority: Priority = Priority.BATCH) -> T:
+        """Admit and run a blocking call on the current (worker) thread."""
+        breaker = self.circuit(model)
+        for attempt in range(self.max_retries + 1):
+            probe = breaker.before_call()
+            started: Optional[float] = None
+            try:
+                self.acquire_sync(model, priority)
+                started = time.monotonic()
+                result = call()
+            except BaseException as e:
+                self.record_outcome(model, started, e, probe)
+                if not self._should_retry(e, attempt):
+                    raise
+                self.note_rate_limited(model, retry_after_for(e), priority)
+                continue
+            self.record_outcome(model, started, None, probe)
+            return result
+        raise RuntimeError("unreachable")
+
+    def _should_retry(self, exc: BaseException, attempt: int) -> bool:
+        return isinstance(exc, Exception) and is_rate_limited(exc) and attempt < self.max_retries
+
+    # ── Circuit breaking ─────────────────────────────────────────────────
+
+    def circuit(self, model: str) -> CircuitBreaker:
+        """The model's circuit breaker. Call before_call() before admitting a call."""
+        model = model.removeprefix("models/")
+        with self._lock:
+            breaker = self._breakers.get(model)
+            if breaker is None:
+                breaker = CircuitBreaker(model, **self.breaker_config)
+                self._breakers[model] = breaker
+            return breaker
+
+    def record_outcome(self, model: str, started: Optional[float],
+                       error: Optional[BaseException], probe: int = 0) -> None:
+        """
+        Feed one call's outcome to the model's breaker. `started` is when the
+        call went out (None if it never did); `probe` is the token before_call
+        returned, so only the half-open probe's outcome decides the circuit.
+        """
+        breaker = self.circuit(model)
+        elapsed = time.monotonic() - started if started is not None else 0.0
+        if error is None:
+            breaker.record(True, elapsed, probe)
+        elif isinstance(error, CircuitOpenError):
+            pass
+        elif isinstance(error, Exception) and _is_provider_failure(error):
+            breaker.record(False, elapsed, probe)
+        elif started is not None and elapsed >= breaker.slow_call_seconds:
+            # Cancelled (deadline, losing hedge) after running long: a slow call
+            breaker.record(True, elapsed, probe)
+        else:
+            breaker.release_probe(probe)
+
+    # ── Metrics ──────────────────────────────────────────────────────────
+
+    def open_circuits(self) -> Dict[str, str]:
+        """Models whose circuit is not closed -> state."""
+        with self._lock:
+            breakers = list(self._breakers.items())
+        return {model: b.state for model, b in breakers if b.state != CLOSED}
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            return {
+                model: {
+                    "rpm": round(self._buckets[model].rate * 60, 1),
+                    "live_waiting": self._live_waiting.get(model, 0),
+                    "circuit": self._breakers[model].status() if model in self._breakers else None,
+                    **{p.name.lower(): lanes[p].snapshot() for p in Priority},
+                }
+                for model, lanes in self._stats.items()
+            }
+
+
+# Global scheduler instance
+_llm_scheduler: Optional[LLMScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """Get or create global LLMScheduler instance (shared by API and pipeline threads)"""
+    global _llm_scheduler
+    with _scheduler_lock:
+        if _llm_scheduler is None:
+            from app.core.config import get_settings
+            settings = get_settings()
+            _llm_scheduler = LLMScheduler(
+                default_rpm=settings.llm_default_rpm,
+                model_rpm=settings.llm_model_rpm,
+                live_reserve=settings.llm_live_reserve,
+                max_retries=settings.llm_rate_limit_retries,
+                breaker_config={
+                    "window_seconds": settings.llm_breaker_window_seconds,
+                    "min_calls": settings.llm_breaker_min_calls,
+                    "error_rate": settings.llm_breaker_error_rate,
+                    "slow_call_seconds": settings.llm_breaker_slow_call_seconds,
+                    "slow_rate": settings.llm_breaker_slow_rate,
+                    "open_seconds": settings.llm_breaker_open_seconds,
+                },
+            )
+        return _llm_scheduler
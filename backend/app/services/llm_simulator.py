@@ -0,0 +1,342 @@
+"""
+LLM Simulator — deterministic local stand-in for Gemini
+
+Lets NPC chat and the generation pipeline run under load without spending
+quota. Two ways to use it:
+
+  - In-process: LLM_BACKEND=simulator makes get_llm_client() (and the
+    pipeline's _generate_scheduled) answer from SimulatedLLM instead of
+    Gemini. Calls still go through the LLMScheduler, so rate limits,
+    429 retries and the circuit breaker behave as in production.
+  - Over HTTP: scripts/llm_simulator_server.py serves the same answers on
+    the Gemini REST paths; point GEMINI_BASE_URL at it to exercise the real
+    LLMClient end to end.
+
+Behaviour is configurable (SimulatorConfig): a log-normal latency
+distribution given by its median and p95, a server error rate, a 429 rate
+(plus an optional provider-side requests/minute quota), and a seed. Faults
+and latencies follow the seeded sequence; the text for a given prompt is
+always the same.
+
+Responses are structurally valid for the prompts the backend sends: quick
+response arrays (also inside batched prompts, see llm_batcher), NPC JSON /
+streamed replies (occasionally revealing an open target at high rapport),
+fallback banks, summaries, and the scenario enrichment prompts ("Return ONLY this JSON" templates, filled once per id
+listed in the prompt).
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, List, Optional
+
+import httpx
+
+from app.services.llm_batcher import split_batch_prompt
+from app.services.llm_scheduler import Priority, get_llm_scheduler
+
+
+@dataclass
+class SimulatorConfig:
+    latency_ms: float = 600.0         # median
+    latency_p95_ms: float = 1500.0    # <= latency_ms means fixed latency
+    error_rate: float = 0.0           # share of calls answered with HTTP 500
+    rate_limit_rate: float = 0.0      # share of calls answered with HTTP 429
+    rpm: float = 0.0                  # provider-side quota per model, 0 = unlimited
+    retry_after_seconds: float = 2.0
+    seed: int = 0
+
+
+class SimulatedFault(Exception):
+    """A fault the simulator decided to inject: HTTP status + Retry-After."""
+
+    def __init__(self, status: int, retry_after: Optional[float] = None):
+        super().__init__(f"simulated HTTP {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+    def as_http_error(self, model: str) -> httpx.HTTPStatusError:
+        request = httpx.Request("POST", f"http://llm-simulator/models/{model}:generateContent")
+        headers = {"Retry-After": f"{self.retry_after:g}"} if self.retry_after else {}
+        response = httpx.Response(self.status, headers=headers, request=request,
+                                  json={"error": {"code": self.status, "message": str(self)}})
+        return httpx.HTTPStatusError(str(self), request=request, response=response)
+
+
+_SENTENCES = [
+    "Well, it has been a long night here, I can tell you that.",
+    "You don't look like the usual crowd, but that's not a bad thing.",
+    "I have been working this floor for years, nothing surprises me anymore.",
+    "Honestly, the director worries too much about all of this.",
+    "Keep your voice down, people around here love to gossip.",
+    "Ha, that's one way to put it.",
+    "I'd rather not get into that right now.",
+    "Funny you should ask, I was just thinking the same thing.",
+]
+_PLAYER_LINES = [
+    "This place is stunning tonight, isn't it?",
+    "You must see everything that happens around here.",
+    "How long have you been working the gala?",
+    "I heard the new wing took years to finish.",
+    "Who decides which doors stay locked after hours?",
+    "So what exactly is behind that east wing door?",
+    "Is that vault as secure as everyone says?",
+    "Any chance you could show me the back corridors?",
+]
+_WILDCARD_LINES = [
+    "So, hypothetically, how would one rob this place?",
+    "Is that painting real? I've seen better on hotel walls.",
+]
+_JSON_TEMPLATE = re.compile(r"Return ONLY this JSON[^\n]*\n", re.IGNORECASE)
+
+
+class LLMSimulator:
+    """Fault/latency decisions plus prompt-aware canned answers. Thread-safe."""
+
+    def __init__(self, config: Optional[SimulatorConfig] = None):
+        self.config = config or SimulatorConfig()
+        self._rng = random.Random(self.config.seed)
+        self._quota: dict = {}  # model -> (window_start, calls)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    # ── Faults and latency ───────────────────────────────────────────────
+
+    def sample_latency(self) -> float:
+        """Seconds for one call, log-normal between the configured median and p95."""
+        median = max(self.config.latency_ms, 1.0) / 1000.0
+        p95 = self.config.latency_p95_ms / 1000.0
+        with self._lock:
+            if p95 <= median:
+                return median
+            sigma = (math.log(p95) - math.log(median)) / 1.645
+            return self._rng.lognormvariate(math.log(median), sigma)
+
+    def fault(self, model: str) -> Optional[SimulatedFault]:
+        """The fault to inject for this call, if any."""
+        with self._lock:
+            self.calls += 1
+            if self.config.rpm > 0:
+                now = time.monotonic()
+                start, calls = self._quota.get(model, (now, 0))
+                if now - start >= 60.0:
+                    start, calls = now, 0
+                self._quota[model] = (start, calls + 1)
+                if calls + 1 > self.config.rpm:
+                    return SimulatedFault(429, max(1.0, 60.0 - (now - start)))
+            roll = self._rng.random()
+        if roll < self.config.rate_limit_rate:
+            return SimulatedFault(429, self.config.retry_after_seconds)
+        if roll < self.config.rate_limit_rate + self.config.error_rate:
+            return SimulatedFault(500)
+        return None
+
+    # ── Answers ──────────────────────────────────────────────────────────
+
+    def respond(self, prompt: str) -> str:
+        """A structurally valid answer for a backend prompt (same prompt, same answer)."""
+        digest = hashlib.sha256(f"{self.config.seed}|{prompt}".encode("utf-8")).digest()
+        rng = random.Random(digest)
+        batched = split_batch_prompt(prompt)
+        if batched is not None:
+            return json.dumps([self._as_json(self.respond(p)) for p in batched])
+        if "response options for a player" in prompt:
+            return self._quick_responses(prompt, rng)
+        if "RESPOND AS JSON" in prompt:
+            text, outcome = self._npc_reply(prompt, rng)
+            return json.dumps({"response": text, "outcomes": [outcome] if outcome else []})
+        if "OUTCOMES:" in prompt and "RESPOND with just your dialogue" in prompt:
+            text, outcome = self._npc_reply(prompt, rng)
+            return f"{text}\nOUTCOMES: {outcome or 'none'}"
+        if "canned lines" in prompt and '"replies"' in prompt:
+            return json.dumps({
+                "replies": rng.sample(_SENTENCES, 6),
+                "rapport": rng.sample(_PLAYER_LINES[:4], 4),
+                "steer": rng.sample(_PLAYER_LINES[2:6], 4),
+                "probe": rng.sample(_PLAYER_LINES[4:], 4),
+            })
+        template = _JSON_TEMPLATE.search(prompt)
+        if template:
+            filled = self._fill_template(prompt, prompt[template.end():], rng)
+            if filled is not None:
+                return json.dumps(filled)
+        return " ".join(rng.sample(_SENTENCES, 2))
+
+    @staticmethod
+    def _as_json(text: str):
+        try:
+            return json.loads(text)
+        except ValueError:
+            return text
+
+    def _quick_responses(self, prompt: str, rng: random.Random) -> str:
+        count = int(re.search(r"Generate (\d+) response options", prompt).group(1))
+        deltas = [float(d) for d in re.findall(r'rapport_delta"?:\s*(-?[\d.]+)', prompt.split("Return ONLY")[-1])]
+        options = []
+        for i in range(count):
+            wildcard = i == 3
+            options.append({
+                "text": rng.choice(_WILDCARD_LINES) if wildcard else _PLAYER_LINES[min(i * 3 + rng.randrange(2), 7)],
+                "rapport_delta": deltas[i] if i < len(deltas) else 0.0,
+                **({"is_wildcard": True} if wildcard else {}),
+            })
+        return json.dumps(options)
+
+    def _npc_reply(self, prompt: str, rng: random.Random):
+        text = " ".join(rng.sample(_SENTENCES, rng.choice([1, 2])))
+        section = prompt.split("SECRET TARGETS (guard", 1)
+        targets = re.findall(r"^- \[(\w+)\]", section[1].split("\n\n", 1)[0].split("Already shared", 1)[0], re.M) if len(section) > 1 else []
+        if targets and "Rapport is HIGH" in prompt and rng.random() < 0.35:
+            outcome = rng.choice(targets)
+            value = re.search(rf'- \[{re.escape(outcome)}\][^\n]*\n\s+EXACT (?:VALUE TO REVEAL|COMMITMENT): "([^"]*)"', prompt)
+            return f"{text} Between us: {value.group(1) if value else outcome.replace('_', ' ')}.", outcome
+        return text, None
+
+    def _fill_template(self, prompt: str, template_text: str, rng: random.Random):
+        """Parse the JSON template and fill it with one entry per id the prompt lists."""
+        try:
+            template, _ = json.JSONDecoder().raw_decode(template_text.strip())
+        except ValueError:
+            return None
+        context = self._context_arrays(prompt)
+
+        def fill(value, key: str = "", ident: str = ""):
+            if isinstance(value, dict):
+                return {k: fill(v, k, ident) for k, v in value.items()}
+            if isinstance(value, list):
+                if not value or not isinstance(value[0], dict):
+                    return value
+                example = value[0]
+                ids = self._ids_for(key, context) if "id" in example else []
+                if ids:
+                    return [{**fill(example, key, i), "id": i} for i in ids]
+                count = 3 if "cover" in key else len(value)
+                return [fill({**example, **({"id": f"{ident or key}_{n + 1}"} if "id" in example else {})},
+                             key, ident) for n in range(count)]
+            if isinstance(value, str):
+                if key == "id":
+                    return value
+                if "|" in value:
+                    return value.split("|")[0]
+                subject = (ident or key).replace("_", " ")
+                if key in ("name",):
+                    return subject.title()
+                if key in ("secret_value",):
+                    return f"{rng.randint(1, 9)}-{rng.randint(1, 9)}-{rng.randint(1, 9)}-{rng.randint(1, 9)}"
+                if key.endswith("_id") or key == "cover_id":
+                    return f"{subject.replace(' ', '_')}_{rng.randint(1, 99)}"
+                return f"{rng.choice(_SENTENCES)} ({subject})"
+            return value
+
+        return fill(template)
+
+    @staticmethod
+    def _context_arrays(prompt: str) -> dict:
+        """Headings like 'ITEMS (…):' / 'NPCS TO PROFILE:' → ids of the JSON array under them."""
+        found = {}
+        decoder = json.JSONDecoder()
+        for match in re.finditer(r"^([A-Z][A-Z ]+)[^\n]*:\s*\n?\[", prompt, re.M):
+            try:
+                array, _ = decoder.raw_decode(prompt[match.end() - 1:])
+            except ValueError:
+                continue
+            ids = [e["id"] for e in array if isinstance(e, dict) and "id" in e]
+            if ids:
+                found[match.group(1).strip()] = ids
+        return found
+
+    @staticmethod
+    def _ids_for(key: str, context: dict) -> List[str]:
+        stem = key.upper().rstrip("S")
+        for heading, ids in context.items():
+            if heading.startswith(stem):
+                return ids
+        return []
+
+    def generate_sync(self, model: str, prompt: str) -> str:
+        """Blocking call (pipeline threads): sleep the sampled latency, then answer or fail."""
+        time.sleep(self.sample_latency())
+        fault = self.fault(model)
+        if fault:
+            raise fault.as_http_error(model)
+        return self.respond(prompt)
+
+
+class SimulatedLLM:
+    """TextLLM backed by LLMSimulator, admitted through the shared LLMScheduler."""
+
+    def __init__(self, simulator: LLMSimulator, timeout: float = 20.0,
+                 priority: Priority = Priority.LIVE):
+        self.simulator = simulator
+        self.timeout = timeout
+        self.priority = priority
+
+    async def generate(self, prompt: str, model: str, temperature: float = 0.7,
+                       max_tokens: int = 300, timeout: Optional[float] = None,
+                       cached_content: Optional[str] = None) -> str:
+        async def _call() -> str:
+            await asyncio.sleep(self.simulator.sample_latency())
+            fault = self.simulator.fault(model)
+            if fault:
+                raise fault.as_http_error(model)
+            return self.simulator.respond(prompt)
+
+        return await asyncio.wait_for(
+            get_llm_scheduler().run(model, _call, self.priority),
+            timeout=timeout if timeout is not None else self.timeout,
+        )
+
+    async def stream(self, prompt: str, model: str, temperature: float = 0.7,
+                     max_tokens: int = 300, timeout: Optional[float] = None,
+                     cached_content: Optional[str] = None) -> AsyncIterator[str]:
+        """Words of the answer, the first after ~20% of the sampled latency."""
+        deadline = time.monotonic() + (timeout if timeout is not None else self.timeout)
+
+        async def _stream() -> AsyncIterator[str]:
+            latency = self.simulator.sample_latency()
+            await asyncio.sleep(latency * 0.2)
+            fault = self.simulator.fault(model)
+            if fault:
+                raise fault.as_http_error(model)
+            words = self.simulator.respond(prompt).split(" ")
+            for word in words:
+                await asyncio.sleep(latency * 0.8 / len(words))
+                if time.monotonic() > deadline:
+                    raise TimeoutError("LLM stream deadline exceeded")
+                yield word + " "
+
+        async for word in get_llm_scheduler().run_stream(model, _stream, deadline, self.priority):
+            yield word
+
+    async def create_cached_content(self, model: str, text: str, ttl_seconds: int = 3600) -> str:
+        return f"cachedContents/sim-{hashlib.sha256(text.encode('utf-8')).hexdigest()[:12]}"
+
+    async def aclose(self) -> None:
+        pass
+
+
+# Global simulator instance (shared by the in-process backend and pipeline)
+_simulator: Optional[LLMSimulator] = None
+
+
+def get_llm_simulator() -> LLMSimulator:
+    """Get or create global LLMSimulator instance"""
+    global _simulator
+    if _simulator is None:
+        from app.core.config import get_settings
+        settings = get_settings()
+        _simulator = LLMSimulator(SimulatorConfig(
+            latency_ms=settings.llm_simulator_latency_ms,
+            latency_p95_ms=settings.llm_simulator_latency_p95_ms,
+            error_rate=settings.llm_simulator_error_rate,
+            rate_limit_rate=settings.llm_simulator_rate_limit_rate,
+            rpm=settings.llm_simulator_rpm,
+            seed=settings.llm_simulator_seed,
+        ))
+    return _simulator
@@ -11,18 +11,28 @@ Quick responses are generated along a spectrum:
   - Direct probe     (-rapport, strong objective progress)
 """
 
+import asyncio
 import logging
 import random
 import json
 import re
-from typing import Optional, List, Dict, Tuple
-import requests
+import time
+from collections import deque
+from typing import Optional, List, Dict, Tuple, Protocol, Deque
+
+import httpx
 
 from app.models.npc import QuickResponseOption
 from app.models.game_state import (
     NPCData, NPCInfoItem, NPCAction, NPCCoverOption, GameState
 )
 from app.core.config import get_settings
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.llm_batcher import get_llm_batcher
+from app.services.llm_cache import get_llm_cache
+from app.services.llm_client import TextLLM, get_background_llm_client, get_llm_client
+from app.services.npc_prompt_prefix import CompiledPrefix, get_npc_prompt_prefixes
+from app.services.npc_session_store import get_npc_session_store
 
 logger = logging.getLogger(__name__)
 
@@ -66,6 +76,22 @@ RAPPORT_LABELS = {
     0.0: "Done",
 }
 
+# Streaming replies put dialogue first and this marker + outcome IDs last
+_OUTCOMES_MARKER = "OUTCOMES:"
+# rapport_delta values in the quick-response prompt (masked in its cache key)
+_DELTA_VALUE = re.compile(r'(rapport_delta"?:\s*)-?[\d.]+')
+
+# Reply rules — part of the static per-NPC prompt prefix
+_NPC_RULES = """Rules:
+- Stay in character. Be natural and conversational.
+- Keep response under 3 sentences.
+- If the player says something odd, off-topic, or suspiciously direct, deflect and do NOT share secrets. Return empty outcomes.
+- Only share target info when rapport is high enough AND the player's message naturally steers toward the topic.
+- When you DO share target info, you MUST include the EXACT VALUES from the secret information (the specific numbers, codes, names, times). Do NOT paraphrase or speak vaguely about their existence — either give the real data or don't reveal at all.
+- Only list outcome IDs that are SECRET TARGETS in this conversation.
+- If the player says something inconsistent with their claimed cover story, call it out naturally."""
+
+
 def rapport_label(rapport: float) -> str:
     for threshold in sorted(RAPPORT_LABELS.keys(), reverse=True):
         if rapport >= threshold:
@@ -78,28 +104,152 @@ def rapport_label(rapport: float) -> str:
 # ---------------------------------------------------------------------------
 
 class ConversationSession:
+    """
+    One player's conversation with one NPC. Slotted and compact: history is
+    (role, text) tuples, and messages folded into the rolling summary are
+    dropped (turns_folded keeps turn_count right). Lives in the
+    NPCSessionStore, which may spill it to disk via to_dict()/from_dict().
+    """
+
+    __slots__ = (
+        "npc_id", "player_id", "cover_id", "difficulty", "experience_id",
+        "target_outcomes", "conversation_history", "summary", "turns_folded", "summary_task", "current_responses", "speculative",
+        "rapport", "last_active",
+    )
+
     def __init__(self, npc_id: str, player_id: str, cover_id: str,
-                 difficulty: str, target_outcomes: List[str] = None):
+                 difficulty: str, target_outcomes: List[str] = None,
+                 experience_id: str = ""):
         self.npc_id = npc_id
         self.player_id = player_id
         self.cover_id = cover_id
         self.difficulty = difficulty
+        self.experience_id = experience_id
         self.target_outcomes: List[str] = target_outcomes or []
-        self.conversation_history: List[Dict] = []
+        # (role, text), role is "player" or "npc"
+        self.conversation_history: List[Tuple[str, str]] = []
+        # Rolling summary of messages already dropped from the history (npc_summarization)
+        self.summary: str = ""
+        self.turns_folded: int = 0
+        self.summary_task: Optional["asyncio.Task"] = None
         self.current_responses: List[QuickResponseOption] = []
+        # Speculative NPC replies keyed by quick-response text (npc_speculative_replies)
+        self.speculative: Dict[str, "SpeculativeReply"] = {}
+        self.last_active: float = 0.0
 
         cfg = DIFFICULTY_CONFIG.get(difficulty, DIFFICULTY_CONFIG["medium"])
         self.rapport: float = cfg["starting_rapport"]
 
+    def fork(self, player_text: str, rapport: float) -> "ConversationSession":
+        """Copy of this session as if the player had just said player_text."""
+        clone = ConversationSession(self.npc_id, self.player_id, self.cover_id,
+                                    self.difficulty, list(self.target_outcomes),
+                                    self.experience_id)
+        clone.conversation_history = list(self.conversation_history)
+        clone.summary = self.summary
+        clone.turns_folded = self.turns_folded
+        clone.rapport = rapport
+        clone.add_message(player_text, is_player=True)
+        return clone
+
+    def discard_speculation(self) -> None:
+        for spec in self.speculative.values():
+            spec.task.cancel()
+        self.speculative = {}
+
+    def close(self) -> None:
+        """Cancel background work (session ended, evicted or spilled)."""
+        self.discard_speculation()
+        if self.summary_task and not self.summary_task.done():
+            self.summary_task.cancel()
+        self.summary_task = None
+
     def add_message(self, text: str, is_player: bool):
-        self.conversation_history.append({
-            "role": "player" if is_player else "npc",
-            "text": text,
-        })
+        self.conversation_history.append(("player" if is_player else "npc", text))
+
+    def fold(self, upto: int, summary: str) -> None:
+        """Replace conversation_history[:upto] with a summary of it."""
+        folded = self.conversation_history[:upto]
+        self.turns_folded += sum(1 for role, _ in folded if role == "player")
+        del self.conversation_history[:upto]
+        self.summary = summary
+
+    def history_text(self, npc_name: str, limit: int) -> str:
+        """
+        The running summary (if any) plus up to `limit` recent messages
+        not yet folded into it — what prompts show of the conversation.
+        """
+        lines = [
+            f"{'Player' if role == 'player' else npc_name}: {text}"
+            for role, text in self.conversation_history[-limit:]
+        ]
+        if self.summary:
+            lines.insert(0, f"(Earlier: {self.summary})")
+        return "\n".join(lines)
 
     @property
     def turn_count(self) -> int:
-        return len([m for m in self.conversation_history if m["role"] == "player"])
+        return self.turns_folded + sum(1 for role, _ in self.conversation_history if role == "player")
+
+    def to_dict(self) -> Dict:
+        """Plain-data snapshot for spilling to disk (background tasks are not kept)."""
+        return {
+            "npc_id": self.npc_id, "player_id": self.player_id, "cover_id": self.cover_id,
+            "difficulty": self.difficulty, "experience_id": self.experience_id,
+            "target_outcomes": self.target_outcomes,
+            "conversation_history": self.conversation_history,
+            "summary": self.summary, "turns_folded": self.turns_folded, "rapport": self.rapport,
+            "current_responses": [r.model_dump() for r in self.current_responses],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ConversationSession":
+        session = cls(data["npc_id"], data["player_id"], data["cover_id"], data["difficulty"],
+                      data.get("target_outcomes", []), data.get("experience_id", ""))
+        session.conversation_history = [tuple(m) for m in data.get("conversation_history", [])]
+        session.summary = data.get("summary", "")
+        session.turns_folded = data.get("turns_folded", 0)
+        session.rapport = data["rapport"]
+        session.current_responses = [QuickResponseOption(**r) for r in data.get("current_responses", [])]
+        return session
+
+
+class SpeculativeReply:
+    """An NPC reply computed ahead of time for one offered quick response."""
+
+    def __init__(self, task: "asyncio.Task", rapport: float, achieved: frozenset):
+        self.task = task
+        self.rapport = rapport
+        self.achieved = achieved
+
+
+class ReplySink(Protocol):
+    """Receives an NPC reply while it streams (see process_player_choice)."""
+
+    async def delta(self, text: str) -> None:
+        """A new piece of NPC dialogue."""
+
+    async def done(self, text: str, outcomes: List[str], rapport: int,
+                   rapport_delta: int, conversation_failed: bool) -> None:
+        """The final reply text, verified outcomes and rapport."""
+
+
+class _DraftTap:
+    """
+    Forwards a streamed NPC reply to the real sink and signals once the first
+    sentence is in — the draft parallel mode conditions quick responses on.
+    """
+
+    def __init__(self, sink: ReplySink):
+        self.sink = sink
+        self.text = ""
+        self.ready = asyncio.Event()
+
+    async def delta(self, text: str) -> None:
+        self.text += text
+        if not self.ready.is_set() and re.search(r'[.!?](["\')]|\s)', self.text):
+            self.ready.set()
+        await self.sink.delta(text)
 
 
 # ---------------------------------------------------------------------------
@@ -120,21 +270,47 @@ class NPCConversationService:
 
     def __init__(self):
         settings = get_settings()
-        self.api_key = settings.gemini_api_key
         self.npc_model = settings.gemini_npc_model
         self.quick_response_model = settings.gemini_quick_response_model
-        self.base_url = "https://generativelanguage.googleapis.com/v1beta"
-        self.sessions: Dict[Tuple[str, str], ConversationSession] = {}
-        logger.info(f"NPC Conversation Service initialized (rapport mechanic) — NPC: {self.npc_model}, QR: {self.quick_response_model}")
+        self.sessions = get_npc_session_store()
+        self.turn_mode = settings.npc_turn_mode
+        self.reconcile_overlap = settings.npc_reconcile_overlap
+        self.speculative_replies = settings.npc_speculative_replies
+        self.stats: Dict[str, int] = {
+            "parallel_turns": 0, "reconciled": 0,
+            "speculative_hits": 0, "speculative_misses": 0,
+            "opening_bank_hits": 0, "opening_bank_misses": 0,
+            "npc_calls": 0, "hedged": 0, "deadline_misses": 0,
+            "prompt_turns": 0, "prompt_bytes_sent": 0,
+            "prefix_bytes_saved": 0, "prefix_tokens_saved_est": 0,
+            "summaries": 0, "summary_failures": 0,
+        }
+        self.latency_budget = settings.npc_latency_budget
+        self.reply_deadline = settings.npc_reply_deadline_seconds
+        self.hedge_min_delay = settings.npc_hedge_min_delay_seconds
+        self._reply_latencies: Deque[float] = deque(maxlen=200)
+        self.cache_sites: Dict[str, int] = dict(settings.llm_cache_sites)
+        self.opening_banks_enabled = settings.npc_opening_banks_enabled
+        self.summarization = settings.npc_summarization
+        self.summary_keep = settings.npc_summary_keep_messages
+        self.summary_batch = settings.npc_summary_batch
+        self.summary_max_chars = settings.npc_summary_max_chars
+        # Client override (the scenario pipeline runs its own event loop); None = shared client
+        self.llm: Optional[TextLLM] = None
+        logger.info(
+            f"NPC Conversation Service initialized (rapport mechanic) — NPC: {self.npc_model}, "
+            f"QR: {self.quick_response_model}, turns: {self.turn_mode}"
+            f"{' + speculative' if self.speculative_replies else ''}"
+        )
 
-    def get_session(self, player_id: str, npc_id: str) -> Optional[ConversationSession]:
-        return self.sessions.get((player_id, npc_id))
+    async def get_session(self, player_id: str, npc_id: str) -> Optional[ConversationSession]:
+        return await self.sessions.get(player_id, npc_id)
 
     # ------------------------------------------------------------------
     # Start conversation
     # ------------------------------------------------------------------
 
-    def start_conversation(
+    async def start_conversation(
         self,
         npc: NPCData,
         cover_id: str,
@@ -142,8 +318,11 @@ class NPCConversationService:
         difficulty: str,
         game_state: GameState,
         target_outcomes: List[str] = None,
+        room_code: str = "",
     ) -> Tuple[str, List[QuickResponseOption], int]:
-        """Start a new conversation. Returns (greeting, quick_responses, rapport_int)."""
+        """Start a new conversation. Returns (greeting, quick_responses, rapport_int).
+
+        room_code groups the session in the store so it's dropped with the room."""
 
         cover = next((c for c in npc.cover_options if c.cover_id == cover_id), None)
         if not cover:
@@ -153,39 +332,139 @@ class NPCConversationService:
             )
 
         session = ConversationSession(npc.id, player_id, cover_id, difficulty,
-                                      target_outcomes=target_outcomes or [])
-        self.sessions[(player_id, npc.id)] = session
+                                      target_outcomes=target_outcomes or [],
+                                      experience_id=game_state.experience_id)
+        # Replaces (and closes) any previous conversation with this NPC
+        self.sessions.put(room_code, session)
 
         # Store cover in game state
         if player_id not in game_state.chosen_covers:
             game_state.chosen_covers[player_id] = {}
         game_state.chosen_covers[player_id][npc.id] = cover_id
 
-        greeting = self._generate_greeting(npc, cover, difficulty)
-        session.add_message(greeting, is_player=False)
-
-        quick_responses = self._generate_quick_responses(npc, cover, session, difficulty)
+        opening = self._banked_opening(npc, cover, difficulty, session, game_state)
+        if opening:
+            greeting, quick_responses = opening
+            session.add_message(greeting, is_player=False)
+        else:
+            greeting = await self._generate_greeting(npc, cover, difficulty)
+            session.add_message(greeting, is_player=False)
+            quick_responses = await self._generate_quick_responses(npc, cover, session, difficulty)
         session.current_responses = quick_responses
+        self._start_speculation(npc, cover, session, difficulty, game_state)
 
         rapport_int = int(round(session.rapport))
         logger.info(f"Started conversation: {player_id} -> {npc.id} as '{cover.cover_id}' (difficulty={difficulty}, rapport={session.rapport})")
         return greeting, quick_responses, rapport_int
 
+    # ------------------------------------------------------------------
+    # Opening banks (pre-generated greeting + first quick responses)
+    # ------------------------------------------------------------------
+
+    def _banked_opening(
+        self, npc: NPCData, cover: NPCCoverOption, difficulty: str,
+        session: ConversationSession, game_state: GameState,
+    ) -> Optional[Tuple[str, List[QuickResponseOption]]]:
+        """Pick a pre-generated opening for this npc/cover/difficulty/targets, or None."""
+        if not self.opening_banks_enabled:
+            return None
+        entries = (game_state.npc_opening_banks.get(npc.id, {})
+                   .get(cover.cover_id, {}).get(difficulty, []))
+        targets = sorted(session.target_outcomes)
+        candidates = [e for e in entries if sorted(e.get("target_outcomes", [])) == targets]
+        if not candidates:
+            if game_state.npc_opening_banks:
+                self.stats["opening_bank_misses"] += 1
+            return None
+
+        entry = random.choice(candidates)
+        responses = [
+            QuickResponseOption(
+                text=qr["text"],
+                fit_score=int(round(float(qr.get("rapport_delta", 0)) * 10)),
+                is_wildcard=bool(qr.get("is_wildcard", False)),
+            )
+            for qr in entry.get("quick_responses", [])
+        ]
+        random.shuffle(responses)
+        self.stats["opening_bank_hits"] += 1
+        return entry["greeting"], responses
+
+    async def build_opening_bank(
+        self, npc: NPCData, target_sets: List[List[str]],
+        difficulties: List[str], variants: int = 2, concurrency: int = 8,
+        experience_id: str = "",
+    ) -> Dict[str, Dict[str, List[Dict]]]:
+        """
+        Pre-generate openings for one NPC (scenario pipeline, see
+        scripts/generators/opening_bank_generator.py).
+
+        Returns {cover_id: {difficulty: [{"greeting", "target_outcomes",
+        "quick_responses"}]}} — `variants` entries per target set. Failed
+        generations are left out rather than banking fallback text.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _opening(cover: NPCCoverOption, difficulty: str, targets: List[str]):
+            async with semaphore:
+                greeting = await self._generate_greeting(npc, cover, difficulty, strict=True)
+                session = ConversationSession(npc.id, "opening_bank", cover.cover_id,
+                                              difficulty, target_outcomes=list(targets),
+                                              experience_id=experience_id)
+                session.add_message(greeting, is_player=False)
+                responses = await self._generate_quick_responses(
+                    npc, cover, session, difficulty, strict=True
+                )
+            return cover.cover_id, difficulty, {
+                "greeting": greeting,
+                "target_outcomes": list(targets),
+                "quick_responses": [
+                    {"text": r.text, "rapport_delta": r.fit_score / 10.0, "is_wildcard": r.is_wildcard}
+                    for r in responses
+                ],
+            }
+
+        jobs = [
+            _opening(cover, difficulty, targets)
+            for cover in npc.cover_options
+            for difficulty in difficulties
+            for targets in target_sets
+            for _ in range(variants)
+        ]
+        bank: Dict[str, Dict[str, List[Dict]]] = {}
+        for result in await asyncio.gather(*jobs, return_exceptions=True):
+            if isinstance(result, BaseException):
+                logger.warning(f"Opening bank entry for {npc.id} failed: {result}")
+                continue
+            cover_id, difficulty, entry = result
+            bank.setdefault(cover_id, {}).setdefault(difficulty, []).append(entry)
+        return bank
+
     # ------------------------------------------------------------------
     # Process player choice
     # ------------------------------------------------------------------
 
-    def process_player_choice(
+    async def process_player_choice(
         self,
         response_index: int,
         player_id: str,
         npc: NPCData,
         difficulty: str,
         game_state: GameState,
+        sink: Optional[ReplySink] = None,
     ) -> Tuple[str, List[str], int, int, List[QuickResponseOption], bool, Optional[float], List[str], bool]:
         """
         Process a quick-response choice.
 
+        With a sink, the NPC reply is streamed (streamGenerateContent): dialogue
+        is pushed to sink.delta as it arrives and sink.done fires with outcomes
+        and rapport before the next quick responses are generated.
+
+        npc_turn_mode="parallel" generates the next quick responses alongside
+        a streamed NPC reply instead of after it (non-streamed turns stay
+        sequential); npc_speculative_replies answers from
+        a reply pre-computed while the player was reading the options.
+
         Returns: (npc_response, outcomes, rapport_int, rapport_delta_int,
                   next_quick_responses, conversation_failed, cooldown_until,
                   completed_tasks, opening_given)
@@ -193,7 +472,7 @@ class NPCConversationService:
         NOTE: opening_given is kept in the return signature for API compatibility
         but is always False in the rapport system.
         """
-        session = self.get_session(player_id, npc.id)
+        session = await self.get_session(player_id, npc.id)
         if not session:
             return ("I don't think we've met.", [], 0, 0, [], False, None, [], False)
 
@@ -202,6 +481,8 @@ class NPCConversationService:
 
         chosen = session.current_responses[response_index]
         player_text = chosen.text
+        speculation = session.speculative.pop(player_text, None)
+        session.discard_speculation()
         rapport_delta = chosen.fit_score / 10.0  # fit_score stores rapport_delta * 10
 
         # Apply rapport change
@@ -219,32 +500,60 @@ class NPCConversationService:
 
         # Check for failure: rapport too low
         if session.rapport <= cfg["fail_threshold"]:
-            dismissal = self._generate_failure_dismissal(npc, session, player_text, difficulty)
+            dismissal = await self._generate_failure_dismissal(npc, session, player_text, difficulty)
             session.add_message(dismissal, is_player=False)
-            del self.sessions[(player_id, npc.id)]
+            self.sessions.pop(player_id, npc.id)
             logger.info(f"Conversation FAILED: rapport dropped to {session.rapport:.1f}")
             rapport_int = 0
             delta_int = int(round(rapport_delta * 10))
+            if sink:
+                await sink.done(dismissal, [], rapport_int, delta_int, True)
             return (dismissal, [], rapport_int, delta_int, [], True, None, [], False)
 
         # Check turn limit
         if session.turn_count >= cfg["max_turns"]:
             dismissal = "It's been lovely chatting, but I really must get back to my duties. Perhaps we can talk another time."
             session.add_message(dismissal, is_player=False)
-            del self.sessions[(player_id, npc.id)]
+            self.sessions.pop(player_id, npc.id)
             logger.info(f"Conversation timed out after {session.turn_count} turns")
             rapport_int = int(round(session.rapport))
             delta_int = int(round(rapport_delta * 10))
+            if sink:
+                await sink.done(dismissal, [], rapport_int, delta_int, True)
             return (dismissal, [], rapport_int, delta_int, [], True, None, [], False)
 
         # Get NPC response with outcome detection
         cover = next((c for c in npc.cover_options if c.cover_id == session.cover_id), None)
         already_achieved = set(game_state.achieved_outcomes.get(player_id, []))
-        npc_response, outcomes = self._get_npc_response(
-            npc, cover, session, player_text, difficulty, already_achieved
-        )
+        delta_int = int(round(rapport_delta * 10))
+        next_responses: Optional[List[QuickResponseOption]] = None
+        draft: Optional[str] = None
+
+        reply = None
+        if speculation:
+            reply = await self._claim_speculation(speculation, session, already_achieved)
+        if reply:
+            npc_response, outcomes = reply
+            if sink:
+                await sink.delta(npc_response)
+                await sink.done(npc_response, outcomes, int(round(session.rapport)), delta_int, False)
+        elif self.turn_mode == "parallel" and sink:
+            # Needs the stream: the draft to reconcile against is its first sentence
+            npc_response, outcomes, next_responses, draft = await self._parallel_turn(
+                npc, cover, session, player_text, difficulty, already_achieved, sink, delta_int
+            )
+        elif sink:
+            npc_response, outcomes = await self._stream_npc_response(
+                npc, cover, session, player_text, difficulty, already_achieved, sink
+            )
+            await sink.done(npc_response, outcomes, int(round(session.rapport)), delta_int, False)
+        else:
+            npc_response, outcomes = await self._get_npc_response(
+                npc, cover, session, player_text, difficulty, already_achieved
+            )
 
         session.add_message(npc_response, is_player=False)
+        self._schedule_summary(npc, session)
 
         # Track achieved outcomes
         completed_tasks: List[str] = []
@@ -255,21 +564,170 @@ class NPCConversationService:
                 if outcome_id not in game_state.achieved_outcomes[player_id]:
                     game_state.achieved_outcomes[player_id].append(outcome_id)
 
+        # Parallel quick responses were written before the reply was final
+        if next_responses is not None and self._reply_diverges(draft, npc_response, outcomes):
+            self.stats["reconciled"] += 1
+            logger.info(f"Reply diverged from draft — regenerating quick responses ({self.stats})")
+            next_responses = None
+
         # Generate next quick responses
-        next_responses = self._generate_quick_responses(npc, cover, session, difficulty)
+        if next_responses is None:
+            next_responses = await self._generate_quick_responses(npc, cover, session, difficulty)
         session.current_responses = next_responses
+        self._start_speculation(npc, cover, session, difficulty, game_state)
 
         rapport_int = int(round(session.rapport))
-        delta_int = int(round(rapport_delta * 10))
 
         return (npc_response, outcomes, rapport_int, delta_int, next_responses,
                 False, None, completed_tasks, False)
 
+    async def _parallel_turn(
+        self, npc: NPCData, cover: Optional[NPCCoverOption],
+        session: ConversationSession, player_text: str, difficulty: str,
+        already_achieved: set, sink: ReplySink, delta_int: int,
+    ) -> Tuple[str, List[str], List[QuickResponseOption], Optional[str]]:
+        """
+        Run the NPC reply and the next quick responses concurrently.
+
+        Streaming only: the quick-response call waits for the first sentence
+        of the streamed reply and uses it as a draft. Non-streamed turns
+        have no draft to reconcile against, so process_player_choice runs
+        them sequentially even in parallel mode. Returns (npc_response,
+        outcomes, quick_responses, draft) — the caller reconciles against
+        the draft.
+        """
+        self.stats["parallel_turns"] += 1
+        tap = _DraftTap(sink)
+
+        async def _reply() -> Tuple[str, List[str]]:
+            try:
+                text, outcomes = await self._stream_npc_response(
+                    npc, cover, session, player_text, difficulty, already_achieved, tap
+                )
+                await sink.done(text, outcomes, int(round(session.rapport)), delta_int, False)
+                return text, outcomes
+            finally:
+                tap.ready.set()
+
+        async def _quick_responses() -> Tuple[List[QuickResponseOption], Optional[str]]:
+            await tap.ready.wait()
+            draft = tap.text.strip() or None
+            responses = await self._generate_quick_responses(
+                npc, cover, session, difficulty, reply_pending=True, draft_reply=draft
+            )
+            return responses, draft
+
+        (npc_response, outcomes), (responses, draft) = await asyncio.gather(
+            _reply(), _quick_responses()
+        )
+        return npc_response, outcomes, responses, draft
+
+    def _reply_diverges(self, draft: Optional[str], final: str, outcomes: List[str]) -> bool:
+        """Whether quick responses written against `draft` no longer fit the final reply."""
+        if outcomes:
+            # A reveal changes what the player should ask next
+            return True
+        if not draft:
+            return False
+        draft_words = set(re.findall(r"\w+", draft.lower()))
+        if not draft_words:
+            return False
+        final_words = set(re.findall(r"\w+", final.lower()))
+        return len(draft_words & final_words) / len(draft_words) < self.reconcile_overlap
+
+    # ------------------------------------------------------------------
+    # Speculative replies
+    # ------------------------------------------------------------------
+
+    def _start_speculation(
+        self, npc: NPCData, cover: Optional[NPCCoverOption],
+        session: ConversationSession, difficulty: str, game_state: GameState,
+    ) -> None:
+        """Pre-compute the NPC reply to each offered quick response in the background."""
+        if not self.speculative_replies or not session.current_responses:
+            return
+        cfg = DIFFICULTY_CONFIG.get(difficulty, DIFFICULTY_CONFIG["medium"])
+        if session.turn_count + 1 >= cfg["max_turns"]:
+            return  # the next choice ends the conversation without an LLM reply
+
+        achieved = frozenset(game_state.achieved_outcomes.get(session.player_id, []))
+        for option in session.current_responses:
+            rapport = max(0.0, min(5.0, session.rapport + option.fit_score / 10.0))
+            if rapport <= cfg["fail_threshold"]:
+                continue  # this choice fails the conversation instead
+            fork = session.fork(option.text, rapport)
+            task = asyncio.create_task(self._get_npc_response(
+                npc, cover, fork, option.text, difficulty, set(achieved), background=True
+            ))
+            session.speculative[option.text] = SpeculativeReply(task, rapport, achieved)
+        logger.info(f"Speculating {len(session.speculative)} NPC replies for {session.player_id} -> {npc.id}")
+
+    async def _claim_speculation(
+        self, speculation: SpeculativeReply, session: ConversationSession, already_achieved: set,
+    ) -> Optional[Tuple[str, List[str]]]:
+        """Use a pre-computed reply if it was made for exactly this state, else None."""
+        if (speculation.task.cancelled()
+                or abs(speculation.rapport - session.rapport) > 1e-6
+                or speculation.achieved != frozenset(already_achieved)):
+            speculation.task.cancel()
+            self.stats["speculative_misses"] += 1
+            return None
+        # Still in flight: it has usually been admitted already, so awaiting it
+        # beats a fresh LIVE call queueing for the same bucket
+        reply = await speculation.task
+        self.stats["speculative_hits"] += 1
+        return reply
+
+    # ------------------------------------------------------------------
+    # Rolling summary (keeps prompts flat over long conversations)
+    # ------------------------------------------------------------------
+
+    def _schedule_summary(self, npc: NPCData, session: ConversationSession) -> None:
+        """Fold older messages into session.summary in the background, once enough have piled up."""
+        if not self.summarization or (session.summary_task and not session.summary_task.done()):
+            return
+        fold_to = len(session.conversation_history) - self.summary_keep
+        if fold_to < self.summary_batch:
+            return
+        session.summary_task = asyncio.create_task(self._summarize(npc, session, fold_to))
+
+    async def _summarize(self, npc: NPCData, session: ConversationSession, fold_to: int) -> None:
+        new_lines = "\n".join(
+            f"{'Player' if role == 'player' else npc.name}: {text}"
+            for role, text in session.conversation_history[:fold_to]
+        )
+        max_words = self.summary_max_chars // 6
+        prompt = f"""You keep running notes on a conversation in a heist game between a player and {npc.name} ({npc.role}).
+
+Notes so far:
+{session.summary or "(none yet)"}
+
+New lines:
+{new_lines}
+
+Rewrite the notes to cover everything, in at most {max_words} words of plain prose (no lists).
+Keep what the player claimed about themselves, topics already covered, anything {npc.name}
+revealed or agreed to, and anything that sounded off about the player's story."""
+
+        try:
+            summary = await self._call_llm(prompt, self.quick_response_model, temperature=0.2,
+                                           max_tokens=max_words * 2, background=True)
+        except Exception as e:
+            self.stats["summary_failures"] += 1
+            logger.warning(f"Conversation summary for {session.player_id} -> {npc.id} failed: {e}")
+            return
+        # Prompts keep showing the unfolded lines verbatim until this lands
+        session.fold(fold_to, summary.strip()[:self.summary_max_chars])
+        self.stats["summaries"] += 1
+        logger.info(f"📝 Folded {fold_to} messages of {session.player_id} -> {npc.id} into the summary "
+                    f"({len(session.summary)} chars)")
+
     # ------------------------------------------------------------------
     # Greeting
     # ------------------------------------------------------------------
 
-    def _generate_greeting(self, npc: NPCData, cover: NPCCoverOption, difficulty: str) -> str:
+    async def _generate_greeting(self, npc: NPCData, cover: NPCCoverOption, difficulty: str,
+                                 strict: bool = False) -> str:
         story_facts = f"\n=== WORLD FACTS (never contradict these) ===\n{npc.story_context}\n" if npc.story_context else ""
         prompt = f"""You are {npc.name}, a {npc.role}.
 Personality: {npc.personality}
@@ -284,8 +742,13 @@ Generate a SHORT greeting (1-2 sentences) that reflects your reaction to this pe
 Be natural and in character. Just the dialogue, no quotes or formatting."""
 
         try:
-            return self._call_llm(prompt, self.npc_model, temperature=0.7, max_tokens=150)
+            # Banks want distinct variants, so they bypass the response cache
+            return await self._call_llm_cached(
+                None if strict else "greeting", prompt, self.npc_model, temperature=0.7, max_tokens=150
+            )
         except Exception as e:
+            if strict:
+                raise
             logger.error(f"Error generating greeting: {e}")
             return "Oh, hello there. What can I do for you?"
 
@@ -293,12 +756,18 @@ Be natural and in character. Just the dialogue, no quotes or formatting."""
     # Quick response generation (rapport / steer / probe spectrum)
     # ------------------------------------------------------------------
 
-    def _generate_quick_responses(
+    async def _generate_quick_responses(
         self, npc: NPCData, cover: Optional[NPCCoverOption],
-        session: ConversationSession, difficulty: str
+        session: ConversationSession, difficulty: str,
+        reply_pending: bool = False, draft_reply: Optional[str] = None,
+        strict: bool = False,
     ) -> List[QuickResponseOption]:
         """Generate 3 quick responses along the rapport/steer/probe spectrum.
-        ~30% of the time, replaces the direct probe with a funny wildcard."""
+        ~30% of the time, replaces the direct probe with a funny wildcard.
+
+        reply_pending: the NPC hasn't answered the player's last line yet
+        (parallel turns) — condition on draft_reply if there is one.
+        strict: raise instead of returning fallback options (opening banks)."""
 
         cfg = DIFFICULTY_CONFIG.get(difficulty, DIFFICULTY_CONFIG["medium"])
         include_wildcard = random.random() < 0.30
@@ -309,12 +778,14 @@ Be natural and in character. Just the dialogue, no quotes or formatting."""
         probe_cost = -round(random.uniform(*cfg["probe_cost_range"]), 1)
         wildcard_cost = -round(random.uniform(2.0, 3.0), 1)
 
-        remaining_outcomes = self._remaining_outcomes_text(npc, session)
+        remaining_outcomes = self._remaining_outcomes_text(self._npc_prefix(npc, session), session)
 
-        recent = session.conversation_history[-6:]
-        context = "\n".join(
-            [f"{'Player' if m['role'] == 'player' else npc.name}: {m['text']}" for m in recent]
-        )
+        context = session.history_text(npc.name, limit=6)
+        if reply_pending and draft_reply:
+            context += f"\n{npc.name} (reply in progress, may change slightly): {draft_reply}"
+        elif reply_pending:
+            context += (f"\n({npc.name} is replying now — write options that work as the player's "
+                        f"next line whatever the reply is)")
         cover_desc = cover.description if cover else "Someone at the event"
 
         option_count = 4 if include_wildcard else 3
@@ -372,15 +843,24 @@ Rules:
 Return ONLY a JSON array (no markdown):
 [{{"text": "...", "rapport_delta": {rapport_build}}}, {{"text": "...", "rapport_delta": {steer_delta}}}, {{"text": "...", "rapport_delta": {probe_cost}}}{f', {{"text": "...", "rapport_delta": {wildcard_cost}, "is_wildcard": true}}' if include_wildcard else ""}]"""
 
+        # Deltas are assigned by position below, so they're masked out of the
+        # cache key — same conversation, same options, whatever was rolled
+        expected_deltas = [rapport_build, steer_delta, probe_cost]
+        cache_text = _DELTA_VALUE.sub(r"\1#", prompt)
+
         try:
-            raw = self._call_llm(prompt, self.quick_response_model, temperature=0.8, max_tokens=500)
+            raw = await self._call_llm_cached(
+                None if strict else "quick_responses", prompt, self.quick_response_model,
+                temperature=0.8, max_tokens=500, cache_text=cache_text,
+                validate=self._parses_as_json_list, batch=not strict,
+            )
             raw = self._strip_code_fences(raw)
             parsed = json.loads(raw)
 
             responses = []
-            for item in parsed[:option_count]:
-                rd = float(item.get("rapport_delta", 0))
-                wildcard = bool(item.get("is_wildcard", False))
+            for i, item in enumerate(parsed[:option_count]):
+                wildcard = bool(item.get("is_wildcard", False)) or (include_wildcard and i == 3)
+                rd = wildcard_cost if wildcard else expected_deltas[min(i, 2)]
                 responses.append(QuickResponseOption(
                     text=item["text"],
                     fit_score=int(round(rd * 10)),
@@ -392,47 +872,45 @@ Return ONLY a JSON array (no markdown):
             return responses
 
         except Exception as e:
-            logger.error(f"Error generating quick responses: {e}", exc_info=True)
-            return self._fallback_quick_responses(rapport_build, steer_delta, probe_cost)
+            if strict:
+                raise
+            logger.error(f"Error generating quick responses: {e}", exc_info=not isinstance(e, CircuitOpenError))
+            return self._fallback_quick_responses(rapport_build, steer_delta, probe_cost, npc)
 
     # ------------------------------------------------------------------
     # NPC response + outcome detection
     # ------------------------------------------------------------------
 
-    def _get_npc_response(
+    def _npc_prefix(self, npc: NPCData, session: ConversationSession) -> CompiledPrefix:
+        """The compiled static head of this NPC's reply prompt (see npc_prompt_prefix.py)."""
+        return get_npc_prompt_prefixes().get(
+            session.experience_id, npc, session.difficulty,
+            self._difficulty_prompt(session.difficulty), _NPC_RULES,
+        )
+
+    def _build_npc_prompt(
         self, npc: NPCData, cover: Optional[NPCCoverOption],
         session: ConversationSession, player_text: str, difficulty: str,
-        already_achieved: set = None,
-    ) -> Tuple[str, List[str]]:
-        """Get NPC response and detect outcomes. Returns (text, outcome_ids)."""
+        already_achieved: set = None, streaming: bool = False,
+    ) -> Tuple[CompiledPrefix, str, float]:
+        """Build the NPC reply prompt as (static prefix, per-turn tail, rapport used for pacing)."""
 
         already_achieved = already_achieved or set()
         target_outcomes = set(session.target_outcomes) if session.target_outcomes else set()
         cfg = DIFFICULTY_CONFIG.get(difficulty, DIFFICULTY_CONFIG["medium"])
+        prefix = self._npc_prefix(npc, session)
 
         cover_desc = cover.description if cover else "Someone at the event"
         trust_desc = cover.npc_reaction if cover else "An unknown person"
 
-        # Separate target vs background knowledge
-        target_info, target_actions, background = self._categorize_npc_knowledge(
-            npc, target_outcomes, already_achieved
-        )
-
-        target_section = ""
-        if target_info or target_actions:
-            target_section = "=== SECRET INFORMATION (outcome IDs for the JSON) ===\n"
-            if target_info:
-                target_section += "Info you could share:\n" + "\n".join(target_info) + "\n"
-            if target_actions:
-                target_section += "Actions you could agree to:\n" + "\n".join(target_actions) + "\n"
-
-        background_section = ""
-        if background:
-            background_section = "=== Other things you know (share freely as flavor) ===\n"
-            background_section += "\n".join(background) + "\n"
-
-        relationships = f"\nPeople you know: {npc.relationships}" if npc.relationships else ""
-        story_facts = f"\n=== WORLD FACTS (never contradict these) ===\n{npc.story_context}\n" if npc.story_context else ""
+        open_targets = prefix.target_lines(target_outcomes - already_achieved)
+        if open_targets:
+            target_section = "SECRET TARGETS (guard these; share only as the pacing allows):\n" + "\n".join(open_targets)
+        else:
+            target_section = "SECRET TARGETS: none — everything you know is flavor. Return empty outcomes."
+        shared = prefix.outcome_lines(target_outcomes & already_achieved)
+        if shared:
+            target_section += "\nAlready shared earlier (never list these as outcomes again):\n" + "\n".join(shared)
 
         # Rapport-based pacing
         rapport = session.rapport
@@ -467,26 +945,17 @@ Return ONLY a JSON array (no markdown):
                 f"{remaining} outcome(s) remaining."
             )
 
-        recent = session.conversation_history[-10:]
-        context = "\n".join(
-            [f"{'Player' if m['role'] == 'player' else npc.name}: {m['text']}" for m in recent]
-        )
-
-        prompt = f"""You are {npc.name}, a {npc.role}.
-Personality: {npc.personality}
-Location: {npc.location}{relationships}
-{story_facts}
+        context = session.history_text(npc.name, limit=10)
 
+        tail = f"""=== THIS CONVERSATION ===
 The person talking to you claims to be: {cover_desc}
 Your instinct about this person: {trust_desc}
 
 {target_section}
-{background_section}
+
 Current rapport: {rapport:.1f} out of 5
 Conversation turn: {session.turn_count}
 
-{self._difficulty_prompt(difficulty)}
-
 {pacing}
 
 Conversation so far:
@@ -494,55 +963,298 @@ Conversation so far:
 
 Player just said: "{player_text}"
 
-Rules:
-- Stay in character. Be natural and conversational.
-- Keep response under 3 sentences.
-- If the player says something odd, off-topic, or suspiciously direct, deflect and do NOT share secrets. Return empty outcomes.
-- Only share target info when rapport is high enough AND the player's message naturally steers toward the topic.
-- When you DO share target info, you MUST include the EXACT VALUES from the secret information (the specific numbers, codes, names, times). Do NOT paraphrase or speak vaguely about their existence — either give the real data or don't reveal at all.
-- If the player says something inconsistent with their claimed cover story, call it out naturally.
+{self._npc_output_format(streaming)}"""
+        return prefix, tail, rapport
+
+    def _npc_output_format(self, streaming: bool) -> str:
+        if streaming:
+            # Dialogue first so it can be shown while it streams; outcomes trail it
+            return f"""RESPOND with just your dialogue (no quotes, no JSON), then on a final new line:
+{_OUTCOMES_MARKER} id1, id2
 
-RESPOND AS JSON (no markdown, no wrapping):
-{{"response": "your dialogue", "outcomes": ["id1"]}}
+- "{_OUTCOMES_MARKER}": list outcome IDs ONLY for target info/actions you EXPLICITLY shared in THIS response. Write "{_OUTCOMES_MARKER} none" otherwise.
+- Do NOT include outcome IDs in the dialogue text."""
+        return """RESPOND AS JSON (no markdown, no wrapping):
+{"response": "your dialogue", "outcomes": ["id1"]}
 
 - "outcomes": Include outcome IDs ONLY for target info/actions you EXPLICITLY shared in THIS response. Empty array otherwise.
 - Do NOT include outcome IDs in the dialogue text.
-If nothing was revealed: {{"response": "your dialogue", "outcomes": []}}"""
+If nothing was revealed: {"response": "your dialogue", "outcomes": []}"""
+
+    async def _get_npc_response(
+        self, npc: NPCData, cover: Optional[NPCCoverOption],
+        session: ConversationSession, player_text: str, difficulty: str,
+        already_achieved: set = None, background: bool = False,
+    ) -> Tuple[str, List[str]]:
+        """Get NPC response and detect outcomes. Returns (text, outcome_ids).
+
+        background: nobody is waiting on the reply yet (speculation) — call
+        in the BATCH lane, without the latency budget (hedging + deadline)."""
+
+        prefix, tail, rapport = self._build_npc_prompt(
+            npc, cover, session, player_text, difficulty, already_achieved
+        )
+        allowed = set(session.target_outcomes) - (already_achieved or set())
 
         try:
-            raw = self._call_llm(prompt, self.npc_model, temperature=0.7, max_tokens=300)
+            prompt, cached_content = self._prompt_for_turn(prefix, tail)
+            try:
+                if not background and self.latency_budget:
+                    raw = await self._call_llm_hedged(prompt, self.npc_model, temperature=0.7,
+                                                      max_tokens=300, cached_content=cached_content)
+                else:
+                    raw = await self._call_llm(prompt, self.npc_model, temperature=0.7,
+                                               max_tokens=300, cached_content=cached_content,
+                                               background=background)
+            except httpx.HTTPStatusError as e:
+                self._check_cached_content(prefix, cached_content, e)
+                raise
             raw = self._strip_code_fences(raw)
             parsed = json.loads(raw)
             response_text = parsed.get("response", "...").strip().strip('"')
             claimed_outcomes = parsed.get("outcomes", [])
-            response_text = re.sub(r'\s*\[[\w]+\]\s*', ' ', response_text).strip()
-
-            # Verify claimed outcomes against actual secret values in the response
-            secret_map = self._get_secret_values_map(npc)
-            verified_outcomes = []
-            for oid in claimed_outcomes:
-                secret_val = secret_map.get(oid)
-                if not secret_val:
-                    verified_outcomes.append(oid)  # No secret_value to check against
-                elif self._verify_outcome(response_text, secret_val):
-                    verified_outcomes.append(oid)
-                else:
-                    logger.info(f"Stripped unverified outcome '{oid}' — NPC talked around it without revealing specifics")
-
-            logger.info(f"NPC response: '{response_text[:80]}' | claimed: {claimed_outcomes} | verified: {verified_outcomes} | rapport: {rapport:.1f}")
-            return response_text, verified_outcomes
+            return self._finalize_npc_response(prefix, response_text, claimed_outcomes, rapport, allowed)
         except json.JSONDecodeError as e:
             logger.warning(f"Failed to parse NPC JSON: {e}. Raw: {raw[:200]}")
             return raw.strip().strip('"'), []
+        except TimeoutError:
+            logger.warning(f"NPC reply missed the {self.reply_deadline:.1f}s deadline — serving a canned line")
+            return self._fallback_reply(npc), []
         except Exception as e:
-            logger.error(f"Error getting NPC response: {e}", exc_info=True)
-            return "Hmm, let me think about that.", []
+            logger.error(f"Error getting NPC response: {e}", exc_info=not isinstance(e, CircuitOpenError))
+            return self._fallback_reply(npc), []
+
+    async def _stream_npc_response(
+        self, npc: NPCData, cover: Optional[NPCCoverOption],
+        session: ConversationSession, player_text: str, difficulty: str,
+        already_achieved: set, sink: "ReplySink",
+    ) -> Tuple[str, List[str]]:
+        """
+        Streaming variant of _get_npc_response (streamGenerateContent).
+
+        Dialogue text is pushed to the sink as it arrives; the trailing
+        outcomes line is held back and parsed once the stream ends.
+        """
+        prefix, tail, rapport = self._build_npc_prompt(
+            npc, cover, session, player_text, difficulty, already_achieved, streaming=True
+        )
+        allowed = set(session.target_outcomes) - (already_achieved or set())
+        prompt, cached_content = self._prompt_for_turn(prefix, tail)
+        stream_kwargs = {"cached_content": cached_content} if cached_content else {}
+        started = time.monotonic()
+        first_chunk_at: Optional[float] = None
+        buffer = ""
+        sent = 0
+        try:
+            async for chunk in (self.llm or get_llm_client()).stream(
+                prompt, self.npc_model, temperature=0.7, max_tokens=300, **stream_kwargs
+            ):
+                buffer += chunk
+                visible = self._visible_stream_text(buffer)
+                if len(visible) > sent:
+                    if first_chunk_at is None:
+                        first_chunk_at = time.monotonic()
+                    await sink.delta(visible[sent:])
+                    sent = len(visible)
+        except Exception as e:
+            if isinstance(e, httpx.HTTPStatusError):
+                self._check_cached_content(prefix, cached_content, e)
+            logger.error(f"Error streaming NPC response: {e}", exc_info=not isinstance(e, CircuitOpenError))
+            if not buffer.strip():
+                return self._fallback_reply(npc), []
+
+        dialogue, _, outcomes_line = buffer.partition(_OUTCOMES_MARKER)
+        claimed_outcomes = [
+            o.strip().strip("[]\"'") for o in outcomes_line.split(",")
+            if o.strip() and o.strip().lower() != "none"
+        ]
+        response_text = dialogue.strip().strip('"')
+        if first_chunk_at is not None:
+            logger.info(
+                f"NPC stream: first words after {(first_chunk_at - started) * 1000:.0f}ms, "
+                f"complete after {(time.monotonic() - started) * 1000:.0f}ms"
+            )
+        return self._finalize_npc_response(prefix, response_text, claimed_outcomes, rapport, allowed)
+
+    def _prompt_for_turn(self, prefix: CompiledPrefix, tail: str) -> Tuple[str, Optional[str]]:
+        """
+        (prompt, cached_content) for one NPC turn. With a provider-side
+        cache for the prefix only the tail is sent; either way the bytes
+        sent and saved are counted for metrics().
+        """
+        cached_content = get_npc_prompt_prefixes().cached_content(
+            prefix, self.npc_model, self.llm or get_llm_client()
+        )
+        prompt = tail if cached_content else prefix.text + tail
+        sent = len(prompt.encode("utf-8"))
+        self.stats["prompt_turns"] += 1
+        self.stats["prompt_bytes_sent"] += sent
+        if cached_content:
+            self.stats["prefix_bytes_saved"] += prefix.size_bytes
+            self.stats["prefix_tokens_saved_est"] += prefix.est_tokens
+        logger.debug(
+            f"NPC prompt {prefix.key[1]}: sent {sent}B"
+            f"{f', prefix {prefix.size_bytes}B (~{prefix.est_tokens} tokens) served from cache' if cached_content else ''}"
+        )
+        return prompt, cached_content
+
+    def _check_cached_content(self, prefix: CompiledPrefix, cached_content: Optional[str],
+                              error: httpx.HTTPStatusError) -> None:
+        """Drop a cachedContents handle the provider refused, so the next turn re-uploads."""
+        if cached_content and error.response.status_code in (400, 403, 404):
+            logger.warning(f"Provider refused cached prefix {cached_content} — re-uploading")
+            get_npc_prompt_prefixes().drop_cached_content(prefix)
+
+    def _visible_stream_text(self, buffer: str) -> str:
+        """Dialogue part of a partial stream, holding back a possible partial marker."""
+        idx = buffer.find(_OUTCOMES_MARKER)
+        if idx >= 0:
+            return buffer[:idx].rstrip()
+        return buffer[:max(0, len(buffer) - len(_OUTCOMES_MARKER))]
+
+    def _finalize_npc_response(
+        self, prefix: CompiledPrefix, response_text: str, claimed_outcomes: List[str],
+        rapport: float, allowed: set,
+    ) -> Tuple[str, List[str]]:
+        """Strip stray outcome IDs from the dialogue and verify claimed outcomes.
+
+        allowed: the open target outcomes — the prompt lists every ID the NPC
+        knows, but only these may be achieved this turn."""
+        response_text = re.sub(r'\s*\[[\w]+\]\s*', ' ', response_text).strip()
+
+        # Verify claimed outcomes against actual secret values in the response
+        verified_outcomes = []
+        for oid in claimed_outcomes:
+            if oid not in allowed:
+                logger.info(f"Ignored claimed outcome '{oid}' — not an open target")
+                continue
+            secret_val = prefix.secret_values.get(oid)
+            if not secret_val:
+                verified_outcomes.append(oid)  # No secret_value to check against
+            elif self._verify_outcome(response_text, secret_val):
+                verified_outcomes.append(oid)
+            else:
+                logger.info(f"Stripped unverified outcome '{oid}' — NPC talked around it without revealing specifics")
+
+        logger.info(f"NPC response: '{response_text[:80]}' | claimed: {claimed_outcomes} | verified: {verified_outcomes} | rapport: {rapport:.1f}")
+        return response_text, verified_outcomes
+
+    # ------------------------------------------------------------------
+    # Latency budget (hedged calls, deadline, canned fallbacks)
+    # ------------------------------------------------------------------
+
+    async def _call_llm_hedged(self, prompt: str, model: str, temperature: float = 0.7,
+                               max_tokens: int = 300, cached_content: Optional[str] = None) -> str:
+        """
+        _call_llm with a latency budget: if the first call is still running
+        after the tracked p95, fire a duplicate and take whichever answers
+        first. Raises TimeoutError once npc_reply_deadline_seconds passes.
+        """
+        async def _timed() -> str:
+            started = time.monotonic()
+            text = await self._call_llm(prompt, model, temperature=temperature, max_tokens=max_tokens,
+                                        cached_content=cached_content)
+            self._reply_latencies.append(time.monotonic() - started)
+            return text
+
+        self.stats["npc_calls"] += 1
+        started = time.monotonic()
+        deadline = started + self.reply_deadline
+        hedge_at = started + self._hedge_delay()
+        pending = {asyncio.create_task(_timed())}
+        hedged = False
+        last_error: Optional[BaseException] = None
+        try:
+            while pending:
+                wait_until = deadline if hedged else min(deadline, hedge_at)
+                timeout = max(0.0, wait_until - time.monotonic())
+                done, pending = await asyncio.wait(pending, timeout=timeout,
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+                if done:
+                    continue
+                if time.monotonic() >= deadline:
+                    break
+                if not hedged:
+                    hedged = True
+                    self.stats["hedged"] += 1
+                    pending.add(asyncio.create_task(_timed()))
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if last_error is not None and time.monotonic() < deadline:
+            if isinstance(last_error, TimeoutError):
+                # The client's own timeout fired first: still a missed reply
+                self.stats["deadline_misses"] += 1
+            raise last_error
+        self.stats["deadline_misses"] += 1
+        raise TimeoutError("NPC reply deadline exceeded")
+
+    def _hedge_delay(self) -> float:
+        """When to fire the hedge: the p95 of recent NPC calls (floor: npc_hedge_min_delay_seconds)."""
+        if len(self._reply_latencies) < 20:
+            return max(self.hedge_min_delay, self.reply_deadline * 0.4)
+        latencies = sorted(self._reply_latencies)
+        return max(self.hedge_min_delay, latencies[int(len(latencies) * 0.95) - 1])
+
+    def _fallback_reply(self, npc: NPCData) -> str:
+        """A canned in-character line from the experience's fallback bank."""
+        replies = npc.fallback_bank.get("replies")
+        return random.choice(replies) if replies else "Hmm, let me think about that."
+
+    def metrics(self) -> Dict:
+        """Conversation counters plus hedge rate and the current hedge delay."""
+        calls = self.stats["npc_calls"]
+        turns = self.stats["prompt_turns"]
+        return {
+            **self.stats,
+            "hedge_rate": round(self.stats["hedged"] / calls, 3) if calls else 0.0,
+            "hedge_after_ms": round(self._hedge_delay() * 1000),
+            # Per NPC reply prompt: bytes on the wire, and prefix bytes/tokens
+            # not re-sent thanks to provider-side context caching
+            "prompt_bytes_per_turn": round(self.stats["prompt_bytes_sent"] / turns) if turns else 0,
+            "prefix_bytes_saved_per_turn": round(self.stats["prefix_bytes_saved"] / turns) if turns else 0,
+            "prefix_tokens_saved_per_turn": round(self.stats["prefix_tokens_saved_est"] / turns) if turns else 0,
+            "prompt_prefixes": get_npc_prompt_prefixes().metrics(),
+            "quick_response_batching": get_llm_batcher().metrics(),
+        }
+
+    async def build_fallback_bank(self, npc: NPCData) -> Dict[str, List[str]]:
+        """
+        Pre-generate canned lines for this NPC (scenario pipeline). Served when
+        a reply misses its deadline and as fallback quick responses.
+        """
+        story_facts = f"\n=== WORLD FACTS (never contradict these) ===\n{npc.story_context}\n" if npc.story_context else ""
+        prompt = f"""You are writing canned lines for {npc.name}, a {npc.role}, in a heist game.
+Personality: {npc.personality}
+Location: {npc.location}
+{story_facts}
+These are used when the live dialogue system is slow, so they must fit ANY point in a
+conversation and must NOT reveal any secrets, codes, names or schedules.
+
+Return ONLY a JSON object (no markdown):
+{{
+  "replies": [6 short in-character lines (1 sentence) where {npc.name} stalls, gets briefly distracted, or asks the player to repeat themselves],
+  "rapport": [4 short things a player might say to build rapport with {npc.name} (5-15 words)],
+  "steer": [4 short player lines that subtly steer toward {npc.name}'s work and the venue (5-15 words)],
+  "probe": [4 short, more pointed player questions about security or access at {npc.location} (5-15 words)]
+}}"""
+        raw = await self._call_llm(prompt, self.npc_model, temperature=0.9, max_tokens=800)
+        parsed = json.loads(self._strip_code_fences(raw))
+        return {
+            key: [str(line).strip().strip('"') for line in parsed.get(key, []) if str(line).strip()]
+            for key in ("replies", "rapport", "steer", "probe")
+        }
 
     # ------------------------------------------------------------------
     # Failure dismissal
     # ------------------------------------------------------------------
 
-    def _generate_failure_dismissal(
+    async def _generate_failure_dismissal(
         self, npc: NPCData, session: ConversationSession,
         last_player_text: str, difficulty: str
     ) -> str:
@@ -556,7 +1268,7 @@ The last thing they said was: "{last_player_text}"
 End this conversation naturally and firmly. 1-2 sentences. Just the dialogue."""
 
         try:
-            return self._call_llm(prompt, self.npc_model, temperature=0.7, max_tokens=150)
+            return await self._call_llm_cached("dismissal", prompt, self.npc_model, temperature=0.7, max_tokens=150)
         except Exception as e:
             logger.error(f"Error generating dismissal: {e}")
             return "I don't think I should be talking to you anymore. Please excuse me."
@@ -565,59 +1277,12 @@ End this conversation naturally and firmly. 1-2 sentences. Just the dialogue."""
     # Helpers
     # ------------------------------------------------------------------
 
-    def _remaining_outcomes_text(self, npc: NPCData, session: ConversationSession) -> str:
+    def _remaining_outcomes_text(self, prefix: CompiledPrefix, session: ConversationSession) -> str:
         """Build a description of what the player still needs to extract."""
         target_ids = set(session.target_outcomes)
         if not target_ids:
             return ""
-
-        lines = []
-        for item in npc.information_known:
-            if item.info_id and item.info_id in target_ids:
-                lines.append(f"- [{item.info_id}] {item.description}")
-        for action in npc.actions_available:
-            if action.action_id in target_ids:
-                lines.append(f"- [{action.action_id}] {action.description}")
-        return "\n".join(lines) if lines else ""
-
-    def _categorize_npc_knowledge(
-        self, npc: NPCData, target_outcomes: set, already_achieved: set
-    ) -> Tuple[List[str], List[str], List[str]]:
-        """Split NPC knowledge into target info, target actions, and background."""
-        target_info, target_actions, background = [], [], []
-        for item in npc.information_known:
-            if item.info_id:
-                if item.info_id in already_achieved:
-                    continue
-                elif item.info_id in target_outcomes:
-                    secret = f"\n    EXACT VALUE TO REVEAL: \"{item.secret_value}\"" if item.secret_value else ""
-                    target_info.append(f"- [{item.info_id}] {item.description}{secret}")
-                else:
-                    background.append(f"- {item.description} (flavor)")
-            else:
-                background.append(f"- {item.description} (flavor)")
-
-        for action in npc.actions_available:
-            if action.action_id in already_achieved:
-                continue
-            elif action.action_id in target_outcomes:
-                secret = f"\n    EXACT COMMITMENT: \"{action.secret_value}\"" if action.secret_value else ""
-                target_actions.append(f"- [{action.action_id}] {action.description}{secret}")
-            else:
-                background.append(f"- {action.description} (flavor)")
-
-        return target_info, target_actions, background
-
-    def _get_secret_values_map(self, npc: NPCData) -> Dict[str, str]:
-        """Build a map of outcome_id -> secret_value for verification."""
-        secret_map = {}
-        for item in npc.information_known:
-            if item.info_id and item.secret_value:
-                secret_map[item.info_id] = item.secret_value
-        for action in npc.actions_available:
-            if action.action_id and action.secret_value:
-                secret_map[action.action_id] = action.secret_value
-        return secret_map
+        return "\n".join(prefix.outcome_lines(target_ids))
 
     def _verify_outcome(self, response_text: str, secret_value: str) -> bool:
         """Check if the NPC response actually contains the secret value's key data."""
@@ -667,12 +1332,18 @@ End this conversation naturally and firmly. 1-2 sentences. Just the dialogue."""
 - At high rapport, share if the question feels natural for the conversation."""
 
     def _fallback_quick_responses(
-        self, rapport_build: float, steer_delta: float, probe_cost: float
+        self, rapport_build: float, steer_delta: float, probe_cost: float,
+        npc: Optional[NPCData] = None,
     ) -> List[QuickResponseOption]:
+        bank = npc.fallback_bank if npc else {}
+
+        def _line(kind: str, default: str) -> str:
+            return random.choice(bank[kind]) if bank.get(kind) else default
+
         responses = [
-            QuickResponseOption(text="So what's your role here tonight?", fit_score=int(round(rapport_build * 10))),
-            QuickResponseOption(text="Anything interesting happen tonight?", fit_score=int(round(steer_delta * 10))),
-            QuickResponseOption(text="I heard there's some valuable items here.", fit_score=int(round(probe_cost * 10))),
+            QuickResponseOption(text=_line("rapport", "So what's your role here tonight?"), fit_score=int(round(rapport_build * 10))),
+            QuickResponseOption(text=_line("steer", "Anything interesting happen tonight?"), fit_score=int(round(steer_delta * 10))),
+            QuickResponseOption(text=_line("probe", "I heard there's some valuable items here."), fit_score=int(round(probe_cost * 10))),
         ]
         random.shuffle(responses)
         return responses
@@ -686,19 +1357,52 @@ End this conversation naturally and firmly. 1-2 sentences. Just the dialogue."""
             raw = raw.strip()
         return raw
 
-    def _call_llm(self, prompt: str, model: str, temperature: float = 0.7, max_tokens: int = 300) -> str:
-        url = f"{self.base_url}/models/{model}:generateContent?key={self.api_key}"
-        payload = {
-            "contents": [{"parts": [{"text": prompt}]}],
-            "generationConfig": {
-                "temperature": temperature,
-                "maxOutputTokens": max_tokens,
-            }
-        }
-        response = requests.post(url, json=payload)
-        response.raise_for_status()
-        data = response.json()
-        return data["candidates"][0]["content"]["parts"][0]["text"].strip()
+    async def _call_llm_cached(
+        self, site: Optional[str], prompt: str, model: str, temperature: float = 0.7,
+        max_tokens: int = 300, cache_text: Optional[str] = None, validate=None,
+        batch: bool = False,
+    ) -> str:
+        """
+        _call_llm through the response cache when `site` is enabled in
+        llm_cache_sites. cache_text overrides the text the key is built
+        from; validate() gates what gets stored. batch: the prompt's answer
+        is JSON and may share a call with others (see llm_batcher).
+        """
+        variants = self.cache_sites.get(site, 0) if site else 0
+        if variants <= 0:
+            return await self._call_llm(prompt, model, temperature=temperature, max_tokens=max_tokens,
+                                        batch=batch)
+
+        cache = get_llm_cache()
+        key = cache.key(model, temperature, cache_text or prompt)
+        cached = await cache.pick(site, key, variants)
+        if cached is not None:
+            return cached
+        text = await self._call_llm(prompt, model, temperature=temperature, max_tokens=max_tokens,
+                                    batch=batch)
+        if text and (validate is None or validate(text)):
+            await cache.add(site, key, text, variants)
+        return text
+
+    def _parses_as_json_list(self, raw: str) -> bool:
+        try:
+            return isinstance(json.loads(self._strip_code_fences(raw)), list)
+        except ValueError:
+            return False
+
+    async def _call_llm(self, prompt: str, model: str, temperature: float = 0.7, max_tokens: int = 300,
+                        cached_content: Optional[str] = None, batch: bool = False,
+                        background: bool = False) -> str:
+        """background: nobody is waiting on the answer — use the BATCH lane,
+        so it never takes rate-limit budget from player-facing replies."""
+        llm = self.llm or (get_background_llm_client() if background else get_llm_client())
+        if batch and not cached_content:
+            return await get_llm_batcher().submit(llm, prompt, model,
+                                                  temperature=temperature, max_tokens=max_tokens)
+        extra = {"cached_content": cached_content} if cached_content else {}
+        return await llm.generate(
+            prompt, model, temperature=temperature, max_tokens=max_tokens, **extra
+        )
 
 
 # ---------------------------------------------------------------------------
@@ -0,0 +1,243 @@
+"""
+NPC Prompt Prefixes — compiled once per (experience, npc, difficulty)
+
+Every NPC reply prompt used to be rebuilt from scratch, re-walking the NPC's
+info and action lists to sort secrets from flavor. Most of that prompt never
+changes during a game: persona, world facts, everything the NPC knows (with
+outcome IDs), the difficulty block and the reply rules.
+
+Exact secret values are NOT part of the prefix: it is shared by every
+player talking to the NPC, so it would hand them other players' targets.
+Values go in the per-turn tail, for the current player's open targets only.
+
+That invariant part is compiled once and goes FIRST in the prompt; each
+turn appends only a short tail (cover, which outcomes are still secret
+targets and their exact values, rapport/pacing, recent conversation, output
+format). Static-first
+ordering is also what provider-side prefix caching needs:
+
+  - Gemini caches repeated prompt prefixes implicitly on newer models
+  - with llm_context_caching on, the prefix is uploaded once as a
+    `cachedContents` resource and turns send only the tail
+
+Usage:
+    prefixes = get_npc_prompt_prefixes()
+    prefix = prefixes.get(game_state.experience_id, npc, difficulty, difficulty_block, rules)
+    prompt = prefix.text + tail
+    handle = prefixes.cached_content(prefix, model, llm)   # None until uploaded
+
+experience_id carries the experience file's version, so a regenerated
+experience compiles fresh prefixes; stale ones age out of the LRU.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from app.models.game_state import NPCData
+
+logger = logging.getLogger(__name__)
+
+# Rough chars-per-token for English prompts; only used for reporting and the
+# provider's minimum cache size
+_CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // _CHARS_PER_TOKEN
+
+
+@dataclass
+class CompiledPrefix:
+    """The invariant head of one NPC's reply prompt plus lookups derived from it."""
+
+    key: Tuple[str, str, str]
+    text: str
+    # outcome_id -> exact value, for verifying claimed outcomes
+    secret_values: Dict[str, str]
+    # (outcome_id, description) for info items and actions that carry an ID
+    info: List[Tuple[str, str]]
+    actions: List[Tuple[str, str]]
+    size_bytes: int = 0
+    est_tokens: int = 0
+    # Provider-side cache (llm_context_caching): resource name, model, expiry
+    cached_content: Optional[str] = None
+    cached_model: Optional[str] = None
+    cache_expires_at: float = 0.0
+    uploading: bool = field(default=False, repr=False)
+    uncacheable: bool = field(default=False, repr=False)
+
+    def outcome_lines(self, outcome_ids: set) -> List[str]:
+        """'- [id] description' for the given outcomes, info first."""
+        return [f"- [{oid}] {desc}" for oid, desc in self.info + self.actions if oid in outcome_ids]
+
+    def target_lines(self, outcome_ids: set) -> List[str]:
+        """outcome_lines plus each outcome's exact value — per-turn tail only."""
+        lines = []
+        for items, label in ((self.info, "EXACT VALUE TO REVEAL"), (self.actions, "EXACT COMMITMENT")):
+            for oid, desc in items:
+                if oid not in outcome_ids:
+                    continue
+                value = self.secret_values.get(oid)
+                lines.append(f"- [{oid}] {desc}" + (f"\n    {label}: \"{value}\"" if value else ""))
+        return lines
+
+
+def compile_prefix(npc: NPCData, difficulty: str, difficulty_block: str, rules: str,
+                   key: Tuple[str, str, str]) -> CompiledPrefix:
+    """Render the static prompt head for one NPC at one difficulty."""
+    info, actions, secret_values = [], [], {}
+    known, agreeable, flavor = [], [], []
+    for item in npc.information_known:
+        if item.info_id:
+            info.append((item.info_id, item.description))
+            known.append(f"- [{item.info_id}] {item.description}")
+            if item.secret_value:
+                secret_values[item.info_id] = item.secret_value
+        else:
+            flavor.append(f"- {item.description} (flavor)")
+    for action in npc.actions_available:
+        actions.append((action.action_id, action.description))
+        agreeable.append(f"- [{action.action_id}] {action.description}")
+        if action.action_id and action.secret_value:
+            secret_values[action.action_id] = action.secret_value
+
+    knowledge = ""
+    if known or agreeable:
+        knowledge = "=== EVERYTHING YOU KNOW (outcome IDs in brackets) ===\n"
+        if known:
+            knowledge += "Info:\n" + "\n".join(known) + "\n"
+        if agreeable:
+            knowledge += "Actions you could agree to:\n" + "\n".join(agreeable) + "\n"
+        knowledge += ("Which of these are SECRET TARGETS in this conversation, with the exact details "
+                      "to reveal, is listed further down; treat every other item as vague flavor "
+                      "and never make up specifics for it.\n")
+    if flavor:
+        knowledge += "=== Other things you know (share freely as flavor) ===\n" + "\n".join(flavor) + "\n"
+
+    relationships = f"\nPeople you know: {npc.relationships}" if npc.relationships else ""
+    story_facts = f"\n=== WORLD FACTS (never contradict these) ===\n{npc.story_context}\n" if npc.story_context else ""
+    text = f"""You are {npc.name}, a {npc.role}.
+Personality: {npc.personality}
+Location: {npc.location}{relationships}
+{story_facts}
+{knowledge}
+{difficulty_block}
+
+{rules}
+"""
+    return CompiledPrefix(
+        key=key, text=text, secret_values=secret_values, info=info, actions=actions,
+        size_bytes=len(text.encode("utf-8")), est_tokens=estimate_tokens(text),
+    )
+
+
+class NPCPromptPrefixCache:
+    """LRU of compiled prefixes, plus their provider-side cache handles."""
+
+    def __init__(self, max_entries: int = 512, context_caching: bool = False,
+                 ttl_seconds: int = 3600, min_tokens: int = 1024):
+        self.max_entries = max_entries
+        self.context_caching = context_caching
+        self.ttl_seconds = ttl_seconds
+        self.min_tokens = min_tokens
+        self._entries: "OrderedDict[Tuple[str, str, str], CompiledPrefix]" = OrderedDict()
+        self.stats: Dict[str, int] = {"compiled": 0, "hits": 0, "uploads": 0, "upload_failures": 0}
+        # The scenario pipeline compiles prefixes from its own thread
+        self._lock = threading.Lock()
+
+    def get(self, experience_id: str, npc: NPCData, difficulty: str,
+            difficulty_block: str, rules: str) -> CompiledPrefix:
+        key = (experience_id, npc.id, difficulty)
+        with self._lock:
+            prefix = self._entries.get(key)
+            if prefix is not None:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return prefix
+        prefix = compile_prefix(npc, difficulty, difficulty_block, rules, key)
+        with self._lock:
+            prefix = self._entries.setdefault(key, prefix)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self.stats["compiled"] += 1
+        logger.info(f"🧩 Compiled prompt prefix for {npc.id}/{difficulty}: "
+                    f"{prefix.size_bytes}B (~{prefix.est_tokens} tokens)")
+        return prefix
+
+    def invalidate(self, experience_id: str) -> None:
+        """Drop every prefix of an experience (e.g. after it was regenerated)."""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == experience_id]:
+                del self._entries[key]
+
+    # ── Provider-side context caching ────────────────────────────────────
+
+    def cached_content(self, prefix: CompiledPrefix, model: str, llm) -> Optional[str]:
+        """
+        The `cachedContents` name to send instead of the prefix text, or None.
+
+        Never waits: a missing or expiring handle starts a background upload
+        and this turn sends the full prompt.
+        """
+        if not self.context_caching or prefix.uncacheable or not hasattr(llm, "create_cached_content"):
+            return None
+        if prefix.est_tokens < self.min_tokens:
+            prefix.uncacheable = True  # provider rejects caches this small
+            return None
+        now = time.time()
+        fresh = prefix.cached_content and prefix.cached_model == model and now < prefix.cache_expires_at - 60
+        if not fresh and not prefix.uploading:
+            prefix.uploading = True
+            asyncio.create_task(self._upload(prefix, model, llm))
+        return prefix.cached_content if fresh else None
+
+    def drop_cached_content(self, prefix: CompiledPrefix) -> None:
+        """Forget a handle the provider refused (expired or deleted early)."""
+        prefix.cached_content = None
+        prefix.cache_expires_at = 0.0
+
+    async def _upload(self, prefix: CompiledPrefix, model: str, llm) -> None:
+        try:
+            prefix.cached_content = await llm.create_cached_content(model, prefix.text, self.ttl_seconds)
+            prefix.cached_model = model
+            prefix.cache_expires_at = time.time() + self.ttl_seconds
+            self.stats["uploads"] += 1
+            logger.info(f"🧩 Prefix {prefix.key[1]}/{prefix.key[2]} cached provider-side as {prefix.cached_content}")
+        except Exception as e:
+            self.stats["upload_failures"] += 1
+            prefix.uncacheable = True
+            logger.warning(f"Context caching unavailable for {prefix.key[1]}/{prefix.key[2]}: {e}")
+        finally:
+            prefix.uploading = False
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            prefixes = list(self._entries.values())
+        return {
+            **self.stats,
+            "entries": len(prefixes),
+            "provider_cached": sum(1 for p in prefixes if p.cached_content),
+        }
+
+
+# Global prefix cache instance
+_prefix_cache: Optional[NPCPromptPrefixCache] = None
+
+
+def get_npc_prompt_prefixes() -> NPCPromptPrefixCache:
+    """Get or create global NPCPromptPrefixCache instance"""
+    global _prefix_cache
+    if _prefix_cache is None:
+        from app.core.config import get_settings
+        settings = get_settings()
+        _prefix_cache = NPCPromptPrefixCache(
+            context_caching=settings.llm_context_caching,
+            ttl_seconds=settings.llm_context_cache_ttl_seconds,
+            min_tokens=settings.llm_context_cache_min_tokens,
+        )
+    return _prefix_cache
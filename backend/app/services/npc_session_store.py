@@ -0,0 +1,274 @@
+"""
+NPC Session Store — bounded, evicting home for conversation sessions
+
+Conversation sessions used to live in a plain dict that only shrank when a
+conversation failed or timed out; walking away mid-chat, leaving a room or
+finishing a game left them (and their histories) in memory forever.
+
+  - Grouped by room: drop_room() forgets a finished game in one call
+  - Idle TTL: sessions untouched for npc_session_idle_seconds are evicted
+  - Cap: beyond npc_session_max, least recently used sessions go first
+  - Spill (optional): evicted sessions are written to npc_session_spill_dir
+    as JSON and restored transparently on the player's next turn, so a
+    paused conversation survives without holding memory. File I/O runs on
+    one spill thread (writes behind, reads awaited), in submission order,
+    never on the event loop
+
+Per-session memory is estimated from a random sample of live sessions and
+reported on /health.
+
+Usage:
+    store = get_npc_session_store()
+    store.put(room_code, session)
+    session = await store.get(player_id, npc_id)
+    store.drop_room(room_code)
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+_BACKEND_ROOT = Path(__file__).parent.parent.parent  # backend/
+
+SessionKey = Tuple[str, str]  # (player_id, npc_id)
+
+
+def _deep_size(value) -> int:
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_deep_size(v) for v in value)
+    elif isinstance(value, dict):
+        size += sum(_deep_size(k) + _deep_size(v) for k, v in value.items())
+    return size
+
+
+def session_size_bytes(session) -> int:
+    """Approximate memory held by a session (slots, history, summary, options)."""
+    return sys.getsizeof(session) + sum(_deep_size(getattr(session, name, None))
+                                        for name in session.__slots__)
+
+
+class NPCSessionStore:
+    """LRU of live sessions with room index, idle expiry and optional disk spill."""
+
+    def __init__(self, max_sessions: int = 5000, idle_seconds: float = 1800.0,
+                 spill_dir: Optional[Path] = None, spill_ttl_seconds: float = 6 * 3600.0):
+        self.max_sessions = max_sessions
+        self.idle_seconds = idle_seconds
+        self.spill_dir = spill_dir
+        self.spill_ttl_seconds = spill_ttl_seconds
+        # key -> (room_code, session), oldest access first
+        self._live: "OrderedDict[SessionKey, Tuple[str, object]]" = OrderedDict()
+        # key -> (room_code, spilled_at)
+        self._spilled: Dict[SessionKey, Tuple[str, float]] = {}
+        self._rooms: Dict[str, Set[SessionKey]] = {}
+        self.stats: Dict[str, int] = {"expired": 0, "evicted": 0, "spilled": 0, "restored": 0, "dropped_rooms": 0}
+        self._lock = threading.Lock()
+        # Single thread: a restore or delete queued after a spill sees its file
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="npc-spill") if spill_dir else None
+
+    async def get(self, player_id: str, npc_id: str):
+        """The session for (player, npc), restoring it from disk if it was spilled."""
+        key = (player_id, npc_id)
+        with self._lock:
+            entry = self._live.get(key)
+            if entry is not None:
+                self._live.move_to_end(key)
+                entry[1].last_active = time.monotonic()
+                return entry[1]
+            spilled = self._spilled.pop(key, None)
+        if spilled is None:
+            return None
+        session = await asyncio.wrap_future(self._io.submit(self._restore, key))
+        if session is None:
+            self._unindex(spilled[0], key)
+            return None
+        self.stats["restored"] += 1
+        self.put(spilled[0], session)
+        return session
+
+    def put(self, room_code: str, session) -> None:
+        """Add or replace the session for (session.player_id, session.npc_id)."""
+        key = (session.player_id, session.npc_id)
+        session.last_active = time.monotonic()
+        with self._lock:
+            previous = self._live.pop(key, None)
+            self._spilled.pop(key, None)
+            self._live[key] = (room_code, session)
+            self._rooms.setdefault(room_code, set()).add(key)
+        if previous is not None and previous[1] is not session:
+            previous[1].close()
+        self.sweep()
+
+    def pop(self, player_id: str, npc_id: str) -> None:
+        """Forget a session that ended (failed, timed out)."""
+        key = (player_id, npc_id)
+        with self._lock:
+            entry = self._live.pop(key, None)
+            spilled = self._spilled.pop(key, None)
+        room_code = (entry or spilled or ("", None))[0]
+        self._unindex(room_code, key)
+        if entry is not None:
+            entry[1].close()
+        if spilled is not None:
+            self._delete_spill(key)
+
+    def drop_room(self, room_code: str) -> int:
+        """Forget every session of a room (game over / room cleaned up). Returns how many."""
+        with self._lock:
+            keys = self._rooms.pop(room_code, set())
+            live = [self._live.pop(k)[1] for k in keys if k in self._live]
+            spilled = [k for k in keys if self._spilled.pop(k, None) is not None]
+        for session in live:
+            session.close()
+        for key in spilled:
+            self._delete_spill(key)
+        if keys:
+            self.stats["dropped_rooms"] += 1
+            logger.info(f"🧹 Dropped {len(keys)} NPC conversation(s) for room {room_code}")
+        return len(keys)
+
+    def drop_player(self, room_code: str, player_id: str) -> int:
+        """Forget one player's sessions in a room (player left for good)."""
+        with self._lock:
+            keys = [k for k in self._rooms.get(room_code, ()) if k[0] == player_id]
+        for key in keys:
+            self.pop(*key)
+        return len(keys)
+
+    def sweep(self) -> None:
+        """Evict idle sessions, then least recently used ones beyond the cap."""
+        now = time.monotonic()
+        evict = []
+        with self._lock:
+            while self._live:
+                key, (room_code, session) = next(iter(self._live.items()))
+                idle = now - session.last_active >= self.idle_seconds
+                if not idle and len(self._live) <= self.max_sessions:
+                    break
+                self._live.popitem(last=False)
+                evict.append((key, room_code, session, idle))
+            stale = [(k, self._spilled.pop(k)[0]) for k, (_, at) in list(self._spilled.items())
+                     if time.time() - at > self.spill_ttl_seconds]
+        for key, room_code in stale:
+            self._delete_spill(key)
+            self._unindex(room_code, key)
+        for key, room_code, session, idle in evict:
+            self.stats["expired" if idle else "evicted"] += 1
+            session.close()
+            if self._spill(key, room_code, session):
+                continue
+            self._unindex(room_code, key)
+
+    # ── Spill to disk ────────────────────────────────────────────────────
+
+    def _spill_path(self, key: SessionKey) -> Path:
+        safe = "__".join("".join(c if c.isalnum() or c in "-_" else "_" for c in part) for part in key)
+        return self.spill_dir / f"{safe}.json"
+
+    def _spill(self, key: SessionKey, room_code: str, session) -> bool:
+        """Snapshot the session and queue its write; it counts as spilled right away."""
+        if self._io is None:
+            return False
+        data = session.to_dict()
+        with self._lock:
+            self._spilled[key] = (room_code, time.time())
+        self.stats["spilled"] += 1
+        self._io.submit(self._write_spill, key, room_code, data)
+        return True
+
+    def _write_spill(self, key: SessionKey, room_code: str, data: Dict) -> None:
+        """Spill thread: write one session file; forget the session if that fails."""
+        path = self._spill_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, path)
+        except Exception as e:
+            logger.warning(f"Could not spill NPC session {key}: {e}")
+            with self._lock:
+                self._spilled.pop(key, None)
+            self._unindex(room_code, key)
+
+    def _restore(self, key: SessionKey):
+        """Spill thread: read back (and remove) a spilled session."""
+        from app.services.npc_conversation_service import ConversationSession
+        path = self._spill_path(key)
+        try:
+            session = ConversationSession.from_dict(json.loads(path.read_text(encoding="utf-8")))
+        except Exception as e:
+            logger.warning(f"Could not restore spilled NPC session {key}: {e}")
+            return None
+        finally:
+            path.unlink(missing_ok=True)
+        return session
+
+    def _delete_spill(self, key: SessionKey) -> None:
+        if self._io is not None:
+            self._io.submit(self._spill_path(key).unlink, missing_ok=True)
+
+    def _unindex(self, room_code: str, key: SessionKey) -> None:
+        with self._lock:
+            keys = self._rooms.get(room_code)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._rooms[room_code]
+
+    def metrics(self, sample_size: int = 64) -> Dict:
+        """Counts, with memory estimated from up to sample_size live sessions.
+
+        Walking every session's history on each /health probe would cost
+        O(sessions × history); the totals here are extrapolated."""
+        with self._lock:
+            count = len(self._live)
+            sample = [session for _, session in random.sample(list(self._live.values()), min(sample_size, count))]
+            rooms = len(self._rooms)
+            spilled = len(self._spilled)
+        sizes = [session_size_bytes(s) for s in sample]
+        per_session = sum(sizes) / len(sizes) if sizes else 0
+        return {
+            **self.stats,
+            "sessions": count,
+            "spilled_sessions": spilled,
+            "rooms": rooms,
+            "bytes_total_estimate": round(per_session * count),
+            "bytes_per_session": round(per_session),
+            "bytes_max_sampled_session": max(sizes, default=0),
+            "sampled_sessions": len(sizes),
+        }
+
+
+# Global session store instance
+_session_store: Optional[NPCSessionStore] = None
+
+
+def get_npc_session_store() -> NPCSessionStore:
+    """Get or create global NPCSessionStore instance"""
+    global _session_store
+    if _session_store is None:
+        from app.core.config import get_settings
+        settings = get_settings()
+        spill_dir = None
+        if settings.npc_session_spill_dir:
+            spill_dir = Path(settings.npc_session_spill_dir)
+            if not spill_dir.is_absolute():
+                spill_dir = _BACKEND_ROOT / spill_dir
+        _session_store = NPCSessionStore(
+            max_sessions=settings.npc_session_max,
+            idle_seconds=settings.npc_session_idle_seconds,
+            spill_dir=spill_dir,
+        )
+    return _session_store
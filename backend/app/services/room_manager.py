@@ -11,6 +11,7 @@ from datetime import datetime
 from pathlib import Path
 
 from app.models.room import GameRoom, Player, RoomStatus
+from app.services.npc_session_store import get_npc_session_store
 
 logger = logging.getLogger(__name__)
 
@@ -179,6 +180,7 @@ class RoomManager:
         player_name = room.players[player_id].name
         del room.players[player_id]
         logger.info(f"👋 Player {player_name} ({player_id}) left room {room_code}")
+        get_npc_session_store().drop_player(room_code, player_id)
         
         # If no players left, mark room as abandoned
         if len(room.players) == 0:
@@ -342,6 +344,7 @@ class RoomManager:
             return False
         
         room.status = RoomStatus.COMPLETED
+        get_npc_session_store().drop_room(room_code)
         logger.info(f"🏁 Game ended in room {room_code} - result: {result}")
         return True
     
@@ -366,6 +369,7 @@ class RoomManager:
         
         for room_code in to_remove:
             del self.rooms[room_code]
+            get_npc_session_store().drop_room(room_code)
             logger.info(f"🧹 Cleaned up abandoned room {room_code}")
         
         return len(to_remove)
@@ -4,6 +4,10 @@ Scenario Generator Service
 Thin async wrapper around the shared scenario_pipeline.run_pipeline().
 Called from handle_start_game when the requested scenario file doesn't exist.
 Players see progress via WebSocket broadcasts while the scenario is built.
+
+NPC opening banks (pipeline stage 7) are many LLM calls, so they are not
+part of the wait: once the scenario is saved they are generated in the
+background, and later games of the same scenario start with them.
 """
 
 import asyncio
@@ -11,12 +15,15 @@ import logging
 import queue
 import sys
 from pathlib import Path
-from typing import Callable, Awaitable, List
+from typing import Callable, Awaitable, List, Set
 
 logger = logging.getLogger(__name__)
 
 _SCRIPTS_DIR = Path(__file__).parent.parent.parent / "scripts"
 
+# Background opening-bank tasks (strong refs so they aren't garbage collected)
+_bank_tasks: Set[asyncio.Task] = set()
+
 # Spoiler-free progress messages keyed by pipeline phase.
 # The pipeline emits technical messages; we map them to player-friendly ones.
 _PHASE_MESSAGES = {
@@ -93,6 +100,7 @@ async def generate_scenario(
             scenario_id=scenario_id,
             roles=roles,
             progress_fn=lambda msg: progress_queue.put(msg),
+            opening_banks=False,
         )
 
     loop = asyncio.get_event_loop()
@@ -135,6 +143,7 @@ async def generate_scenario(
     if result.success:
         from app.services.storage_service import storage
         storage.sync_local_to_gcs("experiences")
+        _schedule_opening_banks(scenario_id, roles, result.md_path.with_suffix(".json"))
 
         await broadcast(
             f"✅ Scenario ready — "
@@ -144,3 +153,31 @@ async def generate_scenario(
     else:
         await broadcast(f"❌ Scenario generation failed: {result.error}")
         return False
+
+
+def _schedule_opening_banks(scenario_id: str, roles: List[str], json_path: Path) -> None:
+    """Bank NPC openings for a freshly saved scenario without delaying game start."""
+
+    def _add_banks() -> int:
+        from config import OPENING_BANK_VARIANTS
+        from generators.opening_bank_generator import add_opening_banks
+        return add_opening_banks(json_path, scenario_id, roles, variants=OPENING_BANK_VARIANTS)
+
+    async def _bank():
+        try:
+            banked = await asyncio.to_thread(_add_banks)
+        except Exception as e:
+            logger.warning(f"[generator] Opening banks for {scenario_id} skipped: {e}")
+            return
+
+        from app.services.experience_cache import get_experience_cache
+        from app.services.experience_loader import scenario_cache_filename
+        from app.services.storage_service import storage
+        await asyncio.to_thread(storage.sync_local_to_gcs, "experiences")
+        # The running game keeps its copy; the next one loads the banks
+        get_experience_cache().invalidate(scenario_cache_filename(scenario_id, roles))
+        logger.info(f"[generator] {banked} openings banked for {scenario_id}")
+
+    task = asyncio.create_task(_bank())
+    _bank_tasks.add(task)
+    task.add_done_callback(_bank_tasks.discard)
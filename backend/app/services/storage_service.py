@@ -20,16 +20,54 @@ Usage:
 
     # Get a local path guaranteed to have the file (for FileResponse)
     path = storage.local_path("generated_images/casino/location_lobby.png")
+
+    # From the event loop: same calls, run on a bounded transfer pool
+    path = await storage.local_path_async("generated_images/casino/location_lobby.png")
+
+GCS transfers stream between blob and file (no whole-blob bytes for
+images), and sync_local_to_gcs uploads in parallel, skipping files whose
+MD5 (or CRC32C) already matches the remote blob.
+
+Remote existence and metadata (size, generation, md5) are cached with a
+TTL, including negative entries for missing keys, so hot-path exists()
+checks stop costing a GCS round trip each. Our own writes update the
+cache; prime(prefix) fills it from one listing.
 """
 
+import asyncio
+import base64
+import functools
+import hashlib
 import logging
 import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
 _BACKEND_ROOT = Path(__file__).parent.parent.parent  # backend/
+_CONTENT_TYPES = {
+    ".png": "image/png",
+    ".webp": "image/webp",
+    ".avif": "image/avif",
+    ".json": "application/json",
+    ".md": "text/markdown",
+}
+
+
+@dataclass(frozen=True)
+class BlobMeta:
+    """Remote metadata of one key; exists=False is a negative entry."""
+    exists: bool
+    size: Optional[int] = None
+    generation: Optional[int] = None
+    md5: Optional[str] = None
+    expires_at: float = 0.0
 
 
 class StorageService:
@@ -38,9 +76,26 @@ class StorageService:
         self._gcs_client = None
         self._bucket = None
         self._local_root = _BACKEND_ROOT
-
-    def configure(self, bucket_name: Optional[str] = None):
+        self._transfer_workers = 8
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._meta: "OrderedDict[str, BlobMeta]" = OrderedDict()  # LRU
+        self._meta_lock = threading.Lock()
+        self._meta_ttl = 300.0
+        self._negative_ttl = 30.0
+        self._meta_max_entries = 50_000
+        self._primed_prefixes: Dict[str, float] = {}  # prefix → listing valid until
+        self.stats: Dict[str, int] = {"meta_hits": 0, "negative_hits": 0, "gcs_lookups": 0, "primed": 0}
+
+    def configure(self, bucket_name: Optional[str] = None, transfer_workers: Optional[int] = None):
         """Call once at startup. If bucket_name is provided, enables GCS."""
+        from app.core.config import get_settings
+        settings = get_settings()
+        if transfer_workers is None:
+            transfer_workers = settings.storage_transfer_workers
+        self._transfer_workers = max(1, transfer_workers)
+        self._meta_ttl = settings.storage_metadata_ttl_seconds
+        self._negative_ttl = settings.storage_negative_ttl_seconds
         self._bucket_name = bucket_name or os.getenv("GCS_BUCKET")
         if self._bucket_name:
             try:
@@ -62,20 +117,20 @@ class StorageService:
     # Public API
     # ------------------------------------------------------------------
 
-    def read(self, key: str) -> Optional[bytes]:
-        """Read a file by key (relative to backend/). Returns bytes or None."""
-        local = self._local_root / key
-        if local.exists():
-            return local.read_bytes()
-
-        if self._gcs_enabled:
-            return self._gcs_download(key, local)
+    def read(self, key: str, refresh: bool = False) -> Optional[bytes]:
+        """Read a file by key (relative to backend/). Returns bytes or None.
 
-        return None
+        refresh=True re-downloads from GCS first, for files other instances
+        rewrite (the local copy is only a cache); a cached "missing" answer
+        skips the download."""
+        if refresh and self._gcs_enabled and self.metadata(key).exists:
+            self._gcs_download(key, self._local_root / key)
+        local = self.local_path(key)
+        return local.read_bytes() if local is not None else None
 
-    def read_text(self, key: str) -> Optional[str]:
+    def read_text(self, key: str, refresh: bool = False) -> Optional[str]:
         """Read a text file by key. Returns string or None."""
-        data = self.read(key)
+        data = self.read(key, refresh=refresh)
         return data.decode("utf-8") if data else None
 
     def write(self, key: str, data: bytes):
@@ -86,20 +141,66 @@ class StorageService:
 
         if self._gcs_enabled:
             self._gcs_upload(key, data)
+        else:
+            self._forget(key)
 
     def write_text(self, key: str, text: str):
         """Write text to local disk and (if enabled) GCS."""
         self.write(key, text.encode("utf-8"))
 
     def exists(self, key: str) -> bool:
-        """Check if a file exists locally or in GCS."""
+        """Check if a file exists locally or in GCS (remote answer cached)."""
         if (self._local_root / key).exists():
             return True
         if self._gcs_enabled:
-            blob = self._bucket.blob(key)
-            return blob.exists()
+            return self.metadata(key).exists
         return False
 
+    def metadata(self, key: str) -> BlobMeta:
+        """Remote metadata of a key, from the TTL cache or one GCS lookup."""
+        cached = self._cached_meta(key)
+        if cached is not None:
+            return cached
+        if not self._gcs_enabled:
+            return BlobMeta(exists=False)
+        self.stats["gcs_lookups"] += 1
+        try:
+            blob = self._bucket.get_blob(key)
+        except Exception as e:
+            logger.warning(f"Storage: GCS metadata lookup failed for {key}: {e}")
+            return BlobMeta(exists=False)  # not cached: retry next time
+        return self._remember(key, blob)
+
+    def prime(self, prefix: str) -> int:
+        """Fill the metadata cache for every blob under prefix with one listing.
+
+        Keys under the prefix that the listing didn't return are cached as
+        missing. Returns the number of blobs seen."""
+        if not self._gcs_enabled:
+            return 0
+        now = time.time()
+        seen = set()
+        for blob in self._bucket.list_blobs(prefix=prefix):
+            self._remember(blob.name, blob, now)
+            seen.add(blob.name)
+        with self._meta_lock:
+            for key, meta in list(self._meta.items()):
+                if key.startswith(prefix) and meta.exists and key not in seen:
+                    self._meta[key] = BlobMeta(exists=False, expires_at=now + self._negative_ttl)
+            # "Missing" answers never outlive the negative TTL, listed or not
+            self._primed_prefixes[prefix] = now + self._negative_ttl
+        self.stats["primed"] += len(seen)
+        logger.info(f"Storage: primed metadata for {len(seen)} blobs under {prefix}")
+        return len(seen)
+
+    def exists_many(self, keys: List[str]) -> Dict[str, bool]:
+        """exists() for many keys, remote checks in parallel on the transfer pool."""
+        result = {key: (self._local_root / key).exists() for key in keys}
+        remote = [key for key, found in result.items() if not found]
+        if remote and self._gcs_enabled:
+            result.update(zip(remote, self._transfer_pool().map(self.exists, remote)))
+        return result
+
     def local_path(self, key: str) -> Optional[Path]:
         """
         Return a local Path to the file, downloading from GCS if needed.
@@ -109,16 +210,19 @@ class StorageService:
         if local.exists():
             return local
 
-        if self._gcs_enabled:
-            data = self._gcs_download(key, local)
-            if data is not None:
-                return local
+        if self._gcs_enabled and self.metadata(key).exists and self._gcs_download(key, local):
+            return local
 
         return None
 
+    def local_path_for(self, key: str) -> Path:
+        """Local path a key lives at (may not exist yet) — for writers that stream to disk."""
+        return self._local_root / key
+
     def delete_local(self, key: str) -> bool:
         """Delete a file from local disk only. Returns True if deleted."""
         local = self._local_root / key
+        self._forget(key)
         if local.exists():
             local.unlink()
             logger.debug(f"Storage: deleted local {key}")
@@ -143,53 +247,201 @@ class StorageService:
 
         return sorted(keys)
 
+    def sync_local_to_gcs(self, prefix: str) -> int:
+        """Upload local files under prefix to GCS in parallel. Call after generation.
+
+        One listing fetches the remote checksums; files whose MD5/CRC32C
+        already matches are skipped. Returns the number uploaded."""
+        if not self._gcs_enabled:
+            return 0
+        local_dir = self._local_root / prefix
+        if not local_dir.is_dir():
+            return 0
+        remote = {blob.name: blob for blob in self._bucket.list_blobs(prefix=prefix)}
+        changed = []
+        files = [f for f in local_dir.rglob("*") if f.is_file() and not f.name.endswith(".tmp")]
+        for f in files:
+            key = f.relative_to(self._local_root).as_posix()
+            if not _matches_remote(f, remote.get(key)):
+                changed.append(key)
+        list(self._transfer_pool().map(self.upload_local, changed))
+        if changed:
+            logger.info(f"Storage: synced {len(changed)} of {len(files)} files from {prefix} to GCS")
+        return len(changed)
+
+    def upload_local(self, key: str):
+        """Upload one file that was written to local disk directly (no-op locally)."""
+        local = self._local_root / key
+        if self._gcs_enabled and local.is_file():
+            try:
+                blob = self._bucket.blob(key)
+                blob.upload_from_filename(str(local), content_type=_content_type(key))
+                self._remember(key, blob)
+                logger.debug(f"Storage: uploaded {key} to GCS")
+            except Exception as e:
+                self._forget(key)
+                logger.warning(f"Storage: GCS upload failed for {key}: {e}")
+
+    # ------------------------------------------------------------------
+    # Async API — the same operations on a bounded transfer pool
+    # ------------------------------------------------------------------
+
+    def _transfer_pool(self) -> ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self._transfer_workers, thread_name_prefix="storage",
+                )
+            return self._pool
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._transfer_pool(), functools.partial(fn, *args))
+
+    async def read_async(self, key: str) -> Optional[bytes]:
+        return await self._run(self.read, key)
+
+    async def read_text_async(self, key: str) -> Optional[str]:
+        return await self._run(self.read_text, key)
+
+    async def write_async(self, key: str, data: bytes):
+        await self._run(self.write, key, data)
+
+    async def write_text_async(self, key: str, text: str):
+        await self._run(self.write_text, key, text)
+
+    async def exists_async(self, key: str) -> bool:
+        return await self._run(self.exists, key)
+
+    async def local_path_async(self, key: str) -> Optional[Path]:
+        local = self._local_root / key
+        if local.exists():
+            return local  # no thread hop for the common case
+        return await self._run(self.local_path, key)
+
+    async def upload_local_async(self, key: str):
+        await self._run(self.upload_local, key)
+
+    async def sync_local_to_gcs_async(self, prefix: str) -> int:
+        # The listing and checksums run in one worker; uploads fan out from it
+        return await asyncio.to_thread(self.sync_local_to_gcs, prefix)
+
     # ------------------------------------------------------------------
     # GCS internals
     # ------------------------------------------------------------------
 
-    def _gcs_download(self, key: str, local: Path) -> Optional[bytes]:
+    def _gcs_download(self, key: str, local: Path) -> bool:
+        """Stream a blob to local (atomically). False if it doesn't exist."""
+        from google.api_core.exceptions import NotFound
+
+        local.parent.mkdir(parents=True, exist_ok=True)
+        # Unique temp name: concurrent first requests may download the same key
+        tmp = local.with_name(f"{local.name}.{threading.get_ident()}.tmp")
         try:
-            blob = self._bucket.blob(key)
-            if not blob.exists():
-                return None
-            data = blob.download_as_bytes()
-            local.parent.mkdir(parents=True, exist_ok=True)
-            local.write_bytes(data)
+            self._bucket.blob(key).download_to_filename(str(tmp))
+            tmp.replace(local)
             logger.debug(f"Storage: downloaded {key} from GCS")
-            return data
+            return True
+        except NotFound:
+            self._remember(key, None)
+            return False
         except Exception as e:
             logger.warning(f"Storage: GCS download failed for {key}: {e}")
-            return None
-
-    def sync_local_to_gcs(self, prefix: str):
-        """Upload all local files under prefix to GCS. Call after generation."""
-        if not self._gcs_enabled:
-            return
-        local_dir = self._local_root / prefix
-        if not local_dir.is_dir():
-            return
-        count = 0
-        for f in local_dir.rglob("*"):
-            if f.is_file():
-                key = str(f.relative_to(self._local_root))
-                self._gcs_upload(key, f.read_bytes())
-                count += 1
-        if count:
-            logger.info(f"Storage: synced {count} files from {prefix} to GCS")
+            return False
+        finally:
+            tmp.unlink(missing_ok=True)
 
     def _gcs_upload(self, key: str, data: bytes):
         try:
             blob = self._bucket.blob(key)
-            content_type = "image/png" if key.endswith(".png") else "application/octet-stream"
-            if key.endswith(".json"):
-                content_type = "application/json"
-            elif key.endswith(".md"):
-                content_type = "text/markdown"
-            blob.upload_from_string(data, content_type=content_type)
+            blob.upload_from_string(data, content_type=_content_type(key))
+            self._remember(key, blob)
             logger.debug(f"Storage: uploaded {key} to GCS")
         except Exception as e:
+            self._forget(key)
             logger.warning(f"Storage: GCS upload failed for {key}: {e}")
 
+    # ------------------------------------------------------------------
+    # Metadata cache
+    # ------------------------------------------------------------------
+
+    def _cached_meta(self, key: str) -> Optional[BlobMeta]:
+        now = time.time()
+        with self._meta_lock:
+            meta = self._meta.get(key)
+            if meta is not None and meta.expires_at > now:
+                self._meta.move_to_end(key)
+                self.stats["meta_hits" if meta.exists else "negative_hits"] += 1
+                return meta
+            # Inside a freshly primed prefix, anything unlisted is missing
+            for prefix, valid_until in self._primed_prefixes.items():
+                if valid_until > now and key.startswith(prefix):
+                    self.stats["negative_hits"] += 1
+                    return BlobMeta(exists=False, expires_at=valid_until)
+        return None
+
+    def _remember(self, key: str, blob, now: Optional[float] = None) -> BlobMeta:
+        """Cache a blob's metadata (blob=None: cache as missing)."""
+        now = now or time.time()
+        if blob is None:
+            meta = BlobMeta(exists=False, expires_at=now + self._negative_ttl)
+        else:
+            meta = BlobMeta(exists=True, size=blob.size, generation=blob.generation,
+                            md5=blob.md5_hash, expires_at=now + self._meta_ttl)
+        with self._meta_lock:
+            self._meta[key] = meta
+            self._meta.move_to_end(key)
+            while len(self._meta) > self._meta_max_entries:
+                evicted, _ = self._meta.popitem(last=False)
+                # A primed prefix's listing is incomplete without this entry:
+                # stop answering "missing" for keys under it
+                for prefix in [p for p in self._primed_prefixes if evicted.startswith(p)]:
+                    del self._primed_prefixes[prefix]
+        return meta
+
+    def _forget(self, key: str) -> None:
+        with self._meta_lock:
+            self._meta.pop(key, None)
+
+    def metrics(self) -> Dict:
+        with self._meta_lock:
+            entries = len(self._meta)
+            negative = sum(1 for m in self._meta.values() if not m.exists)
+        return {
+            "gcs_enabled": self._gcs_enabled,
+            "metadata_entries": entries,
+            "negative_entries": negative,
+            "primed_prefixes": list(self._primed_prefixes),
+            **self.stats,
+        }
+
+
+def _content_type(key: str) -> str:
+    return _CONTENT_TYPES.get(Path(key).suffix, "application/octet-stream")
+
+
+def _matches_remote(local: Path, blob) -> bool:
+    """True if the remote blob has the same content (MD5, else CRC32C)."""
+    if blob is None:
+        return False
+    if blob.md5_hash:
+        md5 = hashlib.md5()
+        with open(local, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                md5.update(chunk)
+        return base64.b64encode(md5.digest()).decode() == blob.md5_hash
+    if blob.crc32c:
+        try:
+            import google_crc32c
+        except ImportError:
+            return False
+        crc = google_crc32c.Checksum()
+        with open(local, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                crc.update(chunk)
+        return base64.b64encode(crc.digest()).decode() == blob.crc32c
+    return False
+
 
 # Singleton instance — import this
 storage = StorageService()
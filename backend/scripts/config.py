@@ -63,6 +63,11 @@ IMAGEN_MODEL = 'imagen-4.0-generate-001'
 GEMINI_IMAGE_MODEL = 'gemini-2.5-flash-image'
 GEMINI_IMAGE_MODEL_31 = 'gemini-3.1-flash-image-preview'
 
+# NPC Opening Banks (scenario_pipeline stage 7)
+# Pre-generated greeting + first quick-response variants per NPC / cover /
+# difficulty. More variants = more variety on repeat plays, more LLM calls.
+OPENING_BANK_VARIANTS = int(os.getenv('OPENING_BANK_VARIANTS', '2'))
+
 # ============================================================================
 
 # Validate configuration
@@ -24,8 +24,12 @@ from google.genai import types
 script_dir = Path(__file__).parent
 sys.path.insert(0, str(script_dir))
 from config import GEMINI_API_KEY, GEMINI_IMAGE_MODEL
+from app.services.image_jobs import ImageJob, get_image_job_engine, save_response_image
+from app.services.image_store import content_key, content_path, image_content_hash
+from app.services.llm_scheduler import Priority, get_llm_scheduler
+from app.services.storage_service import storage
 
-OUTPUT_DIR = Path(__file__).parent.parent / "generated_images"
+ITEM_SIZE = (512, 512)
 
 # Heist game art style - same as NPCs use
 HEIST_GAME_ART_STYLE = """2D illustration, comic book art style,
@@ -37,15 +41,6 @@ set in year 2020, contemporary styling (not futuristic),
 no thought bubbles, no speech bubbles, no titles, no captions (environmental text like signs is fine)"""
 
 
-def _parse_retry_after(error_str: str, default: float = 15.0) -> float:
-    """Extract the suggested retry delay (seconds) from a 429 error message."""
-    import re
-    match = re.search(r"retry in ([\d.]+)s", error_str)
-    if match:
-        return float(match.group(1)) + 2.0  # Add a small buffer
-    return default
-
-
 def get_item_prompt(item_name: str, item_description: str, visual_description: str = "") -> str:
     """Generate Imagen prompt for an item using detailed visual description.
     
@@ -85,17 +80,16 @@ async def generate_item_image(
 ) -> str:
     """Generate a single item image with automatic retry for safety filter blocks."""
     
-    clean_id = item_id.removeprefix("item_")
-    output_path = OUTPUT_DIR / experience_id / f"item_{clean_id}.png"
+    # Generate prompt with visual description
+    prompt = get_item_prompt(item_name, visual_description, item_description)
+    content_hash = image_content_hash("item", GEMINI_IMAGE_MODEL, prompt, ITEM_SIZE)
+    output_path = content_path(content_hash)
     
-    # Skip if already exists
-    if output_path.exists():
+    # Skip if this exact prompt was already rendered (any experience)
+    if await storage.local_path_async(content_key(content_hash)) is not None:
         print(f"✓ Item image already exists: {item_name}")
         return str(output_path)
     
-    # Generate prompt with visual description
-    prompt = get_item_prompt(item_name, visual_description, item_description)
-    
     print(f"🎨 Generating item image: {item_name} (model: {GEMINI_IMAGE_MODEL})")
     print(f"   Prompt: {prompt[:100]}...")
     
@@ -105,41 +99,32 @@ async def generate_item_image(
 
         try:
             # Use Gemini Flash Image (fast/cheap) — avoids the strict Imagen quota
-            response = client.models.generate_content(
-                model=GEMINI_IMAGE_MODEL,
-                contents=[prompt],
-                config=types.GenerateContentConfig(
-                    response_modalities=["Text", "Image"],
-                    image_config=types.ImageConfig(aspect_ratio="1:1"),
+            # Shared scheduler: per-model rate limit, batch lane, 429 retry-after
+            response = await get_llm_scheduler().run_blocking(
+                GEMINI_IMAGE_MODEL,
+                lambda: client.models.generate_content(
+                    model=GEMINI_IMAGE_MODEL,
+                    contents=[prompt],
+                    config=types.GenerateContentConfig(
+                        response_modalities=["Text", "Image"],
+                        image_config=types.ImageConfig(aspect_ratio="1:1"),
+                    ),
                 ),
+                Priority.BATCH,
             )
             
-            # Save image
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            for part in response.parts:
-                if part.inline_data is not None:
-                    image = part.as_image()
-                    image.save(str(output_path))
-                    # Resize to 512x512 (smallest)
-                    from PIL import Image
-                    img = Image.open(output_path)
-                    img = img.resize((512, 512), Image.Resampling.LANCZOS)
-                    img.save(output_path)
-                    print(f"   ✅ Saved: {output_path}")
-                    return str(output_path)
+            # Decode, resize (512x512) and save in a worker thread
+            if await asyncio.to_thread(save_response_image, response, output_path, ITEM_SIZE):
+                print(f"   ✅ Saved: {output_path}")
+                return str(output_path)
             
             print(f"   ⚠️  No image in response (attempt {attempt + 1}/{max_retries}) - likely safety filter block")
             if attempt < max_retries - 1:
                 continue  # Retry
 
         except Exception as e:
-            error_str = str(e)
-            if "429" in error_str or "RESOURCE_EXHAUSTED" in error_str:
-                wait = _parse_retry_after(error_str)
-                print(f"   ⏳ Rate limited — waiting {wait:.1f}s before retry...")
-                await asyncio.sleep(wait)
-            elif attempt < max_retries - 1:
+            # Rate limits were already waited out and retried by the scheduler
+            if attempt < max_retries - 1:
                 print(f"   ❌ Error on attempt {attempt + 1}/{max_retries}: {e}")
             else:
                 import traceback
@@ -150,6 +135,34 @@ async def generate_item_image(
     return None
 
 
+def item_content_hash(item: Dict) -> str:
+    """Content-store hash of an item's image (see app/services/image_store.py)."""
+    prompt = get_item_prompt(item.get('name', 'Unknown Item'), item.get('visual', ''), item.get('description', ''))
+    return image_content_hash("item", GEMINI_IMAGE_MODEL, prompt, ITEM_SIZE)
+
+
+def item_image_jobs(experience_id: str, items: List[Dict], client: genai.Client = None) -> List[ImageJob]:
+    """One ImageJob per item, for the shared image job engine."""
+    client = client or genai.Client(api_key=GEMINI_API_KEY)
+    jobs = []
+    for item in items:
+        item_name = item.get('name', 'Unknown Item')
+        item_id = item.get('id', item_name.lower().replace(' ', '_'))
+
+        def _generate(name=item_name, it_id=item_id, description=item.get('description', ''),
+                      visual=item.get('visual', '')):
+            return generate_item_image(
+                item_name=name,
+                item_id=it_id,
+                item_description=description,
+                visual_description=visual,
+                experience_id=experience_id,
+                client=client
+            )
+        jobs.append(ImageJob("item", item_id, item_name, _generate, item_content_hash(item)))
+    return jobs
+
+
 async def generate_all_item_images(experience_id: str, items: List[Dict], on_progress=None):
     """Generate images for all items in an experience."""
     
@@ -157,34 +170,18 @@ async def generate_all_item_images(experience_id: str, items: List[Dict], on_pro
     print(f"Generating Item Images for Experience: {experience_id}")
     print(f"{'='*60}\n")
     
-    # Initialize Gemini client
-    client = genai.Client(api_key=GEMINI_API_KEY)
-    
-    results = []
-    for item in items:
-        item_name = item.get('name', 'Unknown Item')
-        item_id = item.get('id', item_name.lower().replace(' ', '_'))
-        item_description = item.get('description', '')
-        visual_description = item.get('visual', '')
-        
-        result = await generate_item_image(
-            item_name=item_name,
-            item_id=item_id,
-            item_description=item_description,
-            visual_description=visual_description,
-            experience_id=experience_id,
-            client=client
-        )
-        results.append(result)
+    jobs = item_image_jobs(experience_id, items)
+
+    async def _done(job, path):
         if on_progress:
             await on_progress()
-        
-        # Small delay between requests (Gemini Flash Image has generous quotas)
-        await asyncio.sleep(2)
+
+    by_key = await get_image_job_engine().run(jobs, on_done=_done)
+    results = [by_key[f"item:{job.asset_id}"] for job in jobs]
     
     successful = [r for r in results if r is not None]
     print(f"\n✅ Generated {len(successful)}/{len(items)} item images")
-    print(f"📁 Saved to: {OUTPUT_DIR / experience_id}/")
+    print(f"📁 Saved to: {content_path('').parent}/ (content store)")
     
     return results
 
@@ -24,8 +24,12 @@ from google.genai import types
 script_dir = Path(__file__).parent
 sys.path.insert(0, str(script_dir))
 from config import GEMINI_API_KEY, GEMINI_IMAGE_MODEL
+from app.services.image_jobs import ImageJob, get_image_job_engine, save_response_image
+from app.services.image_store import content_key, content_path, image_content_hash
+from app.services.llm_scheduler import Priority, get_llm_scheduler
+from app.services.storage_service import storage
 
-OUTPUT_DIR = Path(__file__).parent.parent / "generated_images"
+LOCATION_SIZE = (1024, 576)  # 16:9 at 1K
 
 # Heist game art style - same as NPCs use
 HEIST_GAME_ART_STYLE = """2D illustration, comic book art style,
@@ -37,15 +41,6 @@ set in year 2020, contemporary styling (not futuristic),
 no thought bubbles, no speech bubbles, no titles, no captions (environmental text like signs is fine)"""
 
 
-def _parse_retry_after(error_str: str, default: float = 15.0) -> float:
-    """Extract the suggested retry delay (seconds) from a 429 error message."""
-    import re
-    match = re.search(r"retry in ([\d.]+)s", error_str)
-    if match:
-        return float(match.group(1)) + 2.0
-    return default
-
-
 def get_location_prompt(location_name: str, visual_description: str = None,
                         scenario_context: str = "") -> str:
     """Generate Imagen prompt for a location using detailed visual description.
@@ -90,16 +85,16 @@ async def generate_location_image(
 ) -> str:
     """Generate a single location image with retry on rate limit."""
     
-    output_path = OUTPUT_DIR / experience_id / f"location_{location_id}.png"
+    # Generate prompt with visual description + scenario context
+    prompt = get_location_prompt(location_name, visual_description, scenario_context)
+    content_hash = image_content_hash("location", GEMINI_IMAGE_MODEL, prompt, LOCATION_SIZE)
+    output_path = content_path(content_hash)
     
-    # Skip if already exists
-    if output_path.exists():
+    # Skip if this exact prompt was already rendered (any experience)
+    if await storage.local_path_async(content_key(content_hash)) is not None:
         print(f"✓ Location image already exists: {location_name}")
         return str(output_path)
     
-    # Generate prompt with visual description + scenario context
-    prompt = get_location_prompt(location_name, visual_description, scenario_context)
-    
     print(f"🎨 Generating location image: {location_name} (model: {GEMINI_IMAGE_MODEL})")
     print(f"   Prompt: {prompt[:100]}...")
     
@@ -109,41 +104,32 @@ async def generate_location_image(
 
         try:
             # Use Gemini Flash Image (fast/cheap) — avoids the strict Imagen quota
-            response = client.models.generate_content(
-                model=GEMINI_IMAGE_MODEL,
-                contents=[prompt],
-                config=types.GenerateContentConfig(
-                    response_modalities=["Text", "Image"],
-                    image_config=types.ImageConfig(aspect_ratio="16:9"),
+            # Shared scheduler: per-model rate limit, batch lane, 429 retry-after
+            response = await get_llm_scheduler().run_blocking(
+                GEMINI_IMAGE_MODEL,
+                lambda: client.models.generate_content(
+                    model=GEMINI_IMAGE_MODEL,
+                    contents=[prompt],
+                    config=types.GenerateContentConfig(
+                        response_modalities=["Text", "Image"],
+                        image_config=types.ImageConfig(aspect_ratio="16:9"),
+                    ),
                 ),
+                Priority.BATCH,
             )
             
-            # Save image
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            for part in response.parts:
-                if part.inline_data is not None:
-                    image = part.as_image()
-                    image.save(str(output_path))
-                    # Resize to 1K (1024x576 for 16:9)
-                    from PIL import Image
-                    img = Image.open(output_path)
-                    img = img.resize((1024, 576), Image.Resampling.LANCZOS)
-                    img.save(output_path)
-                    print(f"   ✅ Saved: {output_path}")
-                    return str(output_path)
+            # Decode, resize (1024x576) and save in a worker thread
+            if await asyncio.to_thread(save_response_image, response, output_path, LOCATION_SIZE):
+                print(f"   ✅ Saved: {output_path}")
+                return str(output_path)
             
             print(f"   ❌ No image in response for {location_name} (attempt {attempt + 1}/{max_retries})")
             if attempt < max_retries - 1:
                 continue
 
         except Exception as e:
-            error_str = str(e)
-            if "429" in error_str or "RESOURCE_EXHAUSTED" in error_str:
-                wait = _parse_retry_after(error_str)
-                print(f"   ⏳ Rate limited — waiting {wait:.1f}s before retry...")
-                await asyncio.sleep(wait)
-            elif attempt < max_retries - 1:
+            # Rate limits were already waited out and retried by the scheduler
+            if attempt < max_retries - 1:
                 print(f"   ❌ Error on attempt {attempt + 1}/{max_retries}: {e}")
             else:
                 import traceback
@@ -153,6 +139,40 @@ async def generate_location_image(
     return None
 
 
+def location_content_hash(location: Dict, scenario_context: str = "") -> str:
+    """Content-store hash of a location's image (see app/services/image_store.py)."""
+    location_name = location.get('name', location.get('id', 'Unknown'))
+    prompt = get_location_prompt(location_name, location.get('visual', ''), scenario_context)
+    return image_content_hash("location", GEMINI_IMAGE_MODEL, prompt, LOCATION_SIZE)
+
+
+def location_image_jobs(
+    experience_id: str,
+    locations: List[Dict],
+    scenario_context: str = "",
+    client: genai.Client = None,
+) -> List[ImageJob]:
+    """One ImageJob per location, for the shared image job engine."""
+    client = client or genai.Client(api_key=GEMINI_API_KEY)
+    jobs = []
+    for location in locations:
+        location_name = location.get('name', location.get('id', 'Unknown'))
+        location_id = location.get('id', location_name.lower().replace(' ', '_'))
+
+        def _generate(name=location_name, loc_id=location_id, visual=location.get('visual', '')):
+            return generate_location_image(
+                location_name=name,
+                location_id=loc_id,
+                experience_id=experience_id,
+                visual_description=visual,
+                client=client,
+                scenario_context=scenario_context,
+            )
+        jobs.append(ImageJob("location", location_id, location_name, _generate,
+                             location_content_hash(location, scenario_context)))
+    return jobs
+
+
 async def generate_all_location_images(
     experience_id: str,
     locations: List[Dict],
@@ -167,33 +187,18 @@ async def generate_all_location_images(
         print(f"Scenario context: {scenario_context}")
     print(f"{'='*60}\n")
     
-    # Initialize Gemini client
-    client = genai.Client(api_key=GEMINI_API_KEY)
-    
-    results = []
-    for location in locations:
-        location_name = location.get('name', location.get('id', 'Unknown'))
-        location_id = location.get('id', location_name.lower().replace(' ', '_'))
-        visual_description = location.get('visual', '')
-        
-        result = await generate_location_image(
-            location_name=location_name,
-            location_id=location_id,
-            experience_id=experience_id,
-            visual_description=visual_description,
-            client=client,
-            scenario_context=scenario_context,
-        )
-        results.append(result)
+    jobs = location_image_jobs(experience_id, locations, scenario_context)
+
+    async def _done(job, path):
         if on_progress:
             await on_progress()
-        
-        # Small delay between requests (Gemini Flash Image has generous quotas)
-        await asyncio.sleep(2)
+
+    by_key = await get_image_job_engine().run(jobs, on_done=_done)
+    results = [by_key[f"location:{job.asset_id}"] for job in jobs]
     
     successful = [r for r in results if r is not None]
     print(f"\n✅ Generated {len(successful)}/{len(locations)} location images")
-    print(f"📁 Saved to: {OUTPUT_DIR / experience_id}/")
+    print(f"📁 Saved to: {content_path('').parent}/ (content store)")
     
     return results
 
@@ -24,8 +24,12 @@ from google.genai import types
 script_dir = Path(__file__).parent
 sys.path.insert(0, str(script_dir))
 from config import GEMINI_API_KEY, GEMINI_IMAGE_MODEL
+from app.services.image_jobs import ImageJob, get_image_job_engine, save_response_image
+from app.services.image_store import content_key, content_path, image_content_hash
+from app.services.llm_scheduler import Priority, get_llm_scheduler
+from app.services.storage_service import storage
 
-OUTPUT_DIR = Path(__file__).parent.parent / "generated_images"
+NPC_SIZE = (1024, 1024)
 
 # Heist game art style - Borderlands aesthetic
 HEIST_GAME_ART_STYLE = """2D illustration, comic book art style,
@@ -37,15 +41,6 @@ set in year 2020, contemporary clothing and technology (not futuristic),
 no thought bubbles, no speech bubbles, no titles, no captions (environmental text like signs is fine)"""
 
 
-def _parse_retry_after(error_str: str, default: float = 15.0) -> float:
-    """Extract the suggested retry delay (seconds) from a 429 error message."""
-    import re
-    match = re.search(r"retry in ([\d.]+)s", error_str)
-    if match:
-        return float(match.group(1)) + 2.0
-    return default
-
-
 def get_npc_prompt(npc: Dict) -> str:
     """Generate prompt for an NPC portrait from experience data.
     
@@ -105,15 +100,15 @@ async def generate_npc_image(
     npc_id = npc.get('id', '')
     npc_name = npc.get('name', 'Unknown')
     
-    output_path = OUTPUT_DIR / experience_id / f"npc_{npc_id}.png"
+    prompt = get_npc_prompt(npc)
+    content_hash = image_content_hash("npc", GEMINI_IMAGE_MODEL, prompt, NPC_SIZE)
+    output_path = content_path(content_hash)
     
-    # Skip if already exists
-    if output_path.exists():
+    # Skip if this exact prompt was already rendered (any experience)
+    if await storage.local_path_async(content_key(content_hash)) is not None:
         print(f"✓ NPC image already exists: {npc_name}")
         return str(output_path)
     
-    prompt = get_npc_prompt(npc)
-    
     print(f"🎨 Generating NPC image: {npc_name} ({npc_id}) (model: {GEMINI_IMAGE_MODEL})")
     print(f"   Prompt: {prompt[:120]}...")
     
@@ -123,41 +118,32 @@ async def generate_npc_image(
 
         try:
             # Use Gemini Flash Image (fast/cheap) via config's GEMINI_IMAGE_MODEL
-            response = client.models.generate_content(
-                model=GEMINI_IMAGE_MODEL,
-                contents=[prompt],
-                config=types.GenerateContentConfig(
-                    response_modalities=["Text", "Image"],
-                    image_config=types.ImageConfig(aspect_ratio="1:1"),
+            # Shared scheduler: per-model rate limit, batch lane, 429 retry-after
+            response = await get_llm_scheduler().run_blocking(
+                GEMINI_IMAGE_MODEL,
+                lambda: client.models.generate_content(
+                    model=GEMINI_IMAGE_MODEL,
+                    contents=[prompt],
+                    config=types.GenerateContentConfig(
+                        response_modalities=["Text", "Image"],
+                        image_config=types.ImageConfig(aspect_ratio="1:1"),
+                    ),
                 ),
+                Priority.BATCH,
             )
             
-            # Save image
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            for part in response.parts:
-                if part.inline_data is not None:
-                    image = part.as_image()
-                    image.save(str(output_path))
-                    # Resize to 1K (1024x1024)
-                    from PIL import Image
-                    img = Image.open(output_path)
-                    img = img.resize((1024, 1024), Image.Resampling.LANCZOS)
-                    img.save(output_path)
-                    print(f"   ✅ Saved: {output_path}")
-                    return str(output_path)
+            # Decode, resize (1024x1024) and save in a worker thread
+            if await asyncio.to_thread(save_response_image, response, output_path, NPC_SIZE):
+                print(f"   ✅ Saved: {output_path}")
+                return str(output_path)
             
             print(f"   ❌ No image in response for {npc_name} (attempt {attempt + 1}/{max_retries})")
             if attempt < max_retries - 1:
                 continue
 
         except Exception as e:
-            error_str = str(e)
-            if "429" in error_str or "RESOURCE_EXHAUSTED" in error_str:
-                wait = _parse_retry_after(error_str)
-                print(f"   ⏳ Rate limited — waiting {wait:.1f}s before retry...")
-                await asyncio.sleep(wait)
-            elif attempt < max_retries - 1:
+            # Rate limits were already waited out and retried by the scheduler
+            if attempt < max_retries - 1:
                 print(f"   ❌ Error on attempt {attempt + 1}/{max_retries}: {e}")
             else:
                 import traceback
@@ -167,6 +153,22 @@ async def generate_npc_image(
     return None
 
 
+def npc_content_hash(npc: Dict) -> str:
+    """Content-store hash of an NPC's portrait (see app/services/image_store.py)."""
+    return image_content_hash("npc", GEMINI_IMAGE_MODEL, get_npc_prompt(npc), NPC_SIZE)
+
+
+def npc_image_jobs(experience_id: str, npcs: List[Dict], client: genai.Client = None) -> List[ImageJob]:
+    """One ImageJob per NPC, for the shared image job engine."""
+    client = client or genai.Client(api_key=GEMINI_API_KEY)
+    return [
+        ImageJob("npc", npc.get('id', ''), npc.get('name', 'Unknown'),
+                 lambda npc=npc: generate_npc_image(npc=npc, experience_id=experience_id, client=client),
+                 npc_content_hash(npc))
+        for npc in npcs
+    ]
+
+
 async def generate_all_npc_images(experience_id: str, npcs: List[Dict], on_progress=None):
     """Generate images for all NPCs in an experience."""
     
@@ -178,26 +180,18 @@ async def generate_all_npc_images(experience_id: str, npcs: List[Dict], on_progr
         print("No NPCs to generate images for.")
         return []
     
-    # Initialize Gemini client
-    client = genai.Client(api_key=GEMINI_API_KEY)
-    
-    results = []
-    for npc in npcs:
-        result = await generate_npc_image(
-            npc=npc,
-            experience_id=experience_id,
-            client=client
-        )
-        results.append(result)
+    jobs = npc_image_jobs(experience_id, npcs)
+
+    async def _done(job, path):
         if on_progress:
             await on_progress()
-        
-        # Brief delay between NPC images (different model quota from Imagen)
-        await asyncio.sleep(2)
+
+    by_key = await get_image_job_engine().run(jobs, on_done=_done)
+    results = [by_key[f"npc:{job.asset_id}"] for job in jobs]
     
     successful = [r for r in results if r is not None]
     print(f"\n✅ Generated {len(successful)}/{len(npcs)} NPC images")
-    print(f"📁 Saved to: {OUTPUT_DIR / experience_id}/")
+    print(f"📁 Saved to: {content_path('').parent}/ (content store)")
     
     return results
 
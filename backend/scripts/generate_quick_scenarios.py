@@ -108,21 +108,24 @@ async def _generate_images(entry: dict) -> bool:
 
 
 def _sync_to_gcs(cache_base: str):
-    """Push generated experience files and images to GCS if configured."""
+    """Push generated experience files to GCS if configured.
+
+    Images, derivatives and the (partial) manifest are uploaded by the image
+    generator as each one finishes, so there is no image sweep here."""
     from app.services.storage_service import storage
-    storage.configure()
     if not storage._gcs_enabled:
         logger.info("  GCS not configured — skipping sync")
         return
     logger.info(f"  Syncing experiences/ to GCS...")
     storage.sync_local_to_gcs("experiences")
-    logger.info(f"  Syncing generated_images/{cache_base}/ to GCS...")
-    storage.sync_local_to_gcs(f"generated_images/{cache_base}")
     logger.info("  GCS sync complete")
 
 
 def main():
     force = os.getenv("FORCE", "").lower() in ("1", "true", "yes")
+    # Configure GCS up front so images are uploaded as they finish
+    from app.services.storage_service import storage
+    storage.configure()
     entries = _load_config()
     logger.info(f"Found {len(entries)} quick scenario(s) to pre-generate")
 
@@ -0,0 +1,122 @@
+"""
+Stage 7: NPC Opening + Fallback Banks
+
+Pre-generates the opening of every NPC conversation — greeting plus first
+quick-response set — per (npc, cover, difficulty, target outcomes) and
+stores them in the experience JSON under "npc_opening_banks".
+
+Also writes "npc_fallback_banks": per-NPC canned lines the backend serves
+when a live reply misses its latency deadline, instead of generic filler.
+
+Everything an opening depends on is known once the scenario is exported, so
+the backend's start_conversation can answer from the bank instantly and only
+calls the LLM on a miss. Prompts are the backend's own
+(NPCConversationService), so banked and live openings read the same.
+"""
+
+import asyncio
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_BACKEND_DIR = Path(__file__).parent.parent.parent
+
+DEFAULT_DIFFICULTIES = ["easy", "medium", "hard"]
+
+
+def add_opening_banks(
+    json_path: Path,
+    scenario_id: str,
+    roles: List[str],
+    variants: int = 2,
+    difficulties: Optional[List[str]] = None,
+    progress_fn: Optional[Callable[[str], None]] = None,
+) -> int:
+    """
+    Generate opening and fallback banks for every NPC in an exported
+    scenario JSON and write them back into the file.
+
+    Blocking — runs its own event loop; call from the pipeline thread
+    (or a worker thread, for live generation's background banking).
+
+    Returns:
+        Number of banked openings written.
+    """
+    if str(_BACKEND_DIR) not in sys.path:
+        sys.path.insert(0, str(_BACKEND_DIR))
+    from app.services.experience_loader import ExperienceLoader
+
+    game_state = ExperienceLoader()._load_from_json(json_path, scenario_id, roles)
+    banks, fallbacks = asyncio.run(
+        _build_banks(game_state, variants, difficulties or DEFAULT_DIFFICULTIES, progress_fn)
+    )
+
+    with open(json_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    data["npc_opening_banks"] = banks
+    data["npc_fallback_banks"] = fallbacks
+    # Atomic replace: live generation banks after the game has started, while
+    # the backend may be loading this file
+    tmp = json_path.with_suffix(json_path.suffix + ".tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    tmp.replace(json_path)
+
+    return sum(
+        len(entries)
+        for covers in banks.values()
+        for by_difficulty in covers.values()
+        for entries in by_difficulty.values()
+    )
+
+
+async def _build_banks(game_state, variants: int, difficulties: List[str],
+                       progress_fn: Optional[Callable[[str], None]]) -> Tuple[Dict, Dict]:
+    from app.core.config import get_settings
+    from app.services.llm_client import new_llm_client
+    from app.services.llm_scheduler import Priority
+    from app.services.npc_conversation_service import NPCConversationService
+
+    settings = get_settings()
+    # Own client: the backend's shared one is bound to the server's event loop.
+    # Batch lane, so banking never crowds out live chats (and may queue behind them).
+    llm = new_llm_client(timeout=max(settings.llm_timeout_seconds, 120.0), priority=Priority.BATCH)
+    service = NPCConversationService()
+    service.llm = llm
+
+    banks: Dict[str, Dict] = {}
+    fallbacks: Dict[str, Dict] = {}
+    try:
+        for npc in game_state.npcs:
+            try:
+                fallbacks[npc.id] = await service.build_fallback_bank(npc)
+            except Exception as e:
+                logger.warning(f"Fallback bank for {npc.id} failed: {e}")
+            if not npc.cover_options:
+                continue
+            target_sets = _target_sets(game_state, npc.id)
+            bank = await service.build_opening_bank(npc, target_sets, difficulties, variants=variants,
+                                                    experience_id=game_state.experience_id)
+            banks[npc.id] = bank
+            count = sum(len(entries) for by_difficulty in bank.values() for entries in by_difficulty.values())
+            if progress_fn:
+                progress_fn(f"{npc.name}: {count} openings ({len(npc.cover_options)} covers)")
+    finally:
+        await llm.aclose()
+    return banks, fallbacks
+
+
+def _target_sets(game_state, npc_id: str) -> List[List[str]]:
+    """Distinct target-outcome lists that tasks send when talking to this NPC."""
+    seen = []
+    for task in game_state.tasks.values():
+        if task.npc_id != npc_id:
+            continue
+        targets = sorted(task.target_outcomes or [])
+        if targets not in seen:
+            seen.append(targets)
+    return seen or [[]]
@@ -1409,7 +1409,7 @@ Return ONLY this JSON:
 }}"""
 
     try:
-        response = model.generate_content(prompt)
+        response = _generate_scheduled(model, prompt)
         data = json.loads(response.text)
         locs = data.get("locations", [])
         if not locs:
@@ -1424,6 +1424,30 @@ Return ONLY this JSON:
         return None
 
 
+def _generate_scheduled(model, prompt: str):
+    """model.generate_content through the shared LLM scheduler (batch lane).
+
+    With LLM_BACKEND=simulator the local simulator answers instead of Gemini."""
+    import sys
+    from types import SimpleNamespace
+    backend_dir = str(Path(__file__).parent.parent.parent)
+    if backend_dir not in sys.path:
+        sys.path.insert(0, backend_dir)
+    from app.core.config import get_settings
+    from app.services.llm_scheduler import Priority, get_llm_scheduler
+    if get_settings().llm_backend == "simulator":
+        from app.services.llm_simulator import get_llm_simulator
+        simulator = get_llm_simulator()
+        return get_llm_scheduler().run_sync(
+            model.model_name,
+            lambda: SimpleNamespace(text=simulator.generate_sync(model.model_name, prompt)),
+            Priority.BATCH,
+        )
+    return get_llm_scheduler().run_sync(
+        model.model_name, lambda: model.generate_content(prompt), Priority.BATCH
+    )
+
+
 def _clean_llm_json(text: str) -> str:
     """Strip markdown code fences and fix common LLM JSON syntax issues."""
     import re as _re
@@ -1585,7 +1609,7 @@ Return ONLY this JSON (no markdown):
 
     _p(f"Enriching locations, items, and tasks via LLM ({len(graph.locations)} locations, {len(graph.items)} items, {len(graph.tasks)} tasks)...")
     try:
-        response = model.generate_content(items_tasks_prompt)
+        response = _generate_scheduled(model, items_tasks_prompt)
         data = json.loads(_clean_llm_json(response.text))
 
         loc_map = {l["id"]: l for l in data.get("locations", [])}
@@ -1713,7 +1737,7 @@ Return ONLY this JSON (no markdown):
         try:
             if attempt > 0:
                 _p(f"  Retrying NPC profile call (attempt {attempt+1}/2)...")
-            response = model.generate_content(npc_prompt)
+            response = _generate_scheduled(model, npc_prompt)
             data = _try_parse_npc_response(response.text)
             if data:
                 break
@@ -1884,7 +1908,7 @@ Return ONLY this JSON (no markdown):
     _p(f"Writing narrative layer via LLM (briefing, beats, task flavor)...")
 
     try:
-        response = model.generate_content(prompt)
+        response = _generate_scheduled(model, prompt)
         data = json.loads(_clean_llm_json(response.text))
 
         if "briefing" in data:
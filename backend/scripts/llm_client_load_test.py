@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+LLM Client Load Test — Async pooled client vs a local fake Gemini server
+
+Starts the local LLM simulator (scripts/llm_simulator_server.py) on
+localhost — configurable latency distribution, error and 429 rates — fires N concurrent calls through
+app.services.llm_client.LLMClient, and measures call latency plus event-loop
+lag while the calls are in flight. With --stream it also reports
+time-to-first-chunk, the latency a player sees before NPC text appears.
+A non-blocking client keeps loop lag near zero no matter how many calls are
+outstanding; the old synchronous `requests.post` path stalled the loop for
+the full round trip of every call.
+
+Usage:
+    python3 backend/scripts/llm_client_load_test.py
+    python3 backend/scripts/llm_client_load_test.py --calls 500 --latency-ms 800 --concurrency 32
+    python3 backend/scripts/llm_client_load_test.py --deadline 0.5   # exercise per-call deadlines
+    python3 backend/scripts/llm_client_load_test.py --stream          # streamGenerateContent
+    python3 backend/scripts/llm_client_load_test.py --rpm 600         # exercise scheduler queueing
+    python3 backend/scripts/llm_client_load_test.py --rate-limit-rate 0.1 --error-rate 0.02
+"""
+
+import argparse
+import asyncio
+import logging
+import socket
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+_SCRIPT_DIR = Path(__file__).parent
+_BACKEND_DIR = _SCRIPT_DIR.parent
+sys.path.insert(0, str(_BACKEND_DIR))
+sys.path.insert(0, str(_SCRIPT_DIR))
+
+logger = logging.getLogger(__name__)
+
+
+# ─── Simulated Gemini server ──────────────────────────────────────────────────────
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_fake_gemini(port: int, args) -> threading.Thread:
+    """Run the local LLM simulator (scripts/llm_simulator_server.py) in a background thread."""
+    from app.services.llm_simulator import LLMSimulator, SimulatorConfig
+    from llm_simulator_server import start_in_thread
+
+    return start_in_thread(port, LLMSimulator(SimulatorConfig(
+        latency_ms=args.latency_ms,
+        latency_p95_ms=args.p95_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        seed=args.seed,
+    )))
+
+
+# ─── Load driver ─────────────────────────────────────────────────────────────
+
+async def _loop_lag_probe(stop: asyncio.Event, samples: list, interval: float = 0.01):
+    """Record how late the event loop wakes us up — a blocked loop shows up here."""
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - t0 - interval)
+
+
+async def run_load(args, base_url: str) -> int:
+    from app.services.llm_client import LLMClient
+    from app.services.llm_scheduler import get_llm_scheduler
+
+    # Calls go through the shared scheduler; give the fake model its own limit
+    get_llm_scheduler().model_rpm["fake-model"] = args.rpm
+
+    client = LLMClient(
+        api_key="fake",
+        base_url=base_url,
+        timeout=args.deadline,
+        max_concurrency=args.concurrency,
+        max_connections=args.connections,
+    )
+
+    latencies: list[float] = []
+    first_chunk: list[float] = []
+    failures: dict[str, int] = {}
+
+    async def _one(i: int):
+        t0 = time.perf_counter()
+        try:
+            if args.stream:
+                first = None
+                async for _ in client.stream(f"load test prompt {i}", "fake-model", max_tokens=50):
+                    if first is None:
+                        first = time.perf_counter() - t0
+                if first is not None:
+                    first_chunk.append(first)
+            else:
+                await client.generate(f"load test prompt {i}", "fake-model", max_tokens=50)
+            latencies.append(time.perf_counter() - t0)
+        except Exception as e:
+            name = type(e).__name__
+            failures[name] = failures.get(name, 0) + 1
+
+    # One warm-up call so pool/TLS-context setup isn't counted as loop lag
+    try:
+        await client.generate("warm-up", "fake-model", max_tokens=5, timeout=max(args.deadline, 5.0))
+    except Exception:
+        pass
+
+    lag_samples: list[float] = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_loop_lag_probe(stop, lag_samples))
+
+    started = time.perf_counter()
+    await asyncio.gather(*[_one(i) for i in range(args.calls)])
+    wall = time.perf_counter() - started
+
+    stop.set()
+    await probe
+    await client.aclose()
+
+    ok = len(latencies)
+    print(f"\n{'='*60}")
+    print(f"LLM client load test — {args.calls} calls, latency {args.latency_ms:.0f}ms, "
+          f"concurrency {args.concurrency}")
+    print(f"{'='*60}")
+    print(f"  Succeeded:     {ok}/{args.calls}")
+    if failures:
+        print(f"  Failures:      {failures}")
+    print(f"  Wall time:     {wall:.2f}s  ({ok / wall:.1f} calls/s)")
+    if latencies:
+        q = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [latencies[0]] * 99
+        print(f"  Latency p50:   {q[49]*1000:.0f}ms   p95: {q[94]*1000:.0f}ms   max: {max(latencies)*1000:.0f}ms")
+    if first_chunk:
+        q = statistics.quantiles(first_chunk, n=100) if len(first_chunk) > 1 else [first_chunk[0]] * 99
+        print(f"  First chunk:   p50 {q[49]*1000:.0f}ms   p95: {q[94]*1000:.0f}ms")
+    if lag_samples:
+        print(f"  Loop lag max:  {max(lag_samples)*1000:.1f}ms   "
+              f"mean: {statistics.mean(lag_samples)*1000:.2f}ms")
+    expected = args.calls / args.concurrency * args.latency_ms / 1000.0
+    print(f"  Ideal wall:    ~{expected:.2f}s (calls / concurrency × latency)")
+    # Injected faults are expected to surface once retries run out
+    expected_failures = {"TimeoutError"}
+    if args.error_rate or args.rate_limit_rate:
+        expected_failures |= {"HTTPStatusError", "CircuitOpenError"}
+    return 0 if ok == args.calls or failures.keys() <= expected_failures else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the async LLM client against the local LLM simulator")
+    parser.add_argument("--calls", type=int, default=200, help="Total calls to fire (default: 200)")
+    parser.add_argument("--latency-ms", type=float, default=500, help="Median simulated latency per call (default: 500)")
+    parser.add_argument("--p95-ms", type=float, default=0, help="p95 simulated latency (default: fixed latency)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of calls answered with HTTP 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of calls answered with HTTP 429")
+    parser.add_argument("--seed", type=int, default=0, help="Simulator seed (default: 0)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Client concurrency bound (default: 16)")
+    parser.add_argument("--connections", type=int, default=32, help="Pool size (default: 32)")
+    parser.add_argument("--deadline", type=float, default=60.0, help="Per-call deadline in seconds (default: 60)")
+    parser.add_argument("--rpm", type=float, default=1_000_000, help="Scheduler rate limit for the fake model (default: unlimited)")
+    parser.add_argument("--stream", action="store_true", help="Use streamGenerateContent and report time-to-first-chunk")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s [%(levelname)8s] %(message)s')
+
+    port = _free_port()
+    start_fake_gemini(port, args)
+    return asyncio.run(run_load(args, f"http://127.0.0.1:{port}/v1beta"))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+LLM Simulator Server — Gemini REST stand-in backed by the local simulator
+
+Serves app.services.llm_simulator.LLMSimulator on the paths LLMClient calls,
+so the real HTTP client (pooling, streaming, 429 handling) can be load
+tested without spending quota:
+
+  POST /v1beta/models/{model}:generateContent
+  POST /v1beta/models/{model}:streamGenerateContent?alt=sse
+  POST /v1beta/cachedContents
+
+Usage:
+    python3 backend/scripts/llm_simulator_server.py --port 8931 --latency-ms 600 --p95-ms 1500
+    python3 backend/scripts/llm_simulator_server.py --error-rate 0.02 --rate-limit-rate 0.05 --seed 7
+
+    # then, for the backend:
+    GEMINI_BASE_URL=http://127.0.0.1:8931/v1beta uvicorn app.main:app
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+_SCRIPT_DIR = Path(__file__).parent
+_BACKEND_DIR = _SCRIPT_DIR.parent
+sys.path.insert(0, str(_BACKEND_DIR))
+
+from app.services.llm_simulator import LLMSimulator, SimulatorConfig  # noqa: E402
+
+
+def build_app(simulator: LLMSimulator):
+    from fastapi import FastAPI
+    from fastapi.responses import JSONResponse, StreamingResponse
+
+    app = FastAPI(title="LLM simulator")
+
+    def _error(fault):
+        headers = {"Retry-After": f"{fault.retry_after:g}"} if fault.retry_after else {}
+        return JSONResponse({"error": {"code": fault.status, "message": str(fault)}},
+                            status_code=fault.status, headers=headers)
+
+    @app.post("/v1beta/models/{model_action}")
+    async def generate_content(model_action: str, body: dict):
+        model = model_action.split(":")[0]
+        prompt = body["contents"][-1]["parts"][0]["text"]
+        latency = simulator.sample_latency()
+
+        if model_action.endswith(":streamGenerateContent"):
+            await asyncio.sleep(latency * 0.2)
+            fault = simulator.fault(model)
+            if fault:
+                return _error(fault)
+            words = simulator.respond(prompt).split(" ")
+
+            async def _sse():
+                for i, word in enumerate(words):
+                    if i:
+                        await asyncio.sleep(latency * 0.8 / len(words))
+                    chunk = {"candidates": [{"content": {"parts": [{"text": word + " "}]}}]}
+                    yield f"data: {json.dumps(chunk)}\r\n\r\n"
+            return StreamingResponse(_sse(), media_type="text/event-stream")
+
+        await asyncio.sleep(latency)
+        fault = simulator.fault(model)
+        if fault:
+            return _error(fault)
+        return {"candidates": [{"content": {"parts": [{"text": simulator.respond(prompt)}]}}]}
+
+    @app.post("/v1beta/cachedContents")
+    async def cached_contents(body: dict):
+        text = body["contents"][0]["parts"][0]["text"]
+        return {"name": f"cachedContents/sim-{hashlib.sha256(text.encode('utf-8')).hexdigest()[:12]}"}
+
+    return app
+
+
+def start_in_thread(port: int, simulator: LLMSimulator) -> threading.Thread:
+    """Run the simulator server on localhost in a background thread."""
+    import uvicorn
+
+    config = uvicorn.Config(build_app(simulator), host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the local LLM simulator on the Gemini REST paths")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8931)
+    parser.add_argument("--latency-ms", type=float, default=600, help="Median latency (default: 600)")
+    parser.add_argument("--p95-ms", type=float, default=1500, help="p95 latency (default: 1500)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of calls answered with HTTP 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of calls answered with HTTP 429")
+    parser.add_argument("--rpm", type=float, default=0.0, help="Provider-side quota per model (default: unlimited)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    import uvicorn
+    simulator = LLMSimulator(SimulatorConfig(
+        latency_ms=args.latency_ms, latency_p95_ms=args.p95_ms, error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate, rpm=args.rpm, seed=args.seed,
+    ))
+    print(f"🧪 LLM simulator on http://{args.host}:{args.port}/v1beta "
+          f"(median {args.latency_ms:.0f}ms, p95 {args.p95_ms:.0f}ms, "
+          f"errors {args.error_rate:.1%}, 429s {args.rate_limit_rate:.1%})")
+    uvicorn.run(build_app(simulator), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
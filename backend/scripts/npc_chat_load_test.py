@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+NPC Chat Load Test — hundreds of concurrent conversations against the simulator
+
+Drives the real conversation endpoints (/api/npc/start-conversation, then
+/api/npc/chat turns) for many players at once and reports end-to-end turn
+latency, failures, throughput and event-loop lag, plus the backend's own
+/health metrics (scheduler, breakers, caches, sessions).
+
+Two modes:
+
+  - In-process (default): imports the app with LLM_BACKEND=simulator and
+    calls it through an ASGI transport. Rooms are registered directly from
+    an experience file (markdown or generated JSON), like /api/npc/test-setup
+    does. No server, no quota.
+  - --url: hits a running backend (start it with LLM_BACKEND=simulator, or
+    point GEMINI_BASE_URL at scripts/llm_simulator_server.py). Rooms come
+    from /api/npc/test-setup, so a generated scenario must exist there.
+
+Usage:
+    python3 backend/scripts/npc_chat_load_test.py
+    python3 backend/scripts/npc_chat_load_test.py --players 300 --turns 6 --latency-ms 800 --p95-ms 2500
+    python3 backend/scripts/npc_chat_load_test.py --error-rate 0.05 --rate-limit-rate 0.1
+    python3 backend/scripts/npc_chat_load_test.py --rpm 5000   # take the scheduler's quota out of the picture
+    python3 backend/scripts/npc_chat_load_test.py --rpm 300 --batch-window-ms 50   # quick-response micro-batching
+    python3 backend/scripts/npc_chat_load_test.py --url http://localhost:8000 --scenario museum_gala_vault --roles mastermind,hacker
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+_SCRIPT_DIR = Path(__file__).parent
+_BACKEND_DIR = _SCRIPT_DIR.parent
+sys.path.insert(0, str(_BACKEND_DIR))
+
+logger = logging.getLogger(__name__)
+
+
+def _configure_simulator(args) -> None:
+    """Environment for the in-process app; must run before app modules are imported."""
+    os.environ.setdefault("GEMINI_API_KEY", "simulated")
+    os.environ["LLM_BACKEND"] = "simulator"
+    os.environ["LLM_SIMULATOR_LATENCY_MS"] = str(args.latency_ms)
+    os.environ["LLM_SIMULATOR_LATENCY_P95_MS"] = str(args.p95_ms)
+    os.environ["LLM_SIMULATOR_ERROR_RATE"] = str(args.error_rate)
+    os.environ["LLM_SIMULATOR_RATE_LIMIT_RATE"] = str(args.rate_limit_rate)
+    os.environ["LLM_SIMULATOR_SEED"] = str(args.seed)
+    if args.rpm:
+        os.environ["LLM_DEFAULT_RPM"] = str(args.rpm)
+    os.environ["LLM_BATCH_WINDOW_MS"] = str(args.batch_window_ms)
+    os.environ["LLM_BATCH_MAX_SIZE"] = str(args.batch_max_size)
+    os.environ["LLM_CACHE_DIR"] = ""  # keep simulated text out of the on-disk response cache
+    os.environ["WARMUP_ENABLED"] = "false"
+
+
+def _load_game_state(args):
+    from app.services.experience_loader import ExperienceLoader, experience_version_id
+
+    roles = [r.strip() for r in args.roles.split(",")]
+    loader = ExperienceLoader(experiences_dir=str(_BACKEND_DIR / "experiences"))
+    path = Path(args.experience)
+    if not path.is_absolute():
+        path = _BACKEND_DIR / path
+    if path.suffix == ".json":
+        return loader._load_from_json(path, args.scenario, roles)
+    game_state = loader._parse_markdown(path.read_text(), args.scenario, roles)
+    game_state.experience_id = experience_version_id(path)
+    return game_state
+
+
+def _register_rooms(args) -> list:
+    """In-process setup: one room per --players-per-room players. Returns (room, player, npcs) seats."""
+    from app.models.room import GameRoom, Player, RoomStatus
+    from app.services.game_state_manager import get_game_state_manager
+    from app.services.room_manager import get_room_manager
+
+    template = _load_game_state(args)
+    roles = [r.strip() for r in args.roles.split(",")]
+    room_mgr, game_state_mgr = get_room_manager(), get_game_state_manager()
+    seats = []
+    for r in range((args.players + args.players_per_room - 1) // args.players_per_room):
+        room_code = "L" + "".join(chr(65 + (r // 26 ** i) % 26) for i in (3, 2, 1, 0))
+        players = {}
+        for p in range(min(args.players_per_room, args.players - len(seats))):
+            player_id = f"load_{r}_{p}"
+            players[player_id] = Player(id=player_id, name=f"Load {r}.{p}",
+                                        role=roles[p % len(roles)], difficulty=args.difficulty)
+            seats.append((room_code, player_id))
+        host = next(iter(players))
+        room_mgr.rooms[room_code] = GameRoom(room_code=room_code, host_id=host, players=players,
+                                             scenario=args.scenario, status=RoomStatus.IN_PROGRESS)
+        game_state_mgr.game_states[room_code] = template.model_copy(deep=True)
+
+    npcs = []
+    for npc in template.npcs:
+        targets = sorted({o for t in template.tasks.values() if getattr(t, "npc_id", None) == npc.id
+                          for o in (t.target_outcomes or [])})
+        npcs.append({"id": npc.id, "cover_options": [c.model_dump() for c in npc.cover_options],
+                     "target_outcomes": targets})
+    return [(room_code, player_id, npcs) for room_code, player_id in seats]
+
+
+async def _remote_rooms(client, args) -> list:
+    seats = []
+    for _ in range(args.players):
+        response = await client.post("/api/npc/test-setup", params={
+            "scenario_id": args.scenario, "roles": args.roles, "difficulty": args.difficulty,
+        })
+        response.raise_for_status()
+        setup = response.json()
+        npcs = [{"id": n["id"], "cover_options": n["cover_options"], "target_outcomes": n["target_outcomes"]}
+                for n in setup["npcs"]]
+        seats.append((setup["room_code"], setup["player_id"], npcs))
+    return seats
+
+
+async def _loop_lag_probe(stop: asyncio.Event, samples: list, interval: float = 0.01):
+    """Record how late the event loop wakes us up — a blocked loop shows up here."""
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - t0 - interval)
+
+
+def _quantiles(values: list) -> tuple:
+    if not values:
+        return 0.0, 0.0, 0.0
+    q = statistics.quantiles(values, n=100) if len(values) > 1 else [values[0]] * 99
+    return q[49], q[94], max(values)
+
+
+async def run_load(args) -> int:
+    import httpx
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=120.0)
+    else:
+        from app.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=120.0)
+
+    seats = await _remote_rooms(client, args) if args.url else _register_rooms(args)
+    rng = random.Random(args.seed)
+
+    starts: list[float] = []
+    turns: list[float] = []
+    failures: dict[str, int] = {}
+    ended = {"failed_conversations": 0, "outcomes": 0}
+
+    def _fail(kind: str) -> None:
+        failures[kind] = failures.get(kind, 0) + 1
+
+    async def _conversation(room_code: str, player_id: str, npcs: list):
+        await asyncio.sleep(rng.uniform(0, args.ramp_seconds))
+        npc = rng.choice(npcs)
+        cover = rng.choice(npc["cover_options"])
+        t0 = time.perf_counter()
+        response = await client.post("/api/npc/start-conversation", json={
+            "npc_id": npc["id"], "cover_id": cover["cover_id"], "room_code": room_code,
+            "player_id": player_id, "target_outcomes": npc["target_outcomes"],
+        })
+        if response.status_code != 200:
+            _fail(f"start HTTP {response.status_code}")
+            return
+        starts.append(time.perf_counter() - t0)
+        options = response.json()["quick_responses"]
+
+        for _ in range(args.turns):
+            if not options:
+                break
+            await asyncio.sleep(rng.uniform(0, args.think_seconds))  # player reads and picks
+            t0 = time.perf_counter()
+            response = await client.post("/api/npc/chat", json={
+                "response_index": rng.randrange(len(options)), "room_code": room_code,
+                "player_id": player_id, "npc_id": npc["id"],
+            })
+            if response.status_code != 200:
+                _fail(f"chat HTTP {response.status_code}")
+                return
+            turns.append(time.perf_counter() - t0)
+            body = response.json()
+            ended["outcomes"] += len(body["outcomes"])
+            if body["conversation_failed"]:
+                ended["failed_conversations"] += 1
+                return
+            options = body["quick_responses"]
+
+    lag_samples: list[float] = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_loop_lag_probe(stop, lag_samples))
+
+    started = time.perf_counter()
+    await asyncio.gather(*[_conversation(*seat) for seat in seats])
+    wall = time.perf_counter() - started
+
+    stop.set()
+    await probe
+    health = (await client.get("/health")).json()
+    await client.aclose()
+
+    calls = len(starts) + len(turns)
+    print(f"\n{'='*64}")
+    print(f"NPC chat load test — {len(seats)} players × {args.turns} turns "
+          f"({'remote ' + args.url if args.url else 'in-process simulator'})")
+    print(f"{'='*64}")
+    print(f"  Conversations: {len(starts)}/{len(seats)} started, "
+          f"{ended['failed_conversations']} ended by low rapport, {ended['outcomes']} outcomes revealed")
+    print(f"  Turns:         {len(turns)}")
+    if failures:
+        print(f"  Failures:      {failures}")
+    print(f"  Wall time:     {wall:.2f}s  ({calls / wall:.1f} requests/s)")
+    for label, values in (("Start", starts), ("Turn", turns)):
+        p50, p95, worst = _quantiles(values)
+        print(f"  {label + ' latency:':<15}p50 {p50*1000:.0f}ms   p95 {p95*1000:.0f}ms   max {worst*1000:.0f}ms")
+    if lag_samples:
+        print(f"  Loop lag max:  {max(lag_samples)*1000:.1f}ms   mean: {statistics.mean(lag_samples)*1000:.2f}ms")
+    batching = health.get("npc_conversations", {}).get("quick_response_batching", {})
+    if batching.get("requests"):
+        # Throughput gained (LLM calls saved) against latency added (time waiting for a batch)
+        print(f"  QR batching:   {batching['llm_calls_saved']}/{batching['requests']} calls saved, "
+              f"mean batch {batching['mean_batch_size']}, wait mean {batching['mean_wait_ms']}ms "
+              f"max {batching['max_wait_ms']}ms")
+    print("\n/health:")
+    for key in ("llm_scheduler", "npc_conversations", "npc_sessions", "llm_cache"):
+        if key in health:
+            print(f"  {key}: {json.dumps(health[key], default=str)[:600]}")
+    return 0 if not failures or args.error_rate or args.rate_limit_rate else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test NPC conversations against the local LLM simulator")
+    parser.add_argument("--players", type=int, default=200, help="Concurrent conversations (default: 200)")
+    parser.add_argument("--players-per-room", type=int, default=4, help="Players per simulated room (default: 4)")
+    parser.add_argument("--turns", type=int, default=5, help="Chat turns per conversation (default: 5)")
+    parser.add_argument("--think-seconds", type=float, default=1.0, help="Max pause before each turn (default: 1.0)")
+    parser.add_argument("--ramp-seconds", type=float, default=2.0, help="Spread conversation starts over this long (default: 2.0)")
+    parser.add_argument("--difficulty", default="easy")
+    parser.add_argument("--scenario", default="museum_gala_vault")
+    parser.add_argument("--roles", default="mastermind,hacker")
+    parser.add_argument("--experience", default="experiences/museum_gala_vault.md",
+                        help="In-process mode: experience file (markdown or generated JSON)")
+    parser.add_argument("--url", help="Load test a running backend instead of the in-process app")
+    parser.add_argument("--latency-ms", type=float, default=600, help="Simulated median LLM latency (default: 600)")
+    parser.add_argument("--p95-ms", type=float, default=1500, help="Simulated p95 LLM latency (default: 1500)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of LLM calls failing with HTTP 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of LLM calls failing with HTTP 429")
+    parser.add_argument("--rpm", type=float, default=0, help="In-process: scheduler rate limit per model (default: llm_default_rpm)")
+    parser.add_argument("--batch-window-ms", type=float, default=0,
+                        help="In-process: quick-response micro-batching window (default: 0 = off)")
+    parser.add_argument("--batch-max-size", type=int, default=8, help="In-process: max requests per batch (default: 8)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s [%(levelname)8s] %(message)s')
+    if not args.url:
+        _configure_simulator(args)
+    return asyncio.run(run_load(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
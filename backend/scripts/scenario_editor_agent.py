@@ -15,9 +15,11 @@ import google.generativeai as genai
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from config import GEMINI_API_KEY, GEMINI_EXPERIENCE_MODEL
 from validate_scenario import ValidationIssue, ValidationLevel
+from app.services.llm_scheduler import Priority, get_llm_scheduler
 
 logger = logging.getLogger(__name__)
 
@@ -114,7 +116,9 @@ class ScenarioEditorAgent:
             prompt = self._build_fix_prompt(scenario_content, issue)
             
             # Get fixed version from LLM
-            response = self.model.generate_content(prompt)
+            response = get_llm_scheduler().run_sync(
+                self.model_name, lambda: self.model.generate_content(prompt), Priority.BATCH
+            )
             fixed_content = response.text.strip()
             
             # Remove markdown code fences if present
@@ -4,6 +4,7 @@ Scenario Pipeline — Single Source of Truth
 This is the ONE place that runs the full scenario generation pipeline:
   procedural_generator → graph_validator_fixer → json_exporter
   → markdown_renderer → validate_scenario → scenario_editor_agent
+  → opening_bank_generator
 
 Both the E2E portal (ui_server.py) and the live game service
 (app/services/scenario_generator_service.py) call this module.
@@ -66,6 +67,7 @@ def run_pipeline(
     roles: List[str],
     seed: Optional[int] = None,
     progress_fn: Optional[Callable[[str], None]] = None,
+    opening_banks: bool = True,
 ) -> PipelineResult:
     """
     Run the full scenario generation pipeline synchronously.
@@ -79,6 +81,9 @@ def run_pipeline(
         seed: optional RNG seed for reproducible generation
         progress_fn: optional callback called with a human-readable progress
                      string at each pipeline step.
+        opening_banks: run stage 7 (NPC opening + fallback banks). Live
+                       generation passes False and banks them afterwards
+                       in the background, since the stage is many LLM calls.
 
     Returns:
         PipelineResult with success=True and md_path set on success.
@@ -250,6 +255,26 @@ def run_pipeline(
             else:
                 _emit("  ✅ No NPC quality issues")
 
+            # ── 7. NPC opening + fallback banks ───────────────────────────
+            # Pre-generated greetings + first quick responses so conversation
+            # starts skip the LLM, and canned lines for replies that miss
+            # their deadline. Optional: a failure only costs latency.
+            if not opening_banks:
+                _emit("NPC opening + fallback banks deferred")
+            else:
+                _emit("Generating NPC opening + fallback banks...")
+                try:
+                    from config import OPENING_BANK_VARIANTS
+                    from generators.opening_bank_generator import add_opening_banks
+                    banked = add_opening_banks(
+                        md_path.with_suffix(".json"), scenario_id, roles,
+                        variants=OPENING_BANK_VARIANTS,
+                        progress_fn=lambda msg: _emit(f"  {msg}"),
+                    )
+                    _emit(f"  ✅ {banked} openings banked")
+                except Exception as bank_err:
+                    _emit(f"  ⚠️  Opening banks skipped: {bank_err}")
+
             # ── 8. Final pipeline summary ──────────────────────────────────
             total_unresolved = len(critical) + len(important)
             if total_unresolved == 0:
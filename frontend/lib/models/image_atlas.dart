@@ -0,0 +1,59 @@
+/// Frame of one image inside an [ImageAtlas], in sheet pixels
+class AtlasFrame {
+  final double x;
+  final double y;
+  final double width;
+  final double height;
+
+  const AtlasFrame({
+    required this.x,
+    required this.y,
+    required this.width,
+    required this.height,
+  });
+
+  factory AtlasFrame.fromJson(Map<String, dynamic> json) {
+    return AtlasFrame(
+      x: (json['x'] as num).toDouble(),
+      y: (json['y'] as num).toDouble(),
+      width: (json['w'] as num).toDouble(),
+      height: (json['h'] as num).toDouble(),
+    );
+  }
+}
+
+/// Sprite sheet of item (and NPC) thumbnails for one experience.
+///
+/// Sent with game_started so every thumbnail comes from a single image
+/// request instead of one request per item.
+class ImageAtlas {
+  final String url;
+  final double width;
+  final double height;
+  final Map<String, AtlasFrame> frames;
+
+  const ImageAtlas({
+    required this.url,
+    required this.width,
+    required this.height,
+    required this.frames,
+  });
+
+  factory ImageAtlas.fromJson(Map<String, dynamic> json) {
+    final rawFrames = Map<String, dynamic>.from(json['frames'] as Map? ?? {});
+    return ImageAtlas(
+      url: json['url'] as String,
+      width: (json['width'] as num).toDouble(),
+      height: (json['height'] as num).toDouble(),
+      frames: rawFrames.map(
+        (name, frame) => MapEntry(name, AtlasFrame.fromJson(Map<String, dynamic>.from(frame))),
+      ),
+    );
+  }
+
+  /// Frame for an asset, e.g. frame('item', 'item_keycard'); null if not packed
+  AtlasFrame? frame(String kind, String id) {
+    final bareId = id.startsWith('${kind}_') ? id.substring(kind.length + 1) : id;
+    return frames['$kind:$bareId'];
+  }
+}
@@ -5,7 +5,9 @@ import 'package:the_heist/core/theme/app_colors.dart';
 import 'package:the_heist/core/theme/app_dimensions.dart';
 import 'package:the_heist/services/websocket_service.dart';
 import 'package:the_heist/widgets/common/heist_primary_button.dart';
+import 'package:the_heist/widgets/common/atlas_sprite.dart';
 import 'package:the_heist/widgets/common/top_toast.dart';
+import 'package:the_heist/models/image_atlas.dart';
 import 'package:the_heist/models/item.dart';
 import 'package:the_heist/models/minigame.dart';
 import 'package:the_heist/models/npc.dart';
@@ -28,6 +30,8 @@ class GameScreen extends StatefulWidget {
   final List<Map<String, dynamic>>? locations;
   final List<Map<String, dynamic>>? npcs;
   final String? startingLocation;
+  final Map<String, dynamic>? imageAtlas;
+  final bool imagesPending;
   
   const GameScreen({
     super.key,
@@ -43,6 +47,8 @@ class GameScreen extends StatefulWidget {
     this.locations,
     this.npcs,
     this.startingLocation,
+    this.imageAtlas,
+    this.imagesPending = false,
   });
   
   @override
@@ -65,6 +71,12 @@ class _GameScreenState extends State<GameScreen> {
   List<Map<String, dynamic>> _npcs = [];
   List<Map<String, dynamic>> _allLocations = [];
   String? _myPlayerId;
+  ImageAtlas? _imageAtlas; // Item thumbnails sprite sheet (one request for all)
+
+  // Progressive start: images still generating show a placeholder until
+  // their image_ready arrives; the version busts the URL so they reload
+  bool _imagesPending = false;
+  final Map<String, int> _imageVersions = {};
 
   // Narrative overlay state
   String? _narrativeBeatText;
@@ -109,6 +121,10 @@ class _GameScreenState extends State<GameScreen> {
     if (widget.npcs != null) {
       _npcs = widget.npcs!.map((n) => Map<String, dynamic>.from(n)).toList();
     }
+    if (widget.imageAtlas != null) {
+      _imageAtlas = ImageAtlas.fromJson(widget.imageAtlas!);
+    }
+    _imagesPending = widget.imagesPending;
     
     _setupWebSocketListeners();
   }
@@ -277,11 +293,101 @@ class _GameScreenState extends State<GameScreen> {
               debugPrint('   Location: ${loc['name']}');
             }
           }
+          if (message['image_atlas'] != null) {
+            _imageAtlas = ImageAtlas.fromJson(Map<String, dynamic>.from(message['image_atlas']));
+          }
+        });
+      }
+
+      // Progressive start finished: the atlas now covers every item
+      // Progressive start: one image finished generating
+      if (message['type'] == 'image_ready') {
+        final key = _imageKey(message['kind'] ?? '', message['asset_id'] ?? '');
+        setState(() {
+          _imageVersions[key] = (_imageVersions[key] ?? 0) + 1;
+        });
+      }
+
+      // Progressive start finished: stop waiting (failed images fall back);
+      // the atlas now covers every item
+      if (message['type'] == 'images_complete') {
+        setState(() {
+          _imagesPending = false;
+          if (message['image_atlas'] != null) {
+            _imageAtlas = ImageAtlas.fromJson(Map<String, dynamic>.from(message['image_atlas']));
+          }
         });
       }
     });
   }
   
+  /// "kind:bare_id" — ids arrive with or without their kind prefix
+  String _imageKey(String kind, String id) {
+    final bareId = id.startsWith('${kind}_') ? id.substring(kind.length + 1) : id;
+    return '$kind:$bareId';
+  }
+
+  /// True while a progressive start hasn't delivered this image yet
+  bool _awaitingImage(String kind, String id) {
+    return _imagesPending && !_imageVersions.containsKey(_imageKey(kind, id));
+  }
+
+  /// Image URL, versioned once image_ready arrived so a failed load retries
+  String _imageUrl(String kind, String id, {int? width}) {
+    final version = _imageVersions[_imageKey(kind, id)];
+    final params = [
+      if (width != null) 'w=$width',
+      if (version != null) 'v=$version',
+    ];
+    final query = params.isEmpty ? '' : '?${params.join('&')}';
+    return '${AppConfig.backendUrl}/api/images/${widget.experienceId}/$kind/$id$query';
+  }
+
+  Widget _imagePlaceholder() {
+    return Container(
+      color: AppColors.bgSecondary,
+      child: Center(
+        child: SizedBox(
+          width: 20,
+          height: 20,
+          child: CircularProgressIndicator(
+            strokeWidth: 2,
+            color: AppColors.accentSecondary,
+          ),
+        ),
+      ),
+    );
+  }
+
+  /// Item image: a frame of the atlas when packed, else its own thumbnail
+  Widget _itemThumbnail(Item item) {
+    Widget fallback(BuildContext context, Object error, StackTrace? stackTrace) {
+      // Fallback icon if image not available
+      return Center(
+        child: Icon(
+          Icons.inventory_2,
+          color: AppColors.accentSecondary,
+          size: 40,
+        ),
+      );
+    }
+
+    final frame = _imageAtlas?.frame('item', item.id);
+    if (frame != null) {
+      return AtlasSprite(atlas: _imageAtlas!, frame: frame, errorBuilder: fallback);
+    }
+    if (_awaitingImage('item', item.id)) {
+      return _imagePlaceholder();
+    }
+    final url = _imageUrl('item', item.id, width: 256);
+    return Image.network(
+      url,
+      key: ValueKey(url),
+      fit: BoxFit.cover,
+      errorBuilder: fallback,
+    );
+  }
+
   void _showSnackBar(String message, {Color? color}) {
     showTopToast(context, message, color: color);
   }
@@ -350,6 +456,7 @@ class _GameScreenState extends State<GameScreen> {
           playerId: _myPlayerId,
           targetOutcomes: targetOutcomes,
           missionBrief: missionBrief,
+          wsService: widget.wsService,
         ),
       ),
     );
@@ -686,32 +793,35 @@ class _GameScreenState extends State<GameScreen> {
             child: Container(
             width: double.infinity,
             color: AppColors.bgPrimary,
-            child: Image.network(
-              '${AppConfig.backendUrl}/api/images/${widget.experienceId}/location/$_currentLocationId',
-              fit: BoxFit.cover,
-              errorBuilder: (context, error, stackTrace) {
-                // Fallback to gradient if image not available
-                return Container(
-                  decoration: BoxDecoration(
-                    gradient: LinearGradient(
-                      begin: Alignment.topLeft,
-                      end: Alignment.bottomRight,
-                      colors: [
-                        AppColors.bgPrimary,
-                        AppColors.bgSecondary,
-                      ],
-                    ),
-                  ),
-                  child: Center(
-                    child: Icon(
-                      Icons.location_on,
-                      size: 48,
-                      color: AppColors.accentPrimary.withOpacity(0.3),
-                    ),
-                  ),
-                );
-              },
-            ),
+            child: _awaitingImage('location', _currentLocationId)
+                ? _imagePlaceholder()
+                : Image.network(
+                  _imageUrl('location', _currentLocationId),
+                  key: ValueKey(_imageUrl('location', _currentLocationId)),
+                  fit: BoxFit.cover,
+                  errorBuilder: (context, error, stackTrace) {
+                    // Fallback to gradient if image not available
+                    return Container(
+                      decoration: BoxDecoration(
+                        gradient: LinearGradient(
+                          begin: Alignment.topLeft,
+                          end: Alignment.bottomRight,
+                          colors: [
+                            AppColors.bgPrimary,
+                            AppColors.bgSecondary,
+                          ],
+                        ),
+                      ),
+                      child: Center(
+                        child: Icon(
+                          Icons.location_on,
+                          size: 48,
+                          color: AppColors.accentPrimary.withOpacity(0.3),
+                        ),
+                      ),
+                    );
+                  },
+                ),
           ),
           ),
           
@@ -1825,20 +1935,7 @@ class _GameScreenState extends State<GameScreen> {
                                     ),
                                     child: ClipRRect(
                                       borderRadius: BorderRadius.circular(7),
-                                      child: Image.network(
-                                        '${AppConfig.backendUrl}/api/images/${widget.experienceId}/item/${item.id}',
-                                        fit: BoxFit.cover,
-                                        errorBuilder: (context, error, stackTrace) {
-                                          // Fallback icon if image not available
-                                          return Center(
-                                            child: Icon(
-                                              Icons.inventory_2,
-                                              color: AppColors.accentSecondary,
-                                              size: 40,
-                                            ),
-                                          );
-                                        },
-                                      ),
+                                      child: _itemThumbnail(item),
                                     ),
                                   ),
                                   SizedBox(width: 12),
@@ -1990,20 +2087,7 @@ class _GameScreenState extends State<GameScreen> {
                               ),
                               child: ClipRRect(
                                 borderRadius: BorderRadius.circular(7),
-                                child: Image.network(
-                                  '${AppConfig.backendUrl}/api/images/${widget.experienceId}/item/${item.id}',
-                                  fit: BoxFit.cover,
-                                  errorBuilder: (context, error, stackTrace) {
-                                    // Fallback icon if image not available
-                                    return Center(
-                                      child: Icon(
-                                        Icons.inventory_2,
-                                        color: AppColors.accentSecondary,
-                                        size: 40,
-                                      ),
-                                    );
-                                  },
-                                ),
+                                child: _itemThumbnail(item),
                               ),
                             ),
                             SizedBox(width: 12),
@@ -1,9 +1,11 @@
+import 'dart:async';
 import 'package:flutter/material.dart';
 import '../core/app_config.dart';
 import '../core/theme/app_colors.dart';
 import '../core/theme/app_dimensions.dart';
 import '../models/npc.dart';
 import '../services/backend_service.dart';
+import '../services/websocket_service.dart';
 
 /// NPC Conversation Screen with cover fit score system
 /// 
@@ -22,6 +24,8 @@ class NPCConversationScreen extends StatefulWidget {
   final String? playerId;
   final List<String> targetOutcomes;
   final String missionBrief;
+  /// Room socket; when set, NPC replies stream in as they are generated
+  final WebSocketService? wsService;
 
   const NPCConversationScreen({
     Key? key,
@@ -34,6 +38,7 @@ class NPCConversationScreen extends StatefulWidget {
     this.playerId,
     this.targetOutcomes = const [],
     this.missionBrief = '',
+    this.wsService,
   }) : super(key: key);
 
   @override
@@ -58,18 +63,37 @@ class _NPCConversationScreenState extends State<NPCConversationScreen> {
   bool _isLoading = false;
   bool _conversationFailed = false;
   bool _allOutcomesAchieved = false;
+  // Partial NPC reply streamed over the WebSocket while a choice is pending
+  String? _streamingText;
+  StreamSubscription? _streamSub;
 
   @override
   void initState() {
     super.initState();
+    _streamSub = widget.wsService?.messages.listen(_onStreamMessage);
   }
 
   @override
   void dispose() {
+    _streamSub?.cancel();
     _scrollController.dispose();
     super.dispose();
   }
 
+  void _onStreamMessage(Map<String, dynamic> message) {
+    // Frames arriving after the HTTP reply are stale — it already has the text
+    if (!_isLoading || message['npc_id'] != widget.npc.id) return;
+    switch (message['type']) {
+      case 'npc_message_delta':
+        setState(() => _streamingText = (_streamingText ?? '') + (message['delta'] ?? ''));
+        _scrollToBottom();
+        break;
+      case 'npc_message_done':
+        setState(() => _streamingText = message['text'] ?? _streamingText);
+        break;
+    }
+  }
+
   String? _getNpcImageUrl() {
     if (widget.scenarioId != null && widget.npc.id.isNotEmpty) {
       return '${AppConfig.backendUrl}/api/images/${widget.scenarioId}/npc/${widget.npc.id}';
@@ -161,10 +185,12 @@ class _NPCConversationScreenState extends State<NPCConversationScreen> {
         roomCode: widget.roomCode!,
         playerId: widget.playerId!,
         npcId: widget.npc.id,
+        stream: widget.wsService != null,
       );
 
       if (!mounted) return;
       setState(() {
+        _streamingText = null;
         _messages.add(ChatMessage(
           id: DateTime.now().millisecondsSinceEpoch.toString(),
           text: result.npcResponse,
@@ -196,6 +222,7 @@ class _NPCConversationScreenState extends State<NPCConversationScreen> {
       if (!mounted) return;
       setState(() {
         _isLoading = false;
+        _streamingText = null;
         _messages.add(ChatMessage(
           id: DateTime.now().millisecondsSinceEpoch.toString(),
           text: "Sorry, I didn't catch that. Could you repeat?",
@@ -508,8 +535,16 @@ class _NPCConversationScreenState extends State<NPCConversationScreen> {
                 // Chat messages
                 for (final message in _messages) _buildChatBubble(message),
                 
-                // Typing indicator
-                if (_isLoading) _buildTypingIndicator(),
+                // Streamed reply so far, else typing indicator
+                if (_isLoading && _streamingText != null)
+                  _buildChatBubble(ChatMessage(
+                    id: 'streaming',
+                    text: _streamingText!,
+                    isPlayer: false,
+                    timestamp: DateTime.now(),
+                  ))
+                else if (_isLoading)
+                  _buildTypingIndicator(),
                 
                 // Result banners
                 if (_conversationFailed) _buildFailureBanner(),
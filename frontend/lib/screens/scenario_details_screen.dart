@@ -244,6 +244,10 @@ class _ScenarioDetailsScreenState extends State<ScenarioDetailsScreen> {
           locations: List<Map<String, dynamic>>.from(msg['locations'] ?? []),
           npcs: List<Map<String, dynamic>>.from(msg['npcs'] ?? []),
           startingLocation: msg['starting_location'] as String?,
+          imagesPending: msg['images_pending'] == true,
+          imageAtlas: msg['image_atlas'] == null
+              ? null
+              : Map<String, dynamic>.from(msg['image_atlas']),
         ),
       ),
     );
@@ -83,12 +83,15 @@ class BackendService {
     }
   }
 
-  /// Send a chosen quick response in an active conversation
+  /// Send a chosen quick response in an active conversation.
+  /// With [stream], the reply is also streamed over the room WebSocket
+  /// (npc_message_delta / npc_message_done) while this request is pending.
   Future<ConversationTurnResult> sendConversationChoice({
     required int responseIndex,
     required String roomCode,
     required String playerId,
     required String npcId,
+    bool stream = false,
   }) async {
     print('💬 BackendService: Sending choice $responseIndex to $npcId');
     
@@ -103,6 +106,7 @@ class BackendService {
           'room_code': roomCode,
           'player_id': playerId,
           'npc_id': npcId,
+          'stream': stream,
         }),
       );
       
@@ -319,6 +319,10 @@ class WebSocketService {
           _errorController.add(message);
           debugPrint('❌ Error from server: ${message['message']}');
           break;
+        case 'npc_message_delta':
+        case 'npc_message_done':
+          // Streamed NPC replies: consumed from [messages] by the conversation screen
+          break;
         default:
           debugPrint('⚠️ Unknown message type: $type');
       }
@@ -0,0 +1,51 @@
+import 'package:flutter/material.dart';
+import '../../core/app_config.dart';
+import '../../models/image_atlas.dart';
+
+/// Shows one frame of an [ImageAtlas], scaled to cover its box.
+///
+/// Every sprite of an atlas uses the same network image, so Flutter's image
+/// cache fetches the sheet once however many sprites are on screen.
+class AtlasSprite extends StatelessWidget {
+  final ImageAtlas atlas;
+  final AtlasFrame frame;
+  final ImageErrorWidgetBuilder? errorBuilder;
+
+  const AtlasSprite({
+    Key? key,
+    required this.atlas,
+    required this.frame,
+    this.errorBuilder,
+  }) : super(key: key);
+
+  @override
+  Widget build(BuildContext context) {
+    return FittedBox(
+      fit: BoxFit.cover,
+      clipBehavior: Clip.hardEdge,
+      child: SizedBox(
+        width: frame.width,
+        height: frame.height,
+        child: ClipRect(
+          child: OverflowBox(
+            alignment: Alignment.topLeft,
+            minWidth: atlas.width,
+            maxWidth: atlas.width,
+            minHeight: atlas.height,
+            maxHeight: atlas.height,
+            child: Transform.translate(
+              offset: Offset(-frame.x, -frame.y),
+              child: Image.network(
+                '${AppConfig.backendUrl}${atlas.url}',
+                width: atlas.width,
+                height: atlas.height,
+                fit: BoxFit.fill,
+                errorBuilder: errorBuilder,
+              ),
+            ),
+          ),
+        ),
+      ),
+    );
+  }
+}